@@ -0,0 +1,84 @@
+"""
+Microbenchmark of the per-clue board operations. Times change_guess,
+reveal_answer and find_wrong_letter on every clue of a puzzle for the
+crossword.py from before the optimizations (baseline_crossword.py, a
+copy of it) and the current one, and prints the latency of each per
+call. find_wrong_letter is timed on a blank board, on a board with the
+last letter of every across answer wrong, and on a solved board, since
+hints are mostly asked for when something is wrong
+
+Usage: python bench_clue_ops.py [puzzle.csv ...]
+"""
+
+import sys
+import timeit
+
+import baseline_crossword
+import crossword
+
+DEFAULT_PUZZLES = ["vowel.csv", "meal.csv", "monopoly.csv"]
+REPEAT = 5
+NUMBER = 2000
+
+
+def _wrong_letter(letter):
+    return 'Z' if letter != 'Z' else 'Y'
+
+
+def time_operations(module, filename):
+    """
+    Time each clue operation for one implementation of the crossword
+    :param module: Module providing a Crossword class
+    :param filename: Puzzle csv file
+    :return: Dictionary of operation name to best time per call in nanoseconds
+    """
+    puzzle = module.Crossword(filename)
+    clues = list(puzzle.clues.values())
+    blanks = ['_' * len(clue.answer) for clue in clues]
+    answers = [clue.answer for clue in clues]
+
+    def change_guess():
+        for clue, blank, answer in zip(clues, blanks, answers):
+            puzzle.change_guess(clue, blank)
+            puzzle.change_guess(clue, answer)
+
+    def reveal_answer():
+        for clue in clues:
+            puzzle.reveal_answer(clue)
+
+    def find_wrong_letter():
+        for clue in clues:
+            puzzle.find_wrong_letter(clue)
+
+    def best(operation, calls=1):
+        return min(timeit.repeat(operation, repeat=REPEAT, number=NUMBER)) / (NUMBER * calls * len(clues)) * 1e9
+
+    # change_guess makes two calls per clue so the board actually changes on every call
+    results = {'change_guess': best(change_guess, 2), 'reveal_answer': best(reveal_answer)}
+    for clue, blank in zip(clues, blanks):
+        puzzle.change_guess(clue, blank)
+    results['find_wrong_letter blank'] = best(find_wrong_letter)
+    for clue, answer in zip(clues, answers):
+        puzzle.change_guess(clue, answer)
+    for clue, answer in zip(clues, answers):
+        if clue.down_across == 'A':
+            puzzle.change_guess(clue, answer[:-1] + _wrong_letter(answer[-1]))
+    results['find_wrong_letter wrong'] = best(find_wrong_letter)
+    for clue in clues:
+        puzzle.reveal_answer(clue)
+    results['find_wrong_letter solved'] = best(find_wrong_letter)
+    return results
+
+
+def main(filenames):
+    print(f"{'puzzle':<16}{'operation':<26}{'old (ns)':>10}{'new (ns)':>10}{'speedup':>9}")
+    for filename in filenames:
+        old = time_operations(baseline_crossword, filename)
+        new = time_operations(crossword, filename)
+        for operation in old:
+            print(f"{filename:<16}{operation:<26}{old[operation]:>10.0f}{new[operation]:>10.0f}"
+                  f"{old[operation] / new[operation]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_PUZZLES)
@@ -0,0 +1,99 @@
+"""
+Benchmark of generator.generate_puzzle across grid sizes. No real word
+list ships with the repo, so the word list is random words of 3 letters
+up to the longest slot, drawn like bench_suite's synthetic puzzles, each
+with a placeholder clue. Building the word list and its index is not
+timed; each puzzle is generated in this process, layouts that do not
+fill included.
+
+The benchmark is a pass/fail gate: it exits with 0 only if every puzzle
+of every size is generated within --budget seconds, and with 2
+otherwise.
+
+Usage: python bench_generator.py [--sizes 5 7 9 11 13 15] [--count 5]
+       [--words 100000] [--density 0.16] [--max-length 9] [--seed n] [--budget s]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from bench_suite import LETTERS
+from generator import MAX_LENGTH, generate_puzzle
+from word_index import WordIndex
+
+DEFAULT_SIZES = [5, 7, 9, 11, 13, 15]
+DEFAULT_COUNT = 5
+DEFAULT_WORDS = 100000
+DENSITY = 0.16
+# Seconds a single puzzle may take to generate
+BUDGET = 1.0
+
+
+def clued_words(count, longest, seed):
+    """
+    Make a random word list with placeholder clues
+    :param count: Number of words to draw, duplicates are dropped
+    :param longest: Longest word length
+    :param seed: Seed of the words
+    :return: Dictionary of word -> clue
+    """
+    rng = random.Random(seed)
+    words = (''.join(rng.choice(LETTERS) for _ in range(rng.randint(3, longest))) for _ in range(count))
+    return {word: f"Placeholder clue for {word}" for word in words}
+
+
+def run_bench(sizes, count, clues, index, base_seed=0, density=DENSITY, max_length=MAX_LENGTH):
+    """
+    Generate count puzzles of every size
+    :param sizes: List of grid sizes
+    :param count: Number of puzzles per size
+    :param clues: Dictionary of word -> clue
+    :param index: WordIndex of the words
+    :param base_seed: Seed of the first puzzle of each size
+    :param density: Target fraction of blocked squares
+    :param max_length: Longest slot
+    :return: Dictionary of size -> list of (seed, filled, seconds) tuples
+    """
+    runs = dict()
+    for size in sizes:
+        runs[size] = []
+        for seed in range(base_seed, base_seed + count):
+            start = time.perf_counter()
+            rows = generate_puzzle(size, density, 'rotational', seed, index, clues, max_length)
+            runs[size].append((seed, rows is not None, time.perf_counter() - start))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark puzzle generation per grid size")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help="puzzles per size")
+    parser.add_argument('--words', type=int, default=DEFAULT_WORDS)
+    parser.add_argument('--density', type=float, default=DENSITY)
+    parser.add_argument('--max-length', type=int, default=MAX_LENGTH, help="longest slot")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the word list and the first puzzle")
+    parser.add_argument('--budget', type=float, default=BUDGET, help="seconds allowed per puzzle")
+    args = parser.parse_args()
+
+    clues = clued_words(args.words, min(max(args.sizes), args.max_length), args.seed)
+    index = WordIndex(clues, args.seed)
+    print(f"{len(clues)} words, density {args.density}, slots up to {args.max_length}, "
+          f"{args.budget} s per puzzle")
+    failed = 0
+    for size, runs in run_bench(args.sizes, args.count, clues, index, args.seed, args.density,
+                                args.max_length).items():
+        seconds = [elapsed for _, _, elapsed in runs]
+        slow = [seed for seed, filled, elapsed in runs if not filled or elapsed > args.budget]
+        failed += len(slow)
+        print(f"{size}x{size}: {len(runs) - len(slow)} of {len(runs)} within budget, "
+              f"median {statistics.median(seconds) * 1000:.1f} ms, slowest {max(seconds) * 1000:.1f} ms"
+              + (f", failed seeds {slow}" if slow else ""))
+    print("PASS" if not failed else "FAIL")
+    return 0 if not failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
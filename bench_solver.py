@@ -0,0 +1,136 @@
+"""
+Benchmark of solver.py on grids laid out the way generator.py lays them
+out, with slots no longer than --max-length. No real word list ships with
+the repo, so each grid gets a planted fill of random letters (drawn like
+bench_suite's synthetic puzzles) and the word list is the planted answers
+plus decoy words of the grid's slot lengths. Every grid therefore has at
+least one fill, and the decoys give the search as many wrong turns as a
+dictionary would.
+
+For each seed the benchmark prints the grid's slots, an estimate of how
+many fills the word list allows (log10 of the number of ways to pick a
+word per slot times the chance that every crossing agrees; near or below
+0 the planted fill is about the only one, and the search has to find a
+needle), then the search statistics of solver.SolveResult. Word list and
+index building are not timed.
+
+The benchmark is a pass/fail gate: it exits with 0 only if every grid is
+filled within --max-nodes and --budget seconds, and with 2 otherwise.
+
+Usage: python bench_solver.py [--size 15] [--words 100000] [--density 0.16]
+       [--max-length 9] [--seeds 5] [--seed n] [--max-nodes n] [--budget s]
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+
+from bench_suite import LETTERS
+from crossword import Crossword
+from generator import MAX_LENGTH, grid_clues, make_grid
+from solver import Solver
+from word_index import WordIndex
+
+DEFAULT_SIZE = 15
+DEFAULT_WORDS = 100000
+DEFAULT_SEEDS = 5
+DENSITY = 0.16
+MAX_NODES = 2000
+# Seconds a single grid may take to fill
+BUDGET = 0.5
+
+
+def planted_puzzle(size, density, decoys, seed, max_length=MAX_LENGTH):
+    """
+    Lay out a grid like generator.py and make a word list that fills it
+    :param size: Number of rows and columns
+    :param density: Target fraction of blocked squares
+    :param decoys: Number of random words added to the planted answers
+    :param seed: Seed of the layout, the planted fill and the decoys
+    :param max_length: Longest slot, layouts with a run that could not be broken are drawn again
+    :return: Tuple of the Crossword and the list of words
+    """
+    rng = random.Random(seed)
+    while True:
+        blocks = make_grid(size, density, 'rotational', rng, max_length)
+        clues = grid_clues(blocks)
+        if max(len(clue.answer) for clue in clues) <= max_length:
+            break
+    letters = [[None if blocked else rng.choice(LETTERS) for blocked in row] for row in blocks]
+    words = []
+    for clue in clues:
+        r, c = clue.indices
+        if clue.down_across == 'A':
+            words.append(''.join(letters[r][c:c + len(clue.answer)]))
+        else:
+            words.append(''.join(letters[i][c] for i in range(r, r + len(clue.answer))))
+    lengths = sorted({len(word) for word in words})
+    words += [''.join(rng.choice(LETTERS) for _ in range(rng.choice(lengths))) for _ in range(decoys)]
+    return Crossword.from_clues(clues), words
+
+
+def expected_fills(solver):
+    """
+    Estimate the number of fills of a grid, as if the words were independent random strings
+    :param solver: Solver of the grid
+    :return: log10 of the estimate
+    """
+    agree = sum((LETTERS.count(letter) / len(LETTERS)) ** 2 for letter in set(LETTERS))
+    ways = sum(math.log10(len(solver.words[slot.length]) or 1) for slot in solver.slots)
+    checked = {cell for slot in solver.slots for _, cell, _ in slot.crossings}
+    return ways + len(checked) * math.log10(agree)
+
+
+def run_bench(size, decoys, seeds, base_seed=0, density=DENSITY, max_nodes=MAX_NODES, max_length=MAX_LENGTH):
+    """
+    Solve one planted grid per seed
+    :param size: Number of rows and columns
+    :param decoys: Number of decoy words per grid
+    :param seeds: Number of grids
+    :param base_seed: Seed of the first grid
+    :param density: Target fraction of blocked squares
+    :param max_nodes: Search nodes after which a grid counts as not filled
+    :param max_length: Longest slot
+    :return: List of (seed, Solver, SolveResult) tuples
+    """
+    runs = []
+    for seed in range(base_seed, base_seed + seeds):
+        puzzle, words = planted_puzzle(size, density, decoys, seed, max_length)
+        solver = Solver(puzzle, WordIndex(words, seed), seed, max_nodes)
+        runs.append((seed, solver, solver.solve()))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fill solver on planted generator layouts")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE)
+    parser.add_argument('--words', type=int, default=DEFAULT_WORDS, help="decoy words per grid")
+    parser.add_argument('--density', type=float, default=DENSITY)
+    parser.add_argument('--max-length', type=int, default=MAX_LENGTH, help="longest slot")
+    parser.add_argument('--seeds', type=int, default=DEFAULT_SEEDS)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first grid")
+    parser.add_argument('--max-nodes', type=int, default=MAX_NODES)
+    parser.add_argument('--budget', type=float, default=BUDGET, help="seconds allowed per grid")
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, density {args.density}, slots up to {args.max_length}, "
+          f"{args.words} decoy words, at most {args.max_nodes} nodes and {args.budget} s per grid")
+    runs = run_bench(args.size, args.words, args.seeds, args.seed, args.density, args.max_nodes, args.max_length)
+    failed = 0
+    for seed, solver, result in runs:
+        longest = max(slot.length for slot in solver.slots)
+        passed = result.solved and result.seconds <= args.budget
+        failed += not passed
+        print(f"seed {seed}: {len(solver.slots)} slots, longest {longest}, "
+              f"log10 fills {expected_fills(solver):.1f}: {result}{'' if passed else ' FAIL'}")
+    seconds = [result.seconds for _, _, result in runs]
+    print(f"{len(runs) - failed} of {len(runs)} filled within budget, "
+          f"median {statistics.median(seconds) * 1000:.1f} ms, slowest {max(seconds) * 1000:.1f} ms")
+    print("PASS" if not failed else "FAIL")
+    return 0 if not failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Benchmark suite for the Crossword operations. Synthetic puzzles from
+5x5 up to 101x101 are written to a temporary directory, and for each
+size the suite times loading (Crossword.__init__/_load), change_guess,
+reveal_answer, find_wrong_letter, check, is_solved, __str__
+and proj07.display_clues. Results are the best time per call in
+nanoseconds, written as JSON.
+
+Given a saved baseline, every result is compared against it and any
+operation slower by more than the threshold is reported as a
+regression, with a non-zero exit status so it can gate a deploy.
+
+Usage: python bench_suite.py [--sizes 5 11 21 51 101] [--output results.json]
+       [--baseline baseline.json] [--threshold 0.1] [--seed n]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+from crossword import BLOCK, Crossword
+from generator import grid_clues, write_puzzle
+from proj07 import display_clues
+
+DEFAULT_SIZES = [5, 11, 21, 51, 101]
+DENSITY = 0.16
+REPEAT = 5
+TARGET_SECONDS = 0.05
+LETTERS = "EEEEAAAIIOOUNRSTLCDMPHBGYFKWV"
+
+
+def synthetic_rows(size, seed):
+    """
+    Build the csv rows of a random size x size puzzle with rotationally
+    symmetric blocks and random letters
+    :param size: Number of rows and columns
+    :param seed: Seed of the puzzle
+    :return: List of [row, column, A/D, answer, clue] lists
+    """
+    rng = random.Random(seed)
+    blocks = [[False] * size for _ in range(size)]
+    for _ in range(int(DENSITY * size * size / 2)):
+        r, c = rng.randrange(size), rng.randrange(size)
+        blocks[r][c] = blocks[size - 1 - r][size - 1 - c] = True
+    letters = [[BLOCK if blocked else rng.choice(LETTERS) for blocked in row] for row in blocks]
+
+    rows = []
+    for clue in grid_clues(blocks):
+        r, c = clue.indices
+        if clue.down_across == 'A':
+            answer = ''.join(letters[r][c:c + len(clue.answer)])
+        else:
+            answer = ''.join(letters[i][c] for i in range(r, r + len(clue.answer)))
+        rows.append([r, c, clue.down_across, answer, f"Synthetic clue at ({r},{c}) {clue.down_across}"])
+    return rows
+
+
+def best_per_call(function, calls=1):
+    """
+    Time a function with enough iterations to be measurable
+    :param function: Function of no arguments
+    :param calls: Number of operations one call of function performs
+    :return: Best time per operation in nanoseconds
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * TARGET_SECONDS / max(elapsed, 1e-9) / 5) or 1)
+    best = min(timer.repeat(repeat=REPEAT, number=number))
+    return best / (number * calls) * 1e9
+
+
+def bench_puzzle(filename):
+    """
+    Time every operation on one puzzle file
+    :param filename: Puzzle csv file
+    :return: Dictionary of operation name -> nanoseconds per call
+    """
+    puzzle = Crossword(filename)
+    clues = list(puzzle.clues.values())
+    blanks = ['_' * len(clue.answer) for clue in clues]
+    sink = io.StringIO()
+    # half the clues revealed, so there are wrong squares to find and clues to report
+    checked = puzzle.copy()
+    for clue in clues[::2]:
+        checked.reveal_answer(clue)
+
+    def change_guess():
+        for clue, blank in zip(clues, blanks):
+            puzzle.change_guess(clue, clue.answer)
+            puzzle.change_guess(clue, blank)
+
+    def reveal_answer():
+        for clue, blank in zip(clues, blanks):
+            puzzle.reveal_answer(clue)
+            puzzle.change_guess(clue, blank)
+
+    def find_wrong_letter():
+        for clue in clues:
+            puzzle.find_wrong_letter(clue)
+
+    def render():
+        # a guess between renders so the cost of updating the board text is included
+        puzzle.change_guess(clues[0], clues[0].answer)
+        str(puzzle)
+        puzzle.change_guess(clues[0], blanks[0])
+        str(puzzle)
+
+    def show_clues():
+        sink.seek(0)
+        sink.truncate()
+        with contextlib.redirect_stdout(sink):
+            display_clues(puzzle)
+
+    return {
+        'load': best_per_call(lambda: Crossword(filename)),
+        'change_guess': best_per_call(change_guess, 2 * len(clues)),
+        # includes the change_guess that blanks the clue again, so the board changes on every call
+        'reveal_answer': best_per_call(reveal_answer, len(clues)),
+        'find_wrong_letter': best_per_call(find_wrong_letter, len(clues)),
+        'check': best_per_call(checked.check),
+        'is_solved': best_per_call(puzzle.is_solved),
+        'str': best_per_call(render, 2),
+        'display_clues': best_per_call(show_clues),
+    }
+
+
+def run_suite(sizes, seed=0):
+    """
+    Generate one synthetic puzzle per size and benchmark it
+    :param sizes: List of board sizes
+    :param seed: Seed of the synthetic puzzles, size n uses seed + n
+    :return: Dictionary of "nxn" -> results of bench_puzzle
+    """
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            filename = os.path.join(directory, f"synthetic_{size}.csv")
+            write_puzzle(filename, synthetic_rows(size, seed + size))
+            results[f"{size}x{size}"] = bench_puzzle(filename)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline
+    :param results: Results of run_suite
+    :param baseline: Results of an earlier run_suite, e.g. loaded from a saved JSON file
+    :param threshold: Relative slowdown that counts as a regression, e.g. 0.1 for 10%
+    :return: List of (size, operation, baseline ns, current ns, ratio) tuples, and the list of regressions among them
+    """
+    rows, regressions = [], []
+    for size, operations in results.items():
+        for operation, current in operations.items():
+            previous = baseline.get(size, {}).get(operation)
+            if previous is None:
+                continue
+            row = (size, operation, previous, current, current / previous)
+            rows.append(row)
+            if row[4] > 1 + threshold:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Crossword operations on synthetic puzzles")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--output', help="file to write the JSON results to, otherwise stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative slowdown counted as a regression")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'unit': 'ns per call',
+        'results': run_suite(args.sizes, args.seed),
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        rows, regressions = compare(report['results'], baseline, args.threshold)
+        report['comparison'] = [dict(zip(('size', 'operation', 'baseline', 'current', 'ratio'), row))
+                                for row in rows]
+        report['regressions'] = len(regressions)
+        for size, operation, previous, current, ratio in regressions:
+            print(f"REGRESSION {size} {operation}: {previous:.0f} ns -> {current:.0f} ns ({ratio:.2f}x)",
+                  file=sys.stderr)
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
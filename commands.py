@@ -0,0 +1,346 @@
+"""
+Headless version of the proj07.py game loop. Commands are parsed once
+into typed command objects and run through a dispatch table, and all
+the text proj07.py would print goes to a single write function, so a
+whole recorded command log can be replayed without a subprocess or any
+print calls.
+
+    output = run_script(Crossword('meal.csv'), ['G 0 1 A', 'BRB', 'Q'])
+
+A script given as text lines is parsed by parse_script; a parsed script
+can be replayed any number of times.
+
+Usage: python commands.py input.txt [--echo]
+"""
+
+import argparse
+import io
+import sys
+
+import metrics
+import puzzle_pack
+from crossword import Crossword
+from proj07 import (ENTER_GUESS, HELP_MENU, NOTHING_TO_REDO, NOTHING_TO_UNDO, OPTION_PROMPT, PUZZLE_FILE_ERROR,
+                    PUZZLE_PROMPT, format_check, format_clues)
+
+INVALID_OPTION = "Invalid option/arguments. Type 'H' for help."
+SOLVED = "\nPuzzle solved! Congratulations!"
+CORRECT = "This clue is already correct!"
+
+
+class Command:
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        """
+        One line of input. The raw text is kept because the game may read the
+        line as a guess or a file name instead of an option
+        :param text: Line of input without its line ending
+        """
+        self.text = text
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.text!r})"
+
+
+class Invalid(Command):
+    __slots__ = ()
+
+
+class Help(Command):
+    __slots__ = ()
+
+
+class Restart(Command):
+    __slots__ = ()
+
+
+class Quit(Command):
+    __slots__ = ()
+
+
+class Undo(Command):
+    __slots__ = ()
+
+
+class Redo(Command):
+    __slots__ = ()
+
+
+class Check(Command):
+    __slots__ = ()
+
+
+class ShowClues(Command):
+    __slots__ = ('count',)
+
+    def __init__(self, text, count):
+        """
+        :param text: Line of input
+        :param count: Number of clues of each direction to show, 0 for all
+        """
+        super().__init__(text)
+        self.count = count
+
+
+class ClueCommand(Command):
+    __slots__ = ('key',)
+
+    def __init__(self, text, key):
+        """
+        :param text: Line of input
+        :param key: (row, column, direction) of any square of the clue's answer, which may not exist
+        in the puzzle; direction is 'A', 'D' or None when the command did not give one
+        """
+        super().__init__(text)
+        self.key = key
+
+
+class Guess(ClueCommand):
+    __slots__ = ()
+
+
+class Reveal(ClueCommand):
+    __slots__ = ()
+
+
+class Hint(ClueCommand):
+    __slots__ = ()
+
+
+_SINGLE = {'H': Help, 'S': Restart, 'Q': Quit, 'U': Undo, 'Y': Redo, 'P': Check}
+_CLUE = {'G': Guess, 'R': Reveal, 'T': Hint}
+
+
+def parse_command(text):
+    """
+    Parse one line of input the way proj07.validate reads it. Whether the
+    clue of a G/R/T command exists is only known once it runs
+    :param text: Line of input without its line ending
+    :return: Command object
+    """
+    option_lst = text.split()
+    if not option_lst:
+        return Invalid(text)
+    option = option_lst[0]
+    if option in _SINGLE:
+        return _SINGLE[option](text) if len(option_lst) == 1 else Invalid(text)
+    if option == 'C':
+        if len(option_lst) != 2:
+            return Invalid(text)
+        try:
+            return ShowClues(text, int(option_lst[1]))
+        except ValueError:
+            return ShowClues(text, 0)
+    if option in _CLUE and len(option_lst) >= 3:
+        try:
+            direction = option_lst[3] if len(option_lst) > 3 else None
+            return _CLUE[option](text, (int(option_lst[1]), int(option_lst[2]), direction))
+        except ValueError:
+            pass
+    return Invalid(text)
+
+
+def parse_script(lines):
+    """
+    :param lines: Iterable of input lines, line endings are dropped
+    :return: List of Command objects
+    """
+    return [parse_command(line.rstrip('\r\n')) for line in lines]
+
+
+def load_puzzle(filename):
+    """
+    Default way a game opens puzzle files, like proj07.open_puzzle but without printing
+    :param filename: Name of the puzzle csv file, or "pack_file#puzzle_id" for a puzzle of a pack
+    :return: Crossword object, or None if it cannot be loaded
+    """
+    try:
+        pack_name = puzzle_pack.split_name(filename)
+        if pack_name is not None:
+            return Crossword.from_pack(*pack_name)
+        return Crossword(filename)
+    except Exception:
+        return None
+
+
+class Game:
+    def __init__(self, write, puzzle=None, open_puzzle=load_puzzle, echo=False):
+        """
+        State of one game, fed one command at a time
+        :param write: Function called with every piece of output text
+        :param puzzle: Crossword to start on, or None to start by asking for a file name
+        :param open_puzzle: Function of a file name returning a Crossword or None
+        :param echo: Also write each input line after its prompt, as proj07.input does
+        """
+        self.write = write
+        self.puzzle = puzzle
+        self.open_puzzle = open_puzzle
+        self.echo = echo
+        self.guess_clue = None
+        self.closed = False
+
+    def start(self):
+        """
+        Write what the game shows before the first input
+        """
+        if self.puzzle is None:
+            self.write(PUZZLE_PROMPT)
+        else:
+            self._show_puzzle()
+
+    def feed(self, command):
+        """
+        Handle one line of input, in whatever state the game is in
+        :param command: Command object of the line
+        """
+        if self.echo:
+            self.write(command.text + '\n')
+        if self.puzzle is None:
+            self._open(command.text)
+        elif self.guess_clue is not None:
+            self._guess(command.text)
+        else:
+            self._HANDLERS[type(command)](self, command)
+
+    def _show_puzzle(self):
+        self.write(f"{format_clues(self.puzzle)}\n{self.puzzle}\n{HELP_MENU}\n{OPTION_PROMPT}")
+
+    def _open(self, filename):
+        self.puzzle = self.open_puzzle(filename)
+        if self.puzzle is None:
+            self.write(PUZZLE_FILE_ERROR + '\n' + PUZZLE_PROMPT)
+        else:
+            self._show_puzzle()
+
+    def _guess(self, text):
+        try:
+            self.puzzle.change_guess(self.guess_clue, text.upper())
+        except RuntimeError as message:
+            self.write(f"{message}\n{ENTER_GUESS}")
+            return
+        self.guess_clue = None
+        self.write(f"{self.puzzle}\n")
+        self._finish()
+
+    def _finish(self):
+        """
+        End the game if the last command solved it, otherwise prompt for the next one
+        """
+        if self.puzzle.is_solved():
+            self.write(SOLVED + '\n')
+            self.closed = True
+        else:
+            self.write(OPTION_PROMPT)
+
+    def _invalid(self, command):
+        self.write(INVALID_OPTION + '\n' + OPTION_PROMPT)
+
+    def _clue(self, command):
+        """
+        :return: Clue object of a G/R/T command, or None after reporting an invalid option
+        """
+        clue = self.puzzle.clue_at(*command.key)
+        if clue is None:
+            self._invalid(command)
+        return clue
+
+    def _show_clues(self, command):
+        self.write(format_clues(self.puzzle, command.count) + '\n')
+        self._finish()
+
+    def _start_guess(self, command):
+        self.guess_clue = self._clue(command)
+        if self.guess_clue is not None:
+            self.write(ENTER_GUESS)
+
+    def _reveal(self, command):
+        clue = self._clue(command)
+        if clue is not None:
+            self.puzzle.reveal_answer(clue)
+            self.write(f"{self.puzzle}\n")
+            self._finish()
+
+    def _hint(self, command):
+        clue = self._clue(command)
+        if clue is not None:
+            i = self.puzzle.find_wrong_letter(clue)
+            if i != -1:
+                self.write(f"Letter {i + 1} is wrong, it should be {clue.answer[i]}\n")
+            else:
+                self.write(CORRECT + '\n')
+            self._finish()
+
+    def _undo(self, command):
+        self.write(f"{self.puzzle}\n" if self.puzzle.undo() else NOTHING_TO_UNDO + '\n')
+        self._finish()
+
+    def _redo(self, command):
+        self.write(f"{self.puzzle}\n" if self.puzzle.redo() else NOTHING_TO_REDO + '\n')
+        self._finish()
+
+    def _check(self, command):
+        self.write(format_check(self.puzzle) + '\n')
+        self._finish()
+
+    def _help(self, command):
+        self.write(HELP_MENU + '\n')
+        self._finish()
+
+    def _restart(self, command):
+        self.puzzle = None
+        self.write(PUZZLE_PROMPT)
+
+    def _quit(self, command):
+        self.closed = True
+
+    _HANDLERS = {
+        Invalid: _invalid,
+        ShowClues: _show_clues,
+        Guess: _start_guess,
+        Reveal: _reveal,
+        Hint: _hint,
+        Undo: _undo,
+        Redo: _redo,
+        Check: _check,
+        Help: _help,
+        Restart: _restart,
+        Quit: _quit,
+    }
+
+
+def run_script(puzzle, commands, echo=False, open_puzzle=load_puzzle):
+    """
+    Play a whole script of commands without any console input or output
+    :param puzzle: Crossword to play, or None if the script starts with a puzzle file name
+    :param commands: List of Command objects from parse_script, or of input lines
+    :param echo: Also write each input line after its prompt, giving exactly what proj07.py prints
+    :param open_puzzle: Function of a file name returning a Crossword or None, used for file name lines
+    :return: String of everything the game printed
+    """
+    buffer = io.StringIO()
+    game = Game(buffer.write, puzzle, open_puzzle, echo)
+    game.start()
+    for command in commands:
+        if game.closed:
+            break
+        if isinstance(command, str):
+            command = parse_command(command.rstrip('\r\n'))
+        game.feed(command)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a proj07.py input file without a console")
+    parser.add_argument('script', help="input file, starting with the puzzle file name")
+    parser.add_argument('--echo', action='store_true', help="echo input lines like proj07.py")
+    args = parser.parse_args()
+
+    with open(args.script) as script_file:
+        commands = parse_script(script_file)
+    print(run_script(None, commands, args.echo), end='')
+
+
+if __name__ == "__main__":
+    metrics.enable_from_environment(game=sys.modules[__name__])
+    main()
@@ -3,16 +3,200 @@ Clue Objects contain the answer, clue, and indices of each word
 in the crossword and are stored in the Crossword Object via a
 dictionary. The dictionary has a portion which is written over by
 the guesses of the user
+
+The board is kept in a single bytearray of rows * cols cells indexed
+by row * cols + col. Letters and blanks are stored as their ASCII
+codes and blocked out squares as BLOCK_CODE. Crossword.board is a
+list-like view over that buffer so it can still be read, compared and
+assigned as a list of lists
+
+A second buffer of the same shape holds the answer key, and the board
+keeps a running count of open squares that differ from it so checking
+for a solved puzzle does not have to look at the board at all
+
+Checking the whole board XORs it with the answer key as two big
+integers, so finding the wrong squares runs at C speed however large
+the board is
+
+Printing a crossword reuses the rendered text of each row. Writes only
+throw away the rows they touch, so after a guess just those rows are
+rendered again. The column header is the same for every board of a
+size and is rendered once for all of them
+
+Every change to the board is journalled as the cells it changed, so
+guesses and reveals can be undone and redone without keeping copies of
+the board. A step costs the letters it wrote before and after, two bytes
+a square, plus twelve bytes saying where they go. A board only gets its
+journal when it is first written to, and the journal keeps the last
+UNDO_LIMIT steps, so neither a blank board nor a long game pays for more
+
+Clues use __slots__ and share their strings, index tuples and board
+slices with every other clue that has the same value, so a large number
+of loaded puzzles costs little more than the distinct data in them
 """
 
 import csv
-
-CROSSWORD_DIMENSION = 5
+import sys
+from array import array
+from itertools import compress, repeat
+from operator import ne
 
 GUESS_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+_GUESS_SET = frozenset(GUESS_CHARS)
+
+# Number of steps a journal keeps for undoing. Older ones are dropped a batch at a time
+UNDO_LIMIT = 200
+
+BLOCK = '■'
+BLOCK_CODE = ord('#')
+BLANK_CODE = ord('_')
+
+# Answer key value for a square where crossing answers disagree; no letter matches it
+CONFLICT_CODE = 0
+
+# Shared index tuples and board slices, keyed by their values. Both are bounded by the
+# board dimensions in use so they never grow with the number of puzzles
+_INDICES = dict()
+_SLICES = dict()
+
+# Column header text of a rendered board, keyed by (rows, cols) and shared by every board of that size
+_HEADERS = dict()
+
+# bytes.translate table turning an answer key into a fresh board of blanks and blocks
+_OPEN_SQUARES = bytes(BLOCK_CODE if code == BLOCK_CODE else BLANK_CODE for code in range(256))
+
+# bytes.translate tables turning a board XOR answer key into 1 for every wrong square and 0 for
+# every other, and a board into 1 for every square holding a letter
+_DIFFERENT = bytes([0] + [1] * 255)
+_FILLED = bytes(0 if code in (BLANK_CODE, BLOCK_CODE) else 1 for code in range(256))
+
+# bytes.translate tables turning a board or answer key into 1 for every blocked out square, and into
+# a mask of all ones for every open one. Whatever is written over a square the answer key blocks out is never wrong
+_BLOCKED = bytes(1 if code == BLOCK_CODE else 0 for code in range(256))
+_OPEN = bytes(0 if code == BLOCK_CODE else 255 for code in range(256))
+_BLOCKED_ANSWER = bytes((BLOCK_CODE,))
+_BLANK = bytes((BLANK_CODE,))
+
+
+def _encode(letter):
+    """
+    Convert a single board character to the byte stored in the board buffer
+    :param letter: One character string, BLOCK for a blocked out square
+    :return: Integer byte value
+    """
+    if letter == BLOCK:
+        return BLOCK_CODE
+    if len(letter) != 1 or ord(letter) > 127 or letter == '#':
+        raise ValueError(f"Cannot store {letter!r} on the board")
+    return ord(letter)
+
+
+def _decode(code):
+    """
+    Convert a byte from the board buffer back into a board character
+    :param code: Integer byte value
+    :return: One character string
+    """
+    return BLOCK if code == BLOCK_CODE else chr(code)
+
+
+class Journal:
+    __slots__ = ('starts', 'strides', 'offsets', 'old', 'new', 'dropped', 'first', 'applied', 'limit',
+                 'truncations')
+
+    def __init__(self, limit=UNDO_LIMIT):
+        """
+        Undo/redo log of board changes. A step (one guess, reveal or square
+        written) is the run of squares it wrote. Steps are numbered from the
+        first one ever recorded, and only the ones from step first on are
+        kept: step first + k starts at square starts[k], moves strides[k]
+        squares at a time, and its letters before and after are
+        old[offsets[k] - dropped:offsets[k + 1] - dropped] and the same range
+        of new, dropped being the letters of the steps before step first.
+        Steps before step applied are on the board, the ones after it can be
+        redone until a new step replaces them, which truncations counts
+        :param limit: Number of steps to keep, None to keep every one
+        """
+        self.starts = array('L')
+        self.strides = array('L')
+        self.offsets = array('L', [0])
+        self.old = bytearray()
+        self.new = bytearray()
+        self.dropped = 0
+        self.first = 0
+        self.applied = 0
+        self.limit = limit
+        self.truncations = 0
+
+    def record(self, start, stride, old, new):
+        """
+        Add a step, dropping any steps that could still be redone
+        :param start: Index of the first square being written
+        :param stride: Number of squares between two squares being written
+        :param old: bytes in those squares
+        :param new: bytes written over them
+        """
+        starts = self.starts
+        kept = len(starts)
+        if self.applied - self.first < kept:
+            self._truncate()
+            kept = len(starts)
+        starts.append(start)
+        self.strides.append(stride)
+        self.old += old
+        self.new += new
+        self.offsets.append(self.offsets[-1] + len(old))
+        self.applied += 1
+        limit = self.limit
+        if limit is not None and kept >= limit + (limit >> 2):
+            self._drop(kept + 1 - limit)
+
+    def _truncate(self):
+        """
+        Forget the steps that could still be redone
+        """
+        applied = self.applied - self.first
+        first = self.offsets[applied] - self.dropped
+        del self.starts[applied:], self.strides[applied:], self.offsets[applied + 1:]
+        del self.old[first:], self.new[first:]
+        self.truncations += 1
+
+    def _drop(self, count):
+        """
+        Forget the oldest steps, which can then no longer be undone
+        :param count: Number of steps to drop, all of them on the board
+        """
+        first = self.offsets[count] - self.dropped
+        del self.starts[:count], self.strides[:count], self.offsets[:count], self.old[:first], self.new[:first]
+        self.dropped += first
+        self.first += count
+
+    def step(self, k):
+        """
+        :param k: Number of a step that is still kept, from first to end() - 1
+        :return: Tuple of the slice of the board buffer it wrote, its letters before and its letters after
+        """
+        k -= self.first
+        first, last = self.offsets[k] - self.dropped, self.offsets[k + 1] - self.dropped
+        start, stride = self.starts[k], self.strides[k]
+        return slice(start, start + (last - first) * stride, stride), self.old[first:last], self.new[first:last]
+
+    def end(self):
+        """
+        :return: Number of the step after the last one recorded
+        """
+        return self.first + len(self.starts)
+
+    def can_undo(self):
+        return self.applied > self.first
+
+    def can_redo(self):
+        return self.applied < self.end()
 
 
 class Clue:
+    __slots__ = ('indices', 'down_across', 'answer', 'clue', 'cells')
+
     def __init__(self, indices, down_across, answer, clue):
         """
         Puzzle clue constructor
@@ -21,10 +205,12 @@ class Clue:
         :param answer: The answer to the clue
         :param clue: The clue description
         """
-        self.indices = indices
-        self.down_across = down_across
-        self.answer = answer
-        self.clue = clue
+        self.indices = _INDICES.setdefault(indices, indices)
+        self.down_across = sys.intern(down_across)
+        self.answer = sys.intern(answer)
+        self.clue = sys.intern(clue)
+        # slice of the board buffer covered by the answer, filled in by the Crossword that loads it
+        self.cells = None
 
     def __str__(self):
         """
@@ -50,7 +236,115 @@ class Clue:
         return ((self.down_across,) + self.indices) < ((other.down_across,) + other.indices)
 
 
+def _row_clue(row):
+    """
+    Build the clue of one csv row
+    :param row: Dictionary of the row's columns, as csv.DictReader gives it
+    :return: Clue object
+    """
+    indices = tuple(map(int, (row['Row Index'], row['Column Index'])))
+    return Clue(indices, row['Down/Across'], row['Answer'], row['Clue'])
+
+
+def validate_guess(clue, new_guess):
+    """
+    Check a guess the way change_guess does before writing it
+    :param clue: Clue object the guess is for
+    :param new_guess: String of upper case letters and blanks
+    :return: None, a RuntimeError is raised if the guess has the wrong length or other characters
+    """
+    if len(new_guess) != len(clue.answer):
+        raise RuntimeError("Guess length does not match the length of the clue.\n")
+
+    if not _GUESS_SET.issuperset(new_guess):
+        raise RuntimeError("Guess contains invalid characters.\n")
+
+
+class BoardRow:
+    __slots__ = ('_puzzle', '_row')
+
+    def __init__(self, puzzle, row):
+        """
+        Live view of one row of a crossword board
+        :param puzzle: Crossword object owning the board buffer
+        :param row: Row index of the view
+        """
+        self._puzzle = puzzle
+        self._row = row
+
+    def __len__(self):
+        return self._puzzle.cols
+
+    def __getitem__(self, col):
+        """
+        Return the character in the given column (negative indices count from the end)
+        :param col: Column index
+        :return: One character string
+        """
+        col = range(self._puzzle.cols)[col]
+        return _decode(self._puzzle._cells[self._row * self._puzzle.cols + col])
+
+    def __setitem__(self, col, letter):
+        """
+        Overwrite the character in the given column
+        :param col: Column index
+        :param letter: One character string
+        """
+        col = range(self._puzzle.cols)[col]
+        self._puzzle._write(self._row * self._puzzle.cols + col, _encode(letter))
+
+    def __iter__(self):
+        start = self._row * self._puzzle.cols
+        return iter(self._puzzle._cells[start:start + self._puzzle.cols].decode('ascii').replace('#', BLOCK))
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class BoardView:
+    __slots__ = ('_puzzle',)
+
+    def __init__(self, puzzle):
+        """
+        Live list of lists view of a crossword board
+        :param puzzle: Crossword object owning the board buffer
+        """
+        self._puzzle = puzzle
+
+    def __len__(self):
+        return self._puzzle.rows
+
+    def __getitem__(self, row):
+        """
+        Return a view of the given row (negative indices count from the end)
+        :param row: Row index
+        :return: BoardRow view
+        """
+        return BoardRow(self._puzzle, range(self._puzzle.rows)[row])
+
+    def __iter__(self):
+        return (BoardRow(self._puzzle, i) for i in range(self._puzzle.rows))
+
+    def __eq__(self, other):
+        try:
+            return [list(row) for row in self] == [list(row) for row in other]
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+
 class Crossword:
+    __slots__ = ('clues', 'rows', 'cols', '_cells', '_key', '_wrong', '_header', '_lines', '_listing', '_covering',
+                 '_journal', '_changed')
+
     def __init__(self, filename):
         """
         Crossword constructor
@@ -58,9 +352,106 @@ class Crossword:
         this name cannot be found, a FileNotFoundError will be raised
         """
         self.clues = dict()
-        self.board = [['■' for _ in range(CROSSWORD_DIMENSION)] for __ in range(CROSSWORD_DIMENSION)]
+        self.rows = 0
+        self.cols = 0
+        self._cells = bytearray()
+        self._key = bytearray()
+        self._wrong = 0
+        self._header = None
+        self._lines = None
+        self._listing = None
+        self._covering = None
+        self._journal = None
+        self._changed = None
         self._load(filename)
 
+    @classmethod
+    def from_clues(cls, clues):
+        """
+        Build a crossword from Clue objects instead of a csv file
+        :param clues: Iterable of Clue objects
+        :return: Crossword object
+        """
+        puzzle = cls.__new__(cls)
+        puzzle.clues = {clue.indices + (clue.down_across,): clue for clue in clues}
+        puzzle._build_board()
+        return puzzle
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a crossword from rows already read from a csv file
+        :param rows: Iterable of dictionaries of Row Index, Column Index, Down/Across, Answer and Clue,
+        as csv.DictReader gives them
+        :return: Crossword object
+        """
+        return cls.from_clues(map(_row_clue, rows))
+
+    @classmethod
+    def from_pack(cls, path, puzzle_id):
+        """
+        Build a crossword from one puzzle of a multi-puzzle pack file (see
+        puzzle_pack.py). The pack is indexed once, as far as needed to find
+        the puzzle, and the index is reused by later calls
+        :param path: Name of the pack file
+        :param puzzle_id: Puzzle Id of the puzzle within the pack, a KeyError is raised if it is missing
+        :return: Crossword object
+        """
+        import puzzle_pack
+
+        return cls.from_rows(puzzle_pack.open_pack(path).rows(puzzle_id))
+
+    @classmethod
+    def from_archive(cls, path, puzzle_id):
+        """
+        Build a crossword from a puzzle compiled into a binary archive by
+        puzzle_archive.py. The archive is memory-mapped once and reused by
+        later calls, and the board comes straight from the stored answer key
+        :param path: Name of the archive file
+        :param puzzle_id: Id of the puzzle within the archive, a KeyError is raised if it is missing
+        :return: Crossword object
+        """
+        import puzzle_archive
+
+        return cls.from_key(*puzzle_archive.open_archive(path).read(puzzle_id))
+
+    @classmethod
+    def from_key(cls, rows, cols, key, clues):
+        """
+        Build a crossword from an already worked out answer key, skipping the
+        per letter work of _build_board
+        :param rows: Number of rows of the board
+        :param cols: Number of columns of the board
+        :param key: rows * cols bytes of answer key, as stored by puzzle_archive.py
+        :param clues: List of Clue objects
+        :return: Crossword object
+        """
+        puzzle = cls.__new__(cls)
+        puzzle.clues = {clue.indices + (clue.down_across,): clue for clue in clues}
+        puzzle.rows, puzzle.cols = rows, cols
+        puzzle._key = bytearray(key)
+        for clue in clues:
+            clue.cells = puzzle._slice(clue)
+        puzzle._sort_clues()
+        puzzle._open_squares()
+        return puzzle
+
+    def copy(self):
+        """
+        Start a new game of the same puzzle. The clues and answer key are shared
+        with this crossword and must not be modified, only the board is new
+        :return: Crossword object with a blank board
+        """
+        puzzle = type(self).__new__(type(self))
+        puzzle.clues = self.clues
+        puzzle.rows, puzzle.cols = self.rows, self.cols
+        puzzle._key = self._key
+        puzzle._listing = self._listing
+        puzzle._covering = self._covering
+        puzzle._open_squares()
+        puzzle._header = self._header
+        return puzzle
+
     def _load(self, filename):
         """
         Load a crossword puzzle from a csv file
@@ -69,21 +460,379 @@ class Crossword:
         with open(filename) as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
-                indices = tuple(map(int, (row['Row Index'], row['Column Index'])))
-                down_across, answer = row['Down/Across'], row['Answer']
-                clue_description = row['Clue']
-                clue = Clue(indices, down_across, answer, clue_description)
-
-                key = indices + (down_across,)
+                clue = _row_clue(row)
+                key = clue.indices + (clue.down_across,)
                 self.clues[key] = clue
 
-                i = 0
-                while i < len(answer):
-                    if down_across == 'A':
-                        self.board[indices[0]][indices[1] + i] = '_'
-                    else:
-                        self.board[indices[0] + i][indices[1]] = '_'
-                    i += 1
+        self._build_board()
+
+    def _build_board(self):
+        """
+        Size the board to fit every clue, open up the squares they cover
+        and fill in the answer key. The dimensions come from the furthest
+        square reached by any answer
+        """
+        rows = cols = 0
+        for clue in self.clues.values():
+            if clue.indices[0] < 0 or clue.indices[1] < 0:
+                raise ValueError(f"Clue {clue} starts outside of the board")
+            if clue.down_across == 'A':
+                rows = max(rows, clue.indices[0] + 1)
+                cols = max(cols, clue.indices[1] + len(clue.answer))
+            else:
+                rows = max(rows, clue.indices[0] + len(clue.answer))
+                cols = max(cols, clue.indices[1] + 1)
+
+        self.rows, self.cols = rows, cols
+        self._key = bytearray([BLOCK_CODE]) * (rows * cols)
+        for clue in self.clues.values():
+            clue.cells = self._slice(clue)
+            for index, letter in zip(range(*clue.cells.indices(len(self._key))), clue.answer.encode('ascii')):
+                if self._key[index] not in (BLOCK_CODE, letter):
+                    letter = CONFLICT_CODE
+                self._key[index] = letter
+        self._sort_clues()
+        self._open_squares()
+
+    def _sort_clues(self):
+        """
+        Put the across and down clues in display order and format their lines, once per puzzle
+        """
+        listing = dict()
+        for direction in ('A', 'D'):
+            ordered = tuple(sorted((clue for clue in self.clues.values() if clue.down_across == direction),
+                                   key=lambda clue: clue.indices))
+            listing[direction] = (ordered, tuple(str(clue) for clue in ordered))
+        self._listing = listing
+        # filled in by _covering_clues the first time it is needed, in place so copies share it
+        self._covering = []
+
+    def sorted_clues(self, direction):
+        """
+        :param direction: 'A' for across or 'D' for down
+        :return: Tuple of that direction's Clue objects in display order
+        """
+        return self._listing[direction][0]
+
+    def clue_lines(self, direction, offset=0, limit=None):
+        """
+        Page of formatted clue lines in display order, taken from the lines built at load time
+        :param direction: 'A' for across or 'D' for down
+        :param offset: Number of clues to skip
+        :param limit: Maximum number of lines to return, None for all that remain
+        :return: Tuple of strings, as str(clue) would give them
+        """
+        offset = max(offset, 0)
+        if limit is None:
+            return self._listing[direction][1][offset:]
+        return self._listing[direction][1][offset:offset + max(limit, 0)]
+
+    def clues_at(self, row, col):
+        """
+        Clues whose answers pass through a square
+        :param row: Row index
+        :param col: Column index
+        :return: Tuple of the across Clue and the down Clue, either None if there is no such clue
+        or the square is outside of the board
+        """
+        across = down = None
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            for key in self._covering_clues()[row * self.cols + col]:
+                if key[2] == 'A':
+                    across = across or self.clues[key]
+                else:
+                    down = down or self.clues[key]
+        return across, down
+
+    def clue_at(self, row, col, direction=None):
+        """
+        Find a clue from any square of its answer, not just the first
+        :param row: Row index
+        :param col: Column index
+        :param direction: 'A' or 'D', or None for the across clue if there is one, otherwise the down clue
+        :return: Clue object, or None if there is none
+        """
+        clue = self.clues.get((row, col, direction))
+        if clue is not None:
+            return clue
+        across, down = self.clues_at(row, col)
+        if direction is None:
+            return across or down
+        return across if direction == 'A' else down if direction == 'D' else None
+
+    def crossings(self, clue):
+        """
+        :param clue: Clue object
+        :return: List of the Clue objects of the other direction crossing its answer, in the order they cross it
+        """
+        covering = self._covering_clues()
+        other = 'D' if clue.down_across == 'A' else 'A'
+        return [self.clues[key] for index in range(*(clue.cells or self._slice(clue)).indices(len(covering)))
+                for key in covering[index] if key[2] == other]
+
+    def clue_cells(self, clue):
+        """
+        :param clue: Clue object
+        :return: slice of the squares of its answer, indexing the bytes of state() or a copy of them
+        """
+        return clue.cells or self._slice(clue)
+
+    def letters(self, clue):
+        """
+        :param clue: Clue object
+        :return: String of the letters and blanks now in the squares of its answer
+        """
+        return self._cells[clue.cells or self._slice(clue)].decode('ascii')
+
+    def last_change(self):
+        """
+        What the last guess, reveal, undo, redo or square written did to the board
+        :return: Tuple of the slice of the squares written, as clue_cells gives it, the bytes they held
+        before and the bytes written, or None if the last write changed nothing
+        """
+        return self._changed
+
+    def changed_clues(self):
+        """
+        Clues with a letter changed by the last guess, reveal, undo or redo, so that only those need
+        to be checked again. A guess that changes crossing letters lists the crossing clues too
+        :return: List of Clue objects in the order of the squares changed
+        """
+        if self._changed is None:
+            return []
+        cells, old, new = self._changed
+        covering = self._covering_clues()
+        changed = dict()
+        for index, before, after in zip(range(*cells.indices(len(covering))), old, new):
+            if before != after:
+                for key in covering[index]:
+                    changed[key] = self.clues[key]
+        return list(changed.values())
+
+    def _open_squares(self):
+        """
+        Reset the board to blanks on every open square of the answer key, with an empty journal
+        """
+        self._cells = self._key.translate(_OPEN_SQUARES)
+        self._wrong = len(self._key) - self._key.count(BLOCK_CODE) - self._key.count(BLANK_CODE)
+        self._header = None
+        self._lines = None
+        self._journal = None
+        self._changed = None
+
+    def _count_wrong(self):
+        """
+        Recount the open squares whose letter differs from the answer key
+        """
+        self._wrong = self._wrong_squares(True).count(1)
+
+    def _wrong_squares(self, open_only):
+        """
+        :param open_only: Leave out blocked out squares, which only need to be looked at when something
+        was written over one
+        :return: bytes of 1 for every square whose letter differs from the answer key and 0 for every other
+        """
+        size = len(self._key)
+        wrong = int.from_bytes(self._cells, 'little') ^ int.from_bytes(self._key, 'little')
+        if open_only:
+            wrong &= int.from_bytes(self._key.translate(_OPEN), 'little')
+        return wrong.to_bytes(size, 'little').translate(_DIFFERENT)
+
+    def _write(self, index, letter):
+        """
+        Store one square of the board as a step of the journal
+        :param index: Flat index into the board buffer
+        :param letter: Byte value to store
+        """
+        old = self._cells[index]
+        if old == letter:
+            self._changed = None
+        else:
+            old, letter = bytes((old,)), bytes((letter,))
+            self.journal.record(index, 1, old, letter)
+            self._store(slice(index, index + 1, 1), old, letter)
+
+    def _slice(self, clue):
+        """
+        Work out the slice of the board buffer covered by a clue's answer
+        :param clue: Clue object
+        :return: slice with step 1 for across clues and step cols for down clues
+        """
+        start = clue.indices[0] * self.cols + clue.indices[1]
+        step = 1 if clue.down_across == 'A' else self.cols
+        stop = start + len(clue.answer) * step
+        cells = _SLICES.get((start, stop, step))
+        if cells is None:
+            cells = _SLICES[(start, stop, step)] = slice(start, stop, step)
+        return cells
+
+    def _write_clue(self, clue, letters):
+        """
+        Overwrite every square of a clue at once as a step of the journal.
+        Clues that were not loaded by this crossword have their slice worked out on the fly
+        :param clue: Clue object
+        :param letters: bytes of the same length as the clue's answer
+        """
+        cells = clue.cells or self._slice(clue)
+        old = self._cells[cells]
+        if old == letters:
+            self._changed = None
+        else:
+            journal = self._journal or self.journal
+            journal.record(cells.start, cells.step, old, letters)
+            self._store(cells, old, letters)
+
+    def _store(self, cells, old, letters):
+        """
+        Overwrite a run of squares without journalling it, keeping the count of wrong squares up to date
+        and throwing away the rendered text of the rows it touches
+        :param cells: slice of the board buffer
+        :param old: bytes currently in those squares
+        :param letters: bytes to store, of the same length
+        """
+        answer = self._key[cells]
+        # clue runs never cross a blocked out square, only a square written on its own can be one
+        if answer != _BLOCKED_ANSWER:
+            # runs are mostly all right or all blank, and the answer key has no blanks, so those
+            # are counted without going letter by letter
+            if old != answer:
+                self._wrong -= sum(map(ne, old, answer)) if old.strip(_BLANK) else len(old)
+            if letters != answer:
+                self._wrong += sum(map(ne, letters, answer)) if letters.strip(_BLANK) else len(letters)
+        self._cells[cells] = letters
+        self._changed = (cells, old, letters)
+        if self._lines is not None:
+            first = cells.start // self.cols
+            if cells.step == 1:
+                self._lines[first] = None
+            else:
+                last = cells.stop // self.cols
+                self._lines[first:last] = [None] * (last - first)
+
+    @property
+    def board(self):
+        """
+        List of lists view of the board, indexed as board[row][column]
+        :return: BoardView over the board buffer
+        """
+        return BoardView(self)
+
+    @board.setter
+    def board(self, new_board):
+        """
+        Overwrite every square of the board from a list of lists of characters
+        :param new_board: rows x cols nested sequence of one character strings
+        """
+        new_board = [list(row) for row in new_board]
+        if len(new_board) != self.rows or any(len(row) != self.cols for row in new_board):
+            raise ValueError(f"Board must be {self.rows} x {self.cols}")
+        self._cells = bytearray(_encode(letter) for row in new_board for letter in row)
+        self._count_wrong()
+        self._lines = None
+        # the journalled cells no longer describe how this board came about
+        self._journal = None
+        self._changed = None
+
+    def undo(self):
+        """
+        Put back the cells changed by the last guess, reveal or square written that is still on the board
+        :return: True if a step was undone, False if there was nothing to undo
+        """
+        journal = self._journal
+        if journal is None or not journal.can_undo():
+            self._changed = None
+            return False
+        journal.applied -= 1
+        cells, old, new = journal.step(journal.applied)
+        self._store(cells, new, old)
+        return True
+
+    def redo(self):
+        """
+        Make the last undone step again
+        :return: True if a step was redone, False if there was nothing to redo
+        """
+        journal = self._journal
+        if journal is None or not journal.can_redo():
+            self._changed = None
+            return False
+        cells, old, new = journal.step(journal.applied)
+        self._store(cells, old, new)
+        journal.applied += 1
+        return True
+
+    @property
+    def journal(self):
+        """
+        Journal of the changes made since the board was loaded or last replaced, made the first time it
+        is needed. It is replaced, not cleared, when the board is, so holding on to it tells whether that happened
+        :return: Journal object
+        """
+        journal = self._journal
+        if journal is None:
+            journal = self._journal = Journal()
+        return journal
+
+    def state(self):
+        """
+        :return: bytes of every square of the board in buffer order, ASCII letters and blanks with BLOCK_CODE
+        for blocked out squares
+        """
+        return bytes(self._cells)
+
+    def restore(self, state):
+        """
+        Put back a board saved by state(), starting an empty journal
+        :param state: bytes-like object from state() of a crossword of the same puzzle
+        """
+        if (len(state) != len(self._key) or int.from_bytes(state.translate(_BLOCKED), 'little')
+                & int.from_bytes(self._key.translate(_OPEN), 'little')):
+            raise ValueError("Saved board does not match the puzzle's blocked out squares")
+        self._cells = bytearray(state)
+        self._count_wrong()
+        self._lines = None
+        self._journal = None
+        self._changed = None
+
+    def _row_string(self, i):
+        """
+        Return row i of the board as a string of display characters
+        :param i: Row index
+        :return: String of length cols
+        """
+        start = i * self.cols
+        return self._cells[start:start + self.cols].decode('ascii').replace('#', BLOCK)
+
+    def _render_lines(self):
+        """
+        Bring the cached text of the board up to date, rendering only the rows
+        that were written to since the last time
+        :return: List of row lines, each ending in a newline
+        """
+        label = len(str(max(self.rows - 1, 0)))
+        if self._lines is None:
+            header = _HEADERS.get((self.rows, self.cols))
+            if header is None:
+                header = _HEADERS[(self.rows, self.cols)] = (
+                    ' ' * (label + 4) + ''.join(f"{j:<5}" for j in range(self.cols)).rstrip() + '\n' +
+                    ' ' * (label + 1) + '|' + "-" * (6 * self.cols - 3) + '\n')
+            self._header = header
+            self._lines = [None] * self.rows
+        lines = self._lines
+        for i, line in enumerate(lines):
+            if line is None:
+                lines[i] = f"{i:>{label}} |  " + '    '.join(self._row_string(i)) + '  \n'
+        return lines
+
+    def render(self, stream):
+        """
+        Write the same text as str(self) to a file-like object, row by row
+        :param stream: Object with a write method, such as an open text file or io.StringIO
+        """
+        lines = self._render_lines()
+        stream.write(self._header)
+        for line in lines:
+            stream.write(line)
 
     def __str__(self):
         """
@@ -91,15 +840,8 @@ class Crossword:
         where the first row and column are labeled with indices
         :return: String representation of the crossword puzzle
         """
-        board_str = '     ' + '    '.join([str(i) for i in range(CROSSWORD_DIMENSION)])
-        board_str += "\n  |" + "-"*(6*CROSSWORD_DIMENSION - 3) + '\n'
-        for i in range(CROSSWORD_DIMENSION):
-            board_str += f"{i} |"
-            for j in range(CROSSWORD_DIMENSION):
-                board_str += f"  {self.board[i][j]}  "
-            board_str += '\n'
-
-        return board_str
+        lines = self._render_lines()
+        return self._header + ''.join(lines)
 
     def __repr__(self):
         """
@@ -117,21 +859,8 @@ class Crossword:
         :param new_guess: String that will be written
         :return: Modified crossword or errors if encountered
         """
-        if len(new_guess) != len(clue.answer):
-            raise RuntimeError("Guess length does not match the length of the clue.\n")
-
-        for letter in new_guess:
-            if letter not in GUESS_CHARS:
-                raise RuntimeError("Guess contains invalid characters.\n")
-
-        i = 0
-        while i < len(clue.answer):
-            if clue.down_across == 'A':
-                self.board[clue.indices[0]][clue.indices[1] + i] = new_guess[i]
-            else:
-                self.board[clue.indices[0] + i][clue.indices[1]] = new_guess[i]
-            i += 1
-
+        validate_guess(clue, new_guess)
+        self._write_clue(clue, new_guess.encode())
         return
 
     def reveal_answer(self, clue):
@@ -141,14 +870,7 @@ class Crossword:
         :param clue: The location that will be written over
         :return: Modified crossword
         """
-
-        i = 0
-        while i < len(clue.answer):
-            if clue.down_across == 'A':
-                self.board[clue.indices[0]][clue.indices[1] + i] = clue.answer[i]
-            else:
-                self.board[clue.indices[0] + i][clue.indices[1]] = clue.answer[i]
-            i += 1
+        self._write_clue(clue, clue.answer.encode())
         return
 
     def find_wrong_letter(self, clue):
@@ -158,32 +880,107 @@ class Crossword:
         :param clue: The clue object that will be written over
         :return: The index of the first letter error in the word position
         """
-        i = 0
-        while i < len(clue.answer):
-            if clue.down_across == 'A':
-                if self.board[clue.indices[0]][clue.indices[1] + i] != clue.answer[i]:
-                    return i
+        cells = clue.cells or self._slice(clue)
+        # a blank or freshly guessed answer is usually wrong from its first square on
+        start = cells.start
+        if self._cells[start] != self._key[start]:
+            return 0
+        guess = self._cells[cells]
+        answer = clue.answer.encode()
+        if guess == answer:
+            return -1
+        i = 1
+        for letter in guess[1:]:
+            if letter != answer[i]:
+                return i
+            i += 1
+
+
+    def check(self, blanks=True):
+        """
+        Check the whole board against the answer key at once
+        :param blanks: Count squares that are still blank as wrong, as find_wrong_letter does
+        :return: Tuple of the list of (row, column) of every wrong square in board order, and a
+        dictionary of clue key -> index of the first wrong letter, for the clues that have one
+        """
+        size = len(self._key)
+        if self._wrong == 0 or size == 0:
+            return [], dict()
+        wrong = self._wrong_squares(False)
+        if wrong.count(1) != self._wrong:
+            # something was written over a blocked out square
+            wrong = self._wrong_squares(True)
+        if not blanks:
+            filled = int.from_bytes(self._cells.translate(_FILLED), 'little')
+            wrong = (int.from_bytes(wrong, 'little') & filled).to_bytes(size, 'little')
+        count = wrong.count(1)
+        if count == 0:
+            return [], dict()
+        if count * 16 < size:
+            # few enough to jump from one to the next
+            squares = []
+            i = wrong.find(1)
+            while i != -1:
+                squares.append(divmod(i, self.cols))
+                i = wrong.find(1, i + 1)
+        else:
+            squares = list(map(divmod, compress(range(size), wrong), repeat(self.cols)))
+        first_wrong = dict()
+
+        if len(squares) < len(self.clues):
+            self._first_wrong_of_squares(squares, first_wrong)
+            return squares, first_wrong
 
+        columns = dict()
+        for key, clue in self.clues.items():
+            cells = clue.cells or self._slice(clue)
+            if cells.step == 1:
+                start, line = cells.start, wrong
             else:
-                if self.board[clue.indices[0] + i][clue.indices[1]] != clue.answer[i]:
-                    return i
-            i += 1
-        return -1
+                # down clues search their column of the board, taken out once for all of its clues
+                start, column = divmod(cells.start, self.cols)
+                line = columns.get(column)
+                if line is None:
+                    line = columns[column] = wrong[column::self.cols]
+            i = line.find(1, start, start + len(clue.answer))
+            if i != -1:
+                first_wrong[key] = i - start
+        return squares, first_wrong
+
+    def _covering_clues(self):
+        """
+        Keys of the clues covering each square, worked out the first time they are needed and
+        shared with copies, so loading a puzzle does not pay for it
+        :return: List indexed like the board buffer of tuples of clue keys
+        """
+        covering = self._covering
+        if not covering:
+            built = [()] * len(self._key)
+            for key, clue in self.clues.items():
+                for index in range(*(clue.cells or self._slice(clue)).indices(len(built))):
+                    built[index] += (key,)
+            # published with a single slice assignment, so another thread sees it empty or whole, never
+            # half built. Threads that both find it empty both build it, with the same result
+            covering[:] = built
+        return covering
 
+    def _first_wrong_of_squares(self, squares, first_wrong):
+        """
+        Work out the first wrong letter of each clue from the wrong squares, for when there are
+        fewer of them than clues. Squares come in board order, so the first one found for a clue
+        is its first wrong letter
+        :param squares: List of (row, column) of the wrong squares in board order
+        :param first_wrong: Dictionary to fill with clue key -> index of the first wrong letter
+        """
+        covering, cols = self._covering_clues(), self.cols
+        for row, col in squares:
+            for key in covering[row * cols + col]:
+                if key not in first_wrong:
+                    first_wrong[key] = col - key[1] if key[2] == 'A' else row - key[0]
 
     def is_solved(self):
         """
-        goes through the rows of the columns to determine if the puzzle has any errors
+        Checks the running count of squares that do not match the answer key
         :return: True if the puzzle is completed without errors, else return false
         """
-        for item in self.clues:
-            i = 0
-            while i < len(self.clues[item].answer):
-                if self.clues[item].down_across == 'A':
-                    if self.board[self.clues[item].indices[0]][self.clues[item].indices[1] + i] != self.clues[item].answer[i]:
-                        return False
-                elif self.clues[item].down_across == 'D':
-                    if self.board[self.clues[item].indices[0] + i][self.clues[item].indices[1]] != self.clues[item].answer[i]:
-                        return False
-                i += 1
-        return True
\ No newline at end of file
+        return self._wrong == 0
@@ -0,0 +1,318 @@
+"""
+Generates new puzzles in the csv format Crossword._load reads:
+Row Index, Column Index, Down/Across, Answer, Clue.
+
+A generated puzzle starts as a square grid with blocks scattered over it
+according to a density and symmetry policy, plus blocks that break up
+runs longer than MAX_LENGTH. Its slots are filled by solver.py from a
+word list and each answer gets its clue from the list. Batches run
+across a process pool, and job n always uses seed base + n, so the same
+batch can be generated again exactly.
+
+Word list format: one "WORD,clue" per line. Words with no clue get a
+placeholder clue.
+
+Usage: python generator.py word_list.txt out_directory [--count n] [--size n]
+       [--density d] [--symmetry rotational|mirror|none] [--max-length n] [--seed n]
+       [--workers n]
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crossword import Clue, Crossword
+from solver import solve
+from word_index import LETTERS, WordIndex
+
+SYMMETRIES = ('rotational', 'mirror', 'none')
+MIN_LENGTH = 3
+MAX_ATTEMPTS = 20
+# Words tried on a layout before drawing another, a layout that fills seldom needs 100 more than its slots
+MAX_NODES = 300
+# Longest slot of a layout, longer runs of open squares get broken up by a block
+MAX_LENGTH = 9
+CSV_HEADER = ['Row Index', 'Column Index', 'Down/Across', 'Answer', 'Clue']
+
+# Word list and index loaded once per worker process
+_WORKER_STATE = dict()
+
+
+def read_clued_words(filename):
+    """
+    Read a word list with an optional clue after the first comma on each line
+    :param filename: Name of the word list file
+    :return: Dictionary of upper case word -> clue
+    """
+    clues = dict()
+    with open(filename) as word_file:
+        for line in word_file:
+            word, _, clue = line.partition(',')
+            word = word.strip().upper()
+            if word and all(letter in LETTERS for letter in word):
+                clues[word] = clue.strip() or f"Placeholder clue for {word}"
+    return clues
+
+
+def _runs(line):
+    """
+    Lengths of the open runs of one row or column
+    :param line: Sequence of booleans, True for a block
+    :return: List of run lengths
+    """
+    runs = []
+    length = 0
+    for blocked in line:
+        if blocked:
+            if length:
+                runs.append(length)
+            length = 0
+        else:
+            length += 1
+    if length:
+        runs.append(length)
+    return runs
+
+
+def _valid(blocks, size):
+    """
+    Check a block layout: no run of 2 and no open square outside of every word
+    :param blocks: size x size list of lists of booleans
+    :param size: Grid size
+    :return: True if the layout can be used
+    """
+    columns = [[blocks[r][c] for r in range(size)] for c in range(size)]
+    for line in blocks + columns:
+        if any(1 < length < MIN_LENGTH for length in _runs(line)):
+            return False
+    for r in range(size):
+        for c in range(size):
+            if blocks[r][c]:
+                continue
+            across = (c > 0 and not blocks[r][c - 1]) or (c < size - 1 and not blocks[r][c + 1])
+            down = (r > 0 and not blocks[r - 1][c]) or (r < size - 1 and not blocks[r + 1][c])
+            if not across and not down:
+                return False
+    return True
+
+
+def _squares(r, c, size, symmetry):
+    """
+    :param r: Row of a square
+    :param c: Column of a square
+    :param size: Grid size
+    :param symmetry: One of SYMMETRIES
+    :return: Set of the square and its symmetric partner, if any
+    """
+    if symmetry == 'rotational':
+        return {(r, c), (size - 1 - r, size - 1 - c)}
+    if symmetry == 'mirror':
+        return {(r, c), (r, size - 1 - c)}
+    return {(r, c)}
+
+
+def _long_runs(blocks, size, max_length):
+    """
+    :param blocks: size x size list of lists of booleans
+    :param size: Grid size
+    :param max_length: Longest run allowed
+    :return: List of the squares of every longer run, longest first
+    """
+    runs = []
+    for r in range(size):
+        for c in range(size):
+            if blocks[r][c]:
+                continue
+            if c == 0 or blocks[r][c - 1]:
+                end = next((j for j in range(c, size) if blocks[r][j]), size)
+                if end - c > max_length:
+                    runs.append([(r, j) for j in range(c, end)])
+            if r == 0 or blocks[r - 1][c]:
+                end = next((i for i in range(r, size) if blocks[i][c]), size)
+                if end - r > max_length:
+                    runs.append([(i, c) for i in range(r, end)])
+    runs.sort(key=len, reverse=True)
+    return runs
+
+
+def make_grid(size, density, symmetry, rng, max_length=None):
+    """
+    Scatter blocks over an empty grid
+    :param size: Number of rows and columns
+    :param density: Target fraction of blocked squares
+    :param symmetry: One of SYMMETRIES
+    :param rng: random.Random used for block placement
+    :param max_length: Optional longest slot. Longer runs get an extra block where the layout stays valid,
+    a run with no such square is left as it is
+    :return: size x size list of lists of booleans, True for a block
+    """
+    if symmetry not in SYMMETRIES:
+        raise ValueError(f"Unknown symmetry {symmetry!r}, expected one of {SYMMETRIES}")
+    blocks = [[False] * size for _ in range(size)]
+    target = int(density * size * size)
+    placed = 0
+    for _ in range(size * size * 4):
+        if placed >= target:
+            break
+        squares = _squares(rng.randrange(size), rng.randrange(size), size, symmetry)
+        if any(blocks[i][j] for i, j in squares):
+            continue
+        for i, j in squares:
+            blocks[i][j] = True
+        if _valid(blocks, size):
+            placed += len(squares)
+        else:
+            for i, j in squares:
+                blocks[i][j] = False
+
+    if max_length is None:
+        return blocks
+    # runs that cannot be broken, every block placed shortens some run so this ends
+    kept = set()
+    while True:
+        runs = [run for run in _long_runs(blocks, size, max_length) if run[0] + run[-1] not in kept]
+        if not runs:
+            return blocks
+        run = runs[0]
+        for r, c in rng.sample(run, len(run)):
+            squares = _squares(r, c, size, symmetry)
+            if any(blocks[i][j] for i, j in squares):
+                continue
+            for i, j in squares:
+                blocks[i][j] = True
+            if _valid(blocks, size):
+                break
+            for i, j in squares:
+                blocks[i][j] = False
+        else:
+            kept.add(run[0] + run[-1])
+
+
+def grid_clues(blocks):
+    """
+    Build placeholder clues for every slot of a block layout
+    :param blocks: List of lists of booleans, True for a block
+    :return: List of Clue objects with blank answers
+    """
+    size = len(blocks)
+    clues = []
+    for r in range(size):
+        for c in range(size):
+            if blocks[r][c]:
+                continue
+            if (c == 0 or blocks[r][c - 1]) and c + 1 < size and not blocks[r][c + 1]:
+                length = next((j for j in range(c, size) if blocks[r][j]), size) - c
+                clues.append(Clue((r, c), 'A', '_' * length, ''))
+            if (r == 0 or blocks[r - 1][c]) and r + 1 < size and not blocks[r + 1][c]:
+                length = next((i for i in range(r, size) if blocks[i][c]), size) - r
+                clues.append(Clue((r, c), 'D', '_' * length, ''))
+    return clues
+
+
+def generate_puzzle(size, density, symmetry, seed, index, clues, max_length=MAX_LENGTH):
+    """
+    Generate one filled puzzle, retrying with new layouts when a fill is not found quickly
+    :param size: Number of rows and columns
+    :param density: Target fraction of blocked squares
+    :param symmetry: One of SYMMETRIES
+    :param seed: Seed of this puzzle
+    :param index: WordIndex of the word list
+    :param clues: Dictionary of word -> clue
+    :param max_length: Longest slot, None for no limit
+    :return: List of csv rows, or None if no attempt could be filled
+    """
+    rng = random.Random(seed)
+    for _ in range(MAX_ATTEMPTS):
+        layout = grid_clues(make_grid(size, density, symmetry, rng, max_length))
+        if not layout:
+            continue
+        result = solve(Crossword.from_clues(layout), index, seed, MAX_NODES)
+        if result.solved:
+            return [[key[0], key[1], key[2], word, clues[word]] for key, word in sorted(result.words.items())]
+    return None
+
+
+def write_puzzle(filename, rows):
+    """
+    Write a puzzle in the csv format Crossword reads
+    :param filename: Name of the csv file to write
+    :param rows: List of [row, column, A/D, answer, clue] lists
+    """
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+
+
+def _init_worker(word_file, seed):
+    clues = read_clued_words(word_file)
+    _WORKER_STATE['clues'] = clues
+    _WORKER_STATE['index'] = WordIndex(clues, seed)
+
+
+def _generate_job(job):
+    """
+    Generate and write one puzzle inside a worker process
+    :param job: Tuple of job number, seed, size, density, symmetry, longest slot and output directory
+    :return: Tuple of job number and the written file name, or None on failure
+    """
+    number, seed, size, density, symmetry, max_length, out_dir = job
+    rows = generate_puzzle(size, density, symmetry, seed, _WORKER_STATE['index'], _WORKER_STATE['clues'],
+                           max_length)
+    if rows is None:
+        return number, None
+    filename = os.path.join(out_dir, f"puzzle_{seed}.csv")
+    write_puzzle(filename, rows)
+    return number, filename
+
+
+def generate_batch(word_file, out_dir, count, size=5, density=0.16, symmetry='rotational',
+                   base_seed=0, workers=None, max_length=MAX_LENGTH):
+    """
+    Generate a batch of puzzle files across a process pool. Job n uses seed base_seed + n
+    :param word_file: Name of the word list file
+    :param out_dir: Directory the puzzle files are written to
+    :param count: Number of puzzles to attempt
+    :param size: Number of rows and columns
+    :param density: Target fraction of blocked squares
+    :param symmetry: One of SYMMETRIES
+    :param base_seed: Seed of the first job
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param max_length: Longest slot, None for no limit
+    :return: Tuple of the list of written files (in job order) and elapsed seconds
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(n, base_seed + n, size, density, symmetry, max_length, out_dir) for n in range(count)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(word_file, base_seed)) as pool:
+        results = sorted(pool.map(_generate_job, jobs))
+    elapsed = time.perf_counter() - start
+    return [filename for _, filename in results if filename is not None], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate crossword puzzle files")
+    parser.add_argument('word_file', help="word list, one WORD,clue per line")
+    parser.add_argument('out_dir', help="directory to write puzzles to")
+    parser.add_argument('--count', type=int, default=10)
+    parser.add_argument('--size', type=int, default=5)
+    parser.add_argument('--density', type=float, default=0.16)
+    parser.add_argument('--symmetry', choices=SYMMETRIES, default='rotational')
+    parser.add_argument('--max-length', type=int, default=MAX_LENGTH, help="longest slot")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    files, elapsed = generate_batch(args.word_file, args.out_dir, args.count, args.size, args.density,
+                                    args.symmetry, args.seed, args.workers, args.max_length)
+    rate = len(files) / elapsed if elapsed else 0.0
+    print(f"Generated {len(files)} of {args.count} puzzles in {elapsed:.2f}s: "
+          f"{rate:.1f} puzzles/s, {rate / args.workers:.1f} puzzles/s per core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Load generator for the game loop. Spawns synthetic players, each one a
+server.Session of its own on a puzzle shared through a PuzzleLibrary,
+the same objects a server node holds per connection, and has them type
+proj07 commands: mostly guesses and hints, some clue listings and
+reveals, and a share of the invalid input input3.txt is made of, such
+as clues that do not exist, bad directions, missing arguments and
+guesses of the wrong length or with punctuation in them.
+
+Players are spread over processes and threads. Each thread plays its
+players in turn, every player waiting its think time (random, with the
+given mean) between commands, so a few threads can hold many thousands
+of mostly idle sessions the way a node would. A player whose game ends
+starts another one.
+
+Reported: commands per second, latency percentiles per kind of command
+(from metrics.Histogram, so accurate to about 19%), how late commands
+ran compared with when their player meant to send them, and the memory
+a session holds, traced over a batch of sessions played for a while,
+along with each process's peak RSS.
+
+Usage: python load_generator.py [--players n] [--processes n] [--threads n]
+       [--seconds s] [--think s] [--puzzle file ...] [--output results.json]
+"""
+
+import argparse
+import heapq
+import json
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from metrics import QUANTILES, Histogram
+from server import PuzzleLibrary, Session
+
+# Relative weights of what a player types at the option prompt
+MIX = (('G', 45), ('T', 20), ('C', 10), ('invalid', 15), ('R', 4), ('H', 1), ('P', 3), ('U', 2))
+INVALID_LINES = ("", "X", "C 2 3", "G 0 2 S", "R 0 2", "T 1", "G a b A", "Q now")
+GUESS_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MEMORY_SESSIONS = 2000
+MEMORY_COMMANDS = 20
+
+_KINDS = [kind for kind, _ in MIX]
+_CUMULATIVE = list(accumulate(weight for _, weight in MIX))
+
+
+class Player:
+    __slots__ = ('rng', 'library', 'puzzles', 'session', 'games', 'kind')
+
+    def __init__(self, library, puzzles, seed):
+        """
+        One synthetic player, typing into a session of its own
+        :param library: PuzzleLibrary the sessions open their puzzles from
+        :param puzzles: List of puzzle file names to pick from for each game
+        :param seed: Seed of the player's choices
+        """
+        self.rng = random.Random(seed)
+        self.library = library
+        self.puzzles = puzzles
+        self.session = None
+        self.games = 0
+        self.kind = None
+
+    def next_line(self):
+        """
+        Work out the player's next line of input, starting a new game if there is none going on.
+        The kind of command it is goes into the kind attribute
+        :return: Line to feed to the session
+        """
+        if self.session is None or self.session.closed:
+            self.session = Session(self.library)
+            self.session.start()
+            self.games += 1
+            self.kind = 'open'
+            return self.rng.choice(self.puzzles)
+
+        game, rng = self.session.game, self.rng
+        if game.guess_clue is not None:
+            self.kind = 'guess'
+            return self._guess(game.guess_clue.answer)
+
+        kind = rng.choices(_KINDS, cum_weights=_CUMULATIVE)[0]
+        self.kind = kind
+        if kind == 'invalid':
+            return rng.choice(INVALID_LINES) if rng.random() < 0.5 else f"{rng.choice('GRT')} {self._bad_square()}"
+        if kind == 'C':
+            return rng.choice(("C 0", f"C {rng.randint(1, 5)}"))
+        if kind in 'GRT':
+            row, col, direction = rng.choice(list(game.puzzle.clues))
+            if kind == 'T' or rng.random() < 0.5:
+                return f"{kind} {row} {col} {direction}"
+            # any square of the answer, with or without its direction
+            offset = rng.randrange(len(game.puzzle.clues[(row, col, direction)].answer))
+            row, col = (row, col + offset) if direction == 'A' else (row + offset, col)
+            return f"{kind} {row} {col}" + (f" {direction}" if rng.random() < 0.5 else "")
+        return kind
+
+    def _bad_square(self):
+        """
+        :return: Clue arguments that do not name a clue, like the ones input3.txt tries
+        """
+        puzzle, rng = self.session.game.puzzle, self.rng
+        row, col = rng.choice(((-1, rng.randrange(puzzle.cols)), (puzzle.rows, rng.randrange(puzzle.cols)),
+                               (rng.randrange(puzzle.rows), -1), (rng.randrange(puzzle.rows), puzzle.cols)))
+        return f"{row} {col} {rng.choice('ADS')}"
+
+    def _guess(self, answer):
+        """
+        :return: Guess line for an answer: mostly right with a few letters wrong or left blank,
+        sometimes in lower case, and now and then of the wrong length or with punctuation
+        """
+        rng = self.rng
+        chance = rng.random()
+        if chance < 0.05:
+            return answer[:-1] or 'AB'
+        if chance < 0.08:
+            return ','.join(answer.lower())
+        letters = [letter if rng.random() < 0.8 else rng.choice(GUESS_LETTERS + '_') for letter in answer]
+        guess = ''.join(letters)
+        return guess.lower() if rng.random() < 0.3 else guess
+
+
+def play(players, start, deadline, think, seed):
+    """
+    Play a list of players from one thread until the time is up
+    :param players: List of Player objects
+    :param start: time.perf_counter() time to start playing at
+    :param deadline: time.perf_counter() time to stop at
+    :param think: Mean seconds a player waits between commands, 0 to not wait
+    :param seed: Seed of the think times
+    :return: Tuple of the dictionary of command kind -> Histogram of latencies and the Histogram of lateness
+    """
+    rng = random.Random(seed)
+    latencies, lateness = dict(), Histogram()
+    clock = time.perf_counter
+    # (time the player's next command is due, player number)
+    due = [(start + (rng.expovariate(1 / think) if think else 0.0), i) for i in range(len(players))]
+    heapq.heapify(due)
+    while due:
+        when, i = due[0]
+        now = clock()
+        if when > deadline:
+            break
+        if when > now:
+            time.sleep(when - now)
+            now = clock()
+        player = players[i]
+        line = player.next_line()
+        before = clock()
+        player.session.feed(line)
+        after = clock()
+        histogram = latencies.get(player.kind)
+        if histogram is None:
+            histogram = latencies[player.kind] = Histogram()
+        histogram.observe(after - before)
+        lateness.observe(max(before - when, 0.0))
+        heapq.heapreplace(due, (after + (rng.expovariate(1 / think) if think else 0.0), i))
+    return latencies, lateness
+
+
+def run_process(first, count, threads, seconds, think, puzzles, root):
+    """
+    Play count players, numbered from first, across threads of this process. Runs in the worker processes
+    :return: Tuple of {kind: (bucket counts, count, total)}, the lateness in the same form, the number
+    of games started, the peak RSS of the process in KiB and the seconds it played for
+    """
+    library = PuzzleLibrary(root)
+    for puzzle in puzzles:
+        library.open(puzzle)
+    players = [Player(library, puzzles, first + i) for i in range(count)]
+    results = [None] * threads
+
+    def run(thread):
+        results[thread] = play(players[thread::threads], start, start + seconds, think, first + thread)
+
+    workers = [threading.Thread(target=run, args=(thread,)) for thread in range(threads)]
+    # every thread plays the same stretch of time, however long they take to get going
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    latencies, lateness = dict(), Histogram()
+    for thread_latencies, thread_lateness in results:
+        for kind, histogram in thread_latencies.items():
+            _add(latencies.setdefault(kind, Histogram()), histogram)
+        _add(lateness, thread_lateness)
+    played = time.perf_counter() - start
+    return ({kind: _dump(histogram) for kind, histogram in latencies.items()}, _dump(lateness),
+            sum(player.games for player in players), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, played)
+
+
+def _dump(histogram):
+    return histogram.counts, histogram.count, histogram.total
+
+
+def _add(histogram, other):
+    """
+    Add the observations of one histogram, or of its _dump, into another
+    """
+    counts, count, total = other if isinstance(other, tuple) else _dump(other)
+    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+    histogram.count += count
+    histogram.total += total
+
+
+def session_memory(puzzles, root, sessions=MEMORY_SESSIONS, commands=MEMORY_COMMANDS):
+    """
+    Measure the memory a session holds once it has been played for a while. The puzzles
+    are loaded first, since their clues and answer keys are shared by every session
+    :param puzzles: List of puzzle file names
+    :param root: Directory they are in
+    :param sessions: Number of sessions to measure over
+    :param commands: Number of commands each one plays
+    :return: Average traced bytes per session
+    """
+    library = PuzzleLibrary(root)
+    for puzzle in puzzles:
+        library.open(puzzle)
+    players = [Player(library, puzzles, seed) for seed in range(sessions)]
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for player in players:
+        for _ in range(commands):
+            line = player.next_line()
+            player.session.feed(line)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - before) / sessions
+
+
+def _percentiles(histogram):
+    return {f"p{round(quantile * 100)}": histogram.percentile(quantile) for quantile in QUANTILES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many synthetic players against the game loop")
+    parser.add_argument('--players', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=4, help="threads per process")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--think', type=float, default=0.0, help="mean seconds between a player's commands")
+    parser.add_argument('--puzzle', nargs='+', default=['meal.csv', 'vowel.csv', 'monopoly.csv'],
+                        help="puzzle files, or pack_file#puzzle_id names, relative to --root")
+    parser.add_argument('--root', default='.')
+    parser.add_argument('--output', help="file to write the results to as JSON")
+    args = parser.parse_args()
+
+    library = PuzzleLibrary(args.root)
+    missing = [puzzle for puzzle in args.puzzle if library.open(puzzle) is None]
+    if missing:
+        print(f"Cannot load {', '.join(missing)}")
+        return 1
+
+    per_session = session_memory(args.puzzle, args.root)
+    processes = min(args.processes, args.players)
+    shares = [args.players // processes + (i < args.players % processes) for i in range(processes)]
+    firsts = [sum(shares[:i]) for i in range(processes)]
+    jobs = [(first, share, max(min(args.threads, share), 1), args.seconds, args.think, args.puzzle, args.root)
+            for first, share in zip(firsts, shares)]
+    if processes == 1:
+        results = [run_process(*jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(run_process, *zip(*jobs)))
+    elapsed = max(result[4] for result in results)
+
+    latencies, lateness = dict(), Histogram()
+    for process_latencies, process_lateness, _, _, _ in results:
+        for kind, dumped in process_latencies.items():
+            _add(latencies.setdefault(kind, Histogram()), dumped)
+        _add(lateness, process_lateness)
+    total = sum(histogram.count for histogram in latencies.values())
+    games = sum(result[2] for result in results)
+    rss = [result[3] for result in results]
+
+    print(f"{args.players} players on {processes} process(es) x {jobs[0][2]} thread(s), "
+          f"think {args.think}s, {elapsed:.2f}s")
+    print(f"{total} commands, {total / elapsed:.0f} commands/s, {games} games started")
+    print(f"{'command':>8} {'count':>9} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for kind, histogram in sorted(latencies.items(), key=lambda item: -item[1].count):
+        print(f"{kind:>8} {histogram.count:>9} " +
+              ' '.join(f"{histogram.percentile(quantile) * 1e6:>9.1f}" for quantile in QUANTILES))
+    print(f"{'late':>8} {lateness.count:>9} " +
+          ' '.join(f"{lateness.percentile(quantile) * 1e6:>9.1f}" for quantile in QUANTILES))
+    print(f"memory per session: {per_session / 1024:.1f} KiB; peak RSS per process: "
+          f"{', '.join(f'{kib / 1024:.0f} MiB' for kib in rss)}")
+
+    if args.output:
+        report = {
+            'players': args.players, 'processes': processes, 'threads': jobs[0][2], 'think': args.think,
+            'seconds': elapsed, 'commands': total, 'commands_per_second': total / elapsed, 'games': games,
+            'latency_seconds': {kind: dict(count=histogram.count, **_percentiles(histogram))
+                                for kind, histogram in latencies.items()},
+            'lateness_seconds': _percentiles(lateness),
+            'memory_per_session_bytes': per_session, 'peak_rss_kib': rss,
+        }
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Memory report for clue storage. Builds a synthetic corpus of puzzles
+the way _load sees them (every field a freshly parsed string) and uses
+tracemalloc to measure the bytes held per clue by the original dict
+based Clue (old_crossword.py) and the slotted, interned crossword.Clue
+
+Usage: python memory_report.py [number of puzzles]
+"""
+
+import random
+import sys
+import tracemalloc
+
+import crossword
+import old_crossword
+
+DEFAULT_PUZZLES = 100000
+CLUES_PER_PUZZLE = 10
+VOCABULARY = 5000
+SEED = 231
+
+
+def synthetic_rows(puzzles):
+    """
+    Generate the fields of every clue in a synthetic corpus. Answers and clue
+    descriptions are drawn from a fixed vocabulary, as real corpora repeat
+    them, but every value is a new string object like a csv reader returns
+    :param puzzles: Number of puzzles in the corpus
+    :return: Generator of (indices, down_across, answer, clue) tuples
+    """
+    rng = random.Random(SEED)
+    for _ in range(puzzles):
+        for i in range(CLUES_PER_PUZZLE):
+            word = rng.randrange(VOCABULARY)
+            down_across = 'A' if i % 2 == 0 else 'D'
+            answer = ''.join(chr(65 + int(digit)) for digit in f"{word:05d}")
+            clue = ' '.join(["Synthetic clue number", str(word)])
+            yield (i // 2, i % 5), ''.join([down_across]), answer, clue
+
+
+def bytes_per_clue(clue_class, puzzles):
+    """
+    Measure the memory held by a corpus of clues built with the given class
+    :param clue_class: Clue class taking (indices, down_across, answer, clue)
+    :param puzzles: Number of puzzles in the corpus
+    :return: Average traced bytes per clue
+    """
+    tracemalloc.start()
+    corpus = [clue_class(*row) for row in synthetic_rows(puzzles)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(corpus)
+
+
+def main(puzzles):
+    clues = puzzles * CLUES_PER_PUZZLE
+    before = bytes_per_clue(old_crossword.Clue, puzzles)
+    after = bytes_per_clue(crossword.Clue, puzzles)
+    print(f"{puzzles} puzzles, {clues} clues")
+    print(f"before (dict Clue, private strings): {before:8.1f} bytes per clue, {before * clues / 2**20:8.1f} MiB")
+    print(f"after (slotted Clue, interned):      {after:8.1f} bytes per clue, {after * clues / 2**20:8.1f} MiB")
+    print(f"reduction: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PUZZLES)
@@ -0,0 +1,392 @@
+"""
+Opt-in instrumentation for the game. Nothing here runs until enable()
+is called: it wraps the Crossword methods, proj07's open_puzzle,
+validate, input and main, and commands.Game's dispatch, and disable()
+puts the originals back. With instrumentation off the game runs exactly
+the code it always did.
+
+Recorded:
+    per command counts and latency (proj07.main and commands.Game),
+    excluding time spent waiting for the player's input, labelled by
+    option letter, 'invalid' for a command that was not valid and
+    'other' for anything that was not an option letter at all
+    commands validated and invalid commands, by option letter, and the
+    invalid rate
+    puzzle load times from open_puzzle, and failed loads
+    latency of each Crossword method
+
+Latencies go into histograms with buckets 2**(1/4) apart, so p50, p95
+and p99 are accurate to about 19%. A background thread writes a
+snapshot to a local file every few seconds and once more at exit, as
+JSON or, for a file name ending in .prom, in the Prometheus text format.
+
+To turn it on for proj07.py, commands.py or server.py, set
+XWORD_METRICS to the snapshot file name (and optionally
+XWORD_METRICS_INTERVAL to the number of seconds between snapshots).
+server.py with several workers should use {pid} in the file name so
+each process writes its own snapshot.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+
+ENV_PATH = 'XWORD_METRICS'
+ENV_INTERVAL = 'XWORD_METRICS_INTERVAL'
+QUANTILES = (0.5, 0.95, 0.99)
+CROSSWORD_METHODS = ('__init__', 'change_guess', 'reveal_answer', 'find_wrong_letter', 'is_solved',
+                     '__str__', 'render', 'undo', 'redo', 'check')
+PROJ07_COMMANDS = frozenset('CGRTHSQUYP')
+
+# Histogram bucket upper bounds in seconds, from 100ns to about 100s
+BOUNDS = [1e-7 * 2 ** (i / 4) for i in range(121)]
+
+clock = time.perf_counter
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        """
+        Latency histogram over BOUNDS, with one overflow bucket
+        """
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        """
+        :param seconds: One latency
+        """
+        self.counts[bisect.bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, quantile):
+        """
+        :param quantile: Between 0 and 1
+        :return: Upper bound of the bucket holding that quantile, in seconds, 0.0 when empty
+        """
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BOUNDS[i] if i < len(BOUNDS) else float('inf')
+        return BOUNDS[-1]
+
+
+class Registry:
+    def __init__(self):
+        """
+        Counters and histograms, keyed by (metric name, label)
+        """
+        self.counters = dict()
+        self.histograms = dict()
+        self.started = time.time()
+
+    def inc(self, name, label='', amount=1):
+        key = (name, label)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, label, seconds):
+        key = (name, label)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def snapshot(self):
+        """
+        :return: Dictionary of everything recorded so far, ready for json.dump
+        """
+        counters = dict()
+        for (name, label), value in list(self.counters.items()):
+            counters.setdefault(name, dict())[label] = value
+        histograms = dict()
+        for (name, label), histogram in list(self.histograms.items()):
+            summary = {'count': histogram.count, 'sum': histogram.total}
+            for quantile in QUANTILES:
+                summary[f"p{round(quantile * 100)}"] = histogram.percentile(quantile)
+            histograms.setdefault(name, dict())[label] = summary
+        checked = sum(counters.get('validations_total', {}).values())
+        invalid = sum(counters.get('invalid_commands_total', {}).values())
+        return {
+            'time': time.time(),
+            'uptime_seconds': time.time() - self.started,
+            'counters': counters,
+            'latency_seconds': histograms,
+            'invalid_command_rate': invalid / checked if checked else 0.0,
+        }
+
+    def prometheus(self):
+        """
+        :return: Everything recorded so far in the Prometheus text format, histograms as summaries
+        """
+        lines = []
+        for (name, label), value in sorted(list(self.counters.items())):
+            lines.append(f"xword_{name}{_labels(label)} {value}")
+        for (name, label), histogram in sorted(list(self.histograms.items())):
+            for quantile in QUANTILES:
+                lines.append(f"xword_{name}_seconds{_labels(label, quantile)} {histogram.percentile(quantile):.9g}")
+            lines.append(f"xword_{name}_seconds_sum{_labels(label)} {histogram.total:.9g}")
+            lines.append(f"xword_{name}_seconds_count{_labels(label)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(label, quantile=None):
+    pairs = []
+    if label:
+        value = label.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'name="{value}"')
+    if quantile is not None:
+        pairs.append(f'quantile="{quantile}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+REGISTRY = Registry()
+
+# (owner, attribute name, original) for everything enable() replaced
+_PATCHES = []
+_EXPORTER = None
+
+
+def _patch(owner, name, wrapper):
+    _PATCHES.append((owner, name, getattr(owner, name)))
+    setattr(owner, name, wrapper)
+
+
+def _timed_method(name, method):
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            REGISTRY.observe('crossword_method', name, clock() - start)
+
+    timed.__name__ = method.__name__
+    timed.__doc__ = method.__doc__
+    return timed
+
+
+class _CommandTimer:
+    def __init__(self):
+        """
+        Works out proj07.main's command latencies from its input calls. A command runs from
+        the input that read it to the next option prompt, less the time spent waiting in
+        input calls for guesses or file names in between
+        """
+        self.name = None
+        self.started = 0.0
+        self.waited = 0.0
+
+    def finish(self, now):
+        if self.name is not None:
+            REGISTRY.inc('commands_total', self.name)
+            REGISTRY.observe('command', self.name, now - self.started - self.waited)
+            self.name = None
+
+
+def _instrument_proj07(proj07, option_prompt):
+    timer = _CommandTimer()
+    original_input, original_open, original_validate, original_main = \
+        proj07.input, proj07.open_puzzle, proj07.validate, proj07.main
+
+    def input(prompt=None):
+        before = clock()
+        if prompt == option_prompt:
+            timer.finish(before)
+        line = original_input(prompt)
+        after = clock()
+        if prompt == option_prompt:
+            tokens = line.split()
+            timer.name = tokens[0] if tokens and tokens[0] in PROJ07_COMMANDS else 'other'
+            timer.started, timer.waited = after, 0.0
+        else:
+            timer.waited += after - before
+        return line
+
+    def open_puzzle(filename):
+        start = clock()
+        puzzle = original_open(filename)
+        REGISTRY.observe('puzzle_load', '', clock() - start)
+        if puzzle is None:
+            REGISTRY.inc('puzzle_load_failures_total')
+        return puzzle
+
+    def validate(puzzle, option_lst):
+        valid = original_validate(puzzle, option_lst)
+        option = _option(option_lst[0] if option_lst else '')
+        REGISTRY.inc('validations_total', option)
+        if valid is not True:
+            REGISTRY.inc('invalid_commands_total', option)
+            timer.name = 'invalid'
+        return valid
+
+    def main():
+        try:
+            return original_main()
+        finally:
+            timer.finish(clock())
+
+    for name, wrapper in (('input', input), ('open_puzzle', open_puzzle), ('validate', validate), ('main', main)):
+        _patch(proj07, name, wrapper)
+
+
+def _instrument_game(commands):
+    game = commands.Game
+    original_feed, original_invalid, original_open = game.feed, game._invalid, game._open
+    # game -> [label, seconds so far] of a command still waiting for a guess or file name
+    pending = weakref.WeakKeyDictionary()
+
+    def feed(self, command):
+        start = clock()
+        state = pending.pop(self, None)
+        if state is None and self.puzzle is not None and self.guess_clue is None:
+            # an option line, labelled by its option letter as proj07 labels it
+            state = [_option(command.text), 0.0]
+            REGISTRY.inc('validations_total', state[0])
+            if type(command) is commands.Invalid:
+                REGISTRY.inc('invalid_commands_total', state[0])
+                state[0] = 'invalid'
+        if state is not None:
+            pending[self] = state
+        original_feed(self, command)
+        if state is None:
+            # the file name the game starts with is a puzzle load, not a command
+            return
+        state[1] += clock() - start
+        if self.closed or (self.puzzle is not None and self.guess_clue is None):
+            del pending[self]
+            REGISTRY.inc('commands_total', state[0])
+            REGISTRY.observe('command', state[0], state[1])
+
+    def _invalid(self, command):
+        # reached through the handlers of G/R/T commands whose clue does not exist
+        REGISTRY.inc('invalid_commands_total', _option(command.text))
+        state = pending.get(self)
+        if state is not None:
+            state[0] = 'invalid'
+        original_invalid(self, command)
+
+    def _open(self, filename):
+        start = clock()
+        original_open(self, filename)
+        REGISTRY.observe('puzzle_load', '', clock() - start)
+        if self.puzzle is None:
+            REGISTRY.inc('puzzle_load_failures_total')
+
+    for name, wrapper in (('feed', feed), ('_invalid', _invalid), ('_open', _open)):
+        _patch(game, name, wrapper)
+
+
+def _option(text):
+    """
+    Label of a command in the invalid command counts. Anything the player typed that is not an
+    option letter counts as 'other', so the number of labels stays bounded however long the game runs
+    :param text: Line of input, or its first word
+    :return: Option letter or 'other'
+    """
+    words = text.split()
+    return words[0] if words and words[0] in PROJ07_COMMANDS else 'other'
+
+
+def write_snapshot(path):
+    """
+    Write the current snapshot, replacing the file atomically
+    :param path: File name; a name ending in .prom gets the Prometheus text format, anything else JSON
+    """
+    if path.endswith('.prom'):
+        text = REGISTRY.prometheus()
+    else:
+        text = json.dumps(REGISTRY.snapshot(), indent=2) + '\n'
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as snapshot_file:
+        snapshot_file.write(text)
+    os.replace(temporary, path)
+
+
+class _Exporter(threading.Thread):
+    def __init__(self, path, interval):
+        super().__init__(name='metrics-exporter', daemon=True)
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            write_snapshot(self.path)
+
+    def stop(self):
+        self.stopped.set()
+        write_snapshot(self.path)
+
+
+def enabled():
+    """
+    :return: True while instrumentation is installed
+    """
+    return bool(_PATCHES)
+
+
+def enable(path=None, interval=10.0, program=None, game=None):
+    """
+    Install the instrumentation. Calling it again while enabled does nothing
+    :param path: Optional file name snapshots are written to, see write_snapshot. {pid} in
+    it is replaced by the process id, for servers running several processes
+    :param interval: Seconds between snapshots
+    :param program: Module whose main loop to instrument, defaults to proj07. Pass
+    sys.modules['__main__'] when proj07.py is being run as a script
+    :param game: Module whose Game to instrument, defaults to commands; likewise pass
+    sys.modules['__main__'] when commands.py is run as a script
+    """
+    global _EXPORTER
+    if _PATCHES:
+        return
+    import crossword
+
+    if program is None:
+        import proj07 as program
+    if game is None:
+        import commands as game
+
+    for name in CROSSWORD_METHODS:
+        _patch(crossword.Crossword, name, _timed_method(name, getattr(crossword.Crossword, name)))
+    _instrument_proj07(program, program.OPTION_PROMPT)
+    _instrument_game(game)
+
+    if path is not None:
+        _EXPORTER = _Exporter(path.replace('{pid}', str(os.getpid())), interval)
+        _EXPORTER.start()
+        atexit.register(disable)
+
+
+def disable():
+    """
+    Remove the instrumentation, writing a last snapshot if one was being exported. Recorded data is kept
+    """
+    global _EXPORTER
+    if _EXPORTER is not None:
+        _EXPORTER.stop()
+        _EXPORTER = None
+    while _PATCHES:
+        owner, name, original = _PATCHES.pop()
+        setattr(owner, name, original)
+
+
+def enable_from_environment(program=None, game=None):
+    """
+    enable() if the XWORD_METRICS environment variable names a snapshot file
+    :param program: Passed on to enable
+    :param game: Passed on to enable
+    """
+    path = os.environ.get(ENV_PATH)
+    if path:
+        enable(path, float(os.environ.get(ENV_INTERVAL, 10.0)), program, game)
@@ -7,15 +7,21 @@
 #           User input options include:
 #               Display puzzle, printing the crossword object
 #               Make a Guess, editing the crossword object with a user input
+#                   (G, R and T take any square of a clue's answer, not just its first)
 #               Reveal Answer, editing the crossword with the clue answer
 #               Display Hint, finding first disimilarity between user input and clue answer
 #               Help Menu, printing the options
 #               Restart Puzzle, prompting for a new file
+#               Undo/Redo, taking back or making again the last change to the board
+#               Check Puzzle, listing every wrong letter filled in
 #               Quit,
+#           Games are saved to and resumed from XWORD_SAVES when it names a directory
 #
 ###################################################################################################
 
 from crossword import Crossword
+import metrics
+import savelog
 import sys
 
 
@@ -36,6 +42,9 @@ PUZZLE_FILE_ERROR = "No puzzle found with that filename. Try Again.\n"
 
 
 ENTER_GUESS = "Enter your guess (use _ for blanks): "
+NOTHING_TO_UNDO = "Nothing to undo."
+NOTHING_TO_REDO = "Nothing to redo."
+ALL_CORRECT = "Every letter filled in so far is correct!"
 "This clue is already correct!"
 
 
@@ -73,6 +82,19 @@ def open_puzzle(filename):
         print(PUZZLE_FILE_ERROR)
 
 
+def open_save(saves, filename, puzzle):
+    '''
+    Resume the saved game of a puzzle file, if games are being saved
+    :param saves: SaveStore or None
+    :param filename: Name of the puzzle file, which is also the id of its saved game
+    :param puzzle: Freshly opened Crossword object
+    :return: SaveLog object, or None if games are not being saved
+    '''
+    if saves is None:
+        return None
+    return saves.open(filename, filename, puzzle)
+
+
 def display_clues(puzzle, integer=0):
     '''
     Prints out the clues involved in the puzzle
@@ -80,39 +102,55 @@ def display_clues(puzzle, integer=0):
     :param integer: Number of clues to display
     :return: Clues
     '''
-    across_lst = []
-    down_lst = []
-    for key in puzzle.clues:
-        if key[2] == 'A':
-            across_lst.append(puzzle.clues[key])
-        else:
-            down_lst.append(puzzle.clues[key])
+    print(format_clues(puzzle, integer))
+    return
 
-    across_lst.sort()
-    down_lst.sort()
 
+def format_clues(puzzle, integer=0):
+    '''
+    Builds the text display_clues prints, so it can also be sent somewhere other than stdout
+    :param puzzle: name of the crossword object
+    :param integer: Number of clues to display
+    :return: String of the clue lines
+    '''
     # All clues are printed out
     if integer == 0:
-        integer = max(len(across_lst), len(down_lst))
-
-    i = 0
-    print('\nAcross')
-    while i < integer:
-        try:
-            print(across_lst[i])
-        except:
-            break
-        i += 1
-
-    i = 0
-    print('\nDown')
-    while i < integer:
-        try:
-            print(down_lst[i])
-        except:
-            break
-        i += 1
-    return
+        integer = max(len(puzzle.sorted_clues('A')), len(puzzle.sorted_clues('D')))
+
+    lines = ['\nAcross', *puzzle.clue_lines('A', 0, integer), '\nDown', *puzzle.clue_lines('D', 0, integer)]
+    return '\n'.join(lines)
+
+
+def format_check(puzzle):
+    '''
+    Builds the text of the check puzzle option, from one check of the whole board
+    :param puzzle: Crossword object
+    :return: String listing the wrong squares and the first wrong letter of each clue with one
+    '''
+    squares, first_wrong = puzzle.check(blanks=False)
+    if not squares:
+        return ALL_CORRECT
+
+    lines = ["Wrong squares: " + ' '.join(map(str, squares))]
+    # across clues first, then by row and column, as the clues are displayed
+    for key in sorted(first_wrong, key=lambda key: (key[2], key[0], key[1])):
+        lines.append(f"{key[:2]} {'Across' if key[2] == 'A' else 'Down'}: letter {first_wrong[key] + 1} is wrong")
+    return '\n'.join(lines)
+
+
+def find_clue(puzzle, option_lst):
+    '''
+    Finds the clue a G, R or T option is about, from any square of its answer. Without
+    A/D the across clue through the square is picked if there is one
+    :param puzzle: Crossword Object
+    :param option_lst: Option, row, column and optionally A/D
+    :return: Clue object, or None if there is no such clue
+    '''
+    try:
+        row, col = int(option_lst[1]), int(option_lst[2])
+    except (IndexError, ValueError):
+        return None
+    return puzzle.clue_at(row, col, option_lst[3] if len(option_lst) > 3 else None)
 
 
 def validate(puzzle, input):
@@ -125,7 +163,7 @@ def validate(puzzle, input):
     if len(input) == 0:
         return False
 
-    if input[0] in ['H', 'S', 'Q']:
+    if input[0] in ['H', 'S', 'Q', 'U', 'Y', 'P']:
         if len(input) > 1:
             return False
         else:
@@ -138,17 +176,15 @@ def validate(puzzle, input):
             return True
 
     elif input[0] == 'G' or input[0] == 'R' or input[0] == 'T':
-        try:
-            variable = puzzle.clues[tuple([int(input[1]), int(input[2]), input[3]])]
-            return True
-        except:
-            return False
+        return find_clue(puzzle, input) is not None
 
     else:
         return False
 
 
 def main():
+    saves = savelog.from_environment()
+
     # Attempts to read puzzle
     while True:
         filename = input(PUZZLE_PROMPT)
@@ -156,6 +192,7 @@ def main():
         if puzzle != None:
             break
 
+    save = open_save(saves, filename, puzzle)
     display_clues(puzzle)
 
     print(puzzle)
@@ -176,12 +213,12 @@ def main():
 
             # User Guess
             elif option_lst[0] == 'G':
+                clue = find_clue(puzzle, option_lst)
                 while True:
                     guess = input(ENTER_GUESS).upper()
-                    key = (tuple(map(int, (option_lst[1], option_lst[2])))) + (option_lst[3],)
 
                     try:
-                        puzzle.change_guess(puzzle.clues[key], guess)
+                        puzzle.change_guess(clue, guess)
                         print(puzzle)
                         break
 
@@ -192,19 +229,29 @@ def main():
 
             # Reveal Answer
             elif option_lst[0] == 'R':
-                key = (tuple(map(int, (option_lst[1], option_lst[2])))) + (option_lst[3],)
-                puzzle.reveal_answer(puzzle.clues[key])
+                puzzle.reveal_answer(find_clue(puzzle, option_lst))
                 print(puzzle)
 
             # Hint System
             elif option_lst[0] == 'T':
-                key = (tuple(map(int, (option_lst[1], option_lst[2])))) + (option_lst[3],)
-                i = puzzle.find_wrong_letter(puzzle.clues[key])
+                clue = find_clue(puzzle, option_lst)
+                i = puzzle.find_wrong_letter(clue)
                 if i != -1:
-                    print(f"Letter {i+1} is wrong, it should be {puzzle.clues[key].answer[i]}")
+                    print(f"Letter {i+1} is wrong, it should be {clue.answer[i]}")
                 else:
                     print("This clue is already correct!")
 
+            # Undo/Redo, not in the help menu so its text stays as the course gave it
+            elif option_lst[0] == 'U':
+                print(puzzle if puzzle.undo() else NOTHING_TO_UNDO)
+
+            elif option_lst[0] == 'Y':
+                print(puzzle if puzzle.redo() else NOTHING_TO_REDO)
+
+            # Check Puzzle
+            elif option_lst[0] == 'P':
+                print(format_check(puzzle))
+
             # Help Menu
             elif option_lst[0] == 'H':
                 print(HELP_MENU)
@@ -217,6 +264,7 @@ def main():
                     if puzzle != None:
                         break
 
+                save = open_save(saves, filename, puzzle)
                 display_clues(puzzle, 0)
                 print(puzzle)
                 print(HELP_MENU)
@@ -226,14 +274,21 @@ def main():
                 break
 
             solved = puzzle.is_solved()
+            if save is not None and solved is True:
+                # a finished game starts over next time
+                save.remove()
+            elif save is not None:
+                save.save()
             if solved is True:
                 print("\nPuzzle solved! Congratulations!")
                 break
         else:
             print("Invalid option/arguments. Type 'H' for help.")
 
-    pass
+    if saves is not None:
+        saves.flush()
 
 
 if __name__ == "__main__":
+    metrics.enable_from_environment(program=sys.modules[__name__])
     main()
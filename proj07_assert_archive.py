@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+import puzzle_archive
+from crossword import Clue, Crossword
+
+
+def fields(puzzle):
+    """
+    :return: Everything a loaded crossword is made of, in a form that compares with ==
+    """
+    return (puzzle.rows, puzzle.cols, bytes(puzzle._key), puzzle.board,
+            [(key, clue.answer, clue.clue, puzzle.clue_cells(clue)) for key, clue in puzzle.clues.items()],
+            puzzle.clue_lines('A'), puzzle.clue_lines('D'))
+
+
+filenames = ["meal.csv", "vowel.csv", "monopoly.csv"]
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "puzzles.xwda")
+    assert puzzle_archive.compile_archive(filenames, path) == 3
+    archive = puzzle_archive.PuzzleArchive(path)
+    assert archive.ids() == ['meal', 'vowel', 'monopoly'] and len(archive) == 3
+    assert 'vowel' in archive and 'vowel.csv' not in archive
+
+    # every puzzle comes back out of the archive just as the csv loads it
+    for filename in filenames:
+        loaded = Crossword(filename)
+        opened = Crossword.from_archive(path, puzzle_archive.puzzle_id(filename))
+        assert fields(opened) == fields(loaded), filename
+        assert str(opened) == str(loaded)
+        assert archive.record(puzzle_archive.puzzle_id(filename)) == puzzle_archive.encode_puzzle(loaded)
+    print(Crossword.from_archive(path, 'vowel'))
+
+    # and plays the same
+    loaded = Crossword("vowel.csv")
+    opened = Crossword.from_archive(path, 'vowel')
+    for puzzle in (loaded, opened):
+        puzzle.change_guess(puzzle.clues[(2, 0, 'A')], "VOWEL")
+        puzzle.reveal_answer(puzzle.clues[(0, 2, 'D')])
+        puzzle.change_guess(puzzle.clues[(4, 0, 'A')], "NOT")
+    print(opened)
+    assert opened.board == loaded.board
+    assert opened.find_wrong_letter(opened.clues[(4, 0, 'A')]) == loaded.find_wrong_letter(loaded.clues[(4, 0, 'A')])
+    assert not opened.is_solved() and not loaded.is_solved()
+
+    # clue text outside of ASCII survives, and lengths are counted in characters
+    clues = [Clue((0, 0), 'A', "CAT", "Félin — 3 lettres"), Clue((0, 0), 'D', "COW", "Vache ☺"),
+             Clue((0, 2), 'D', "TOE", "Orteil")]
+    built = Crossword.from_clues(clues)
+    other = os.path.join(directory, "other.xwda")
+    assert puzzle_archive.write_archive(other, [("café", puzzle_archive.encode_puzzle(built))]) == 1
+    assert fields(Crossword.from_archive(other, "café")) == fields(built)
+
+    # a missing puzzle is a KeyError, a file that is no archive a ValueError
+    try:
+        Crossword.from_archive(path, 'nowhere')
+        assert False
+    except KeyError:
+        pass
+    try:
+        puzzle_archive.PuzzleArchive("vowel.csv")
+        assert False
+    except ValueError:
+        pass
+    archive.close()
@@ -0,0 +1,35 @@
+from crossword import Crossword
+
+instructor_blank_squares = [(0, 2), (0, 3), (0, 4), (1, 1), (1, 2), (1, 3), (1, 4), (2, 0), (2, 1), (2, 2),
+                            (2, 3), (2, 4), (3, 0), (3, 1), (3, 2), (3, 3), (4, 0), (4, 1), (4, 2)]
+
+puzzle = Crossword("vowel.csv")
+print("Puzzle blank")
+print(puzzle)
+student_squares, student_first = puzzle.check()
+assert student_squares == instructor_blank_squares
+assert student_first == {key: 0 for key in puzzle.clues}
+assert puzzle.check(blanks=False) == ([], {})
+
+puzzle.change_guess(puzzle.clues[(0, 2, 'A')], "TEA")
+puzzle.change_guess(puzzle.clues[(2, 0, 'A')], "VOWEL")
+print("Puzzle with TEA and VOWEL")
+print(puzzle)
+student_squares, student_first = puzzle.check(blanks=False)
+assert student_squares == [(0, 3), (0, 4)]
+assert student_first == {(0, 2, 'A'): 1, (0, 3, 'D'): 0, (0, 4, 'D'): 0}
+student_squares, student_first = puzzle.check()
+assert (0, 3) in student_squares and (0, 2) not in student_squares and (2, 0) not in student_squares
+assert student_first[(0, 2, 'A')] == 1 and student_first[(1, 1, 'A')] == 0
+assert student_first[(2, 0, 'D')] == 1 and (2, 0, 'A') not in student_first
+
+# check agrees with find_wrong_letter on every clue
+for key, clue in puzzle.clues.items():
+    assert puzzle.find_wrong_letter(clue) == student_first.get(key, -1)
+
+puzzle3 = Crossword("vowel.csv")
+puzzle3.board = [['■', '■', 'T', 'A', 'P'], ['■', 'Y', 'O', 'G', 'A'], ['V', 'O', 'W', 'E', 'L'],
+                 ['A', 'Y', 'E', 'S', '■'], ['N', 'O', 'R', '■', '■']]
+print("Puzzle solved")
+print(puzzle3)
+assert puzzle3.check() == ([], {}) and puzzle3.check(blanks=False) == ([], {})
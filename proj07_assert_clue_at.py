@@ -0,0 +1,43 @@
+from crossword import Crossword
+
+puzzle = Crossword("vowel.csv")
+print(puzzle)
+vowel = puzzle.clues[(2, 0, 'A')]
+tower = puzzle.clues[(0, 2, 'D')]
+van = puzzle.clues[(2, 0, 'D')]
+
+# any square of an answer finds its clue, not just the first
+assert puzzle.clues_at(2, 2) == (vowel, tower)
+assert puzzle.clues_at(2, 4) == (vowel, puzzle.clues[(0, 4, 'D')])
+assert puzzle.clues_at(4, 0) == (puzzle.clues[(4, 0, 'A')], van)
+assert puzzle.clue_at(2, 2) == vowel
+assert puzzle.clue_at(2, 2, 'D') == tower
+assert puzzle.clue_at(2, 0, 'D') == van
+assert puzzle.clue_at(0, 4) == puzzle.clues[(0, 2, 'A')]
+
+# a square with a clue in one direction only
+assert puzzle.clues_at(0, 2) == (puzzle.clues[(0, 2, 'A')], tower)
+assert puzzle.clues_at(0, 3)[0] == puzzle.clues[(0, 2, 'A')]
+assert puzzle.clue_at(1, 1, 'A') == puzzle.clues[(1, 1, 'A')]
+
+# blocks and squares outside of the board have no clues
+assert puzzle.clues_at(0, 0) == (None, None)
+assert puzzle.clues_at(4, 4) == (None, None)
+assert puzzle.clues_at(-1, 2) == (None, None) and puzzle.clues_at(2, 5) == (None, None)
+assert puzzle.clue_at(0, 0) is None and puzzle.clue_at(9, 9) is None
+assert puzzle.clue_at(3, 4, 'D') is None
+
+# crossings come in the order they cross the answer
+print("Crossings of", vowel)
+for clue in puzzle.crossings(vowel):
+    print(clue)
+assert puzzle.crossings(vowel) == [van, puzzle.clues[(1, 1, 'D')], tower, puzzle.clues[(0, 3, 'D')],
+                                   puzzle.clues[(0, 4, 'D')]]
+assert puzzle.crossings(tower) == [puzzle.clues[(0, 2, 'A')], puzzle.clues[(1, 1, 'A')], vowel,
+                                   puzzle.clues[(3, 0, 'A')], puzzle.clues[(4, 0, 'A')]]
+
+# the index is shared with copies and still right for them
+copied = puzzle.copy()
+assert copied.clue_at(3, 3, 'D') == copied.clues[(0, 3, 'D')]
+assert copied.crossings(copied.clues[(4, 0, 'A')]) == [copied.clues[(2, 0, 'D')], copied.clues[(1, 1, 'D')],
+                                                        copied.clues[(0, 2, 'D')]]
@@ -0,0 +1,60 @@
+import contextlib
+import io
+
+import old_proj07
+import proj07
+from crossword import Crossword
+
+
+def printed(display, puzzle, integer):
+    """
+    :return: Text a display_clues function prints for a puzzle
+    """
+    stream = io.StringIO()
+    with contextlib.redirect_stdout(stream):
+        display(puzzle, integer)
+    return stream.getvalue()
+
+
+for filename in ["meal.csv", "vowel.csv", "monopoly.csv"]:
+    puzzle = Crossword(filename)
+    for direction in ('A', 'D'):
+        ordered = sorted(clue for clue in puzzle.clues.values() if clue.down_across == direction)
+        lines = tuple(str(clue) for clue in ordered)
+        assert puzzle.sorted_clues(direction) == tuple(ordered)
+        assert puzzle.clue_lines(direction) == lines
+        count = len(lines)
+
+        # pages of every size add up to the whole listing, the last one cut short
+        for size in range(1, count + 2):
+            pages = [puzzle.clue_lines(direction, offset, size) for offset in range(0, count, size)]
+            assert sum(pages, ()) == lines, (filename, direction, size)
+            assert all(len(page) == size for page in pages[:-1]) and 0 < len(pages[-1]) <= size
+
+        # the edges: an empty page, a page that runs off the end, nothing past the end
+        assert puzzle.clue_lines(direction, 0, 0) == ()
+        assert puzzle.clue_lines(direction, 0, count) == lines
+        assert puzzle.clue_lines(direction, 0, count + 5) == lines
+        assert puzzle.clue_lines(direction, count - 1, 3) == lines[-1:]
+        assert puzzle.clue_lines(direction, count) == () and puzzle.clue_lines(direction, count + 3, 2) == ()
+        assert puzzle.clue_lines(direction, 1) == lines[1:]
+        # a negative offset starts at the top and a negative limit is an empty page
+        assert puzzle.clue_lines(direction, -2, 2) == lines[:2]
+        assert puzzle.clue_lines(direction, 0, -1) == ()
+
+    # the C command shows what it always did, for every number of clues asked for
+    longest = max(len(puzzle.sorted_clues('A')), len(puzzle.sorted_clues('D')))
+    for integer in range(-1, longest + 3):
+        assert printed(proj07.display_clues, puzzle, integer) == printed(old_proj07.display_clues, puzzle, integer)
+
+puzzle = Crossword("vowel.csv")
+print(proj07.format_clues(puzzle, 2))
+assert proj07.format_clues(puzzle, 2).splitlines() == ['', 'Across', '(0, 2) Across: Like some water',
+                                                       '(1, 1) Across: Poses are done for it', '', 'Down',
+                                                       '(0, 2) Down: Pisa has a noted one', '(0, 3) Down: Forever']
+
+# copies share the listing, and guesses do not change it
+copied = puzzle.copy()
+copied.reveal_answer(copied.clues[(2, 0, 'A')])
+assert copied.clue_lines('D', 1, 2) == puzzle.clue_lines('D', 1, 2)
+assert copied.sorted_clues('A') is puzzle.sorted_clues('A')
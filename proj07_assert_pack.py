@@ -0,0 +1,102 @@
+import csv
+import io
+import os
+import tempfile
+
+import puzzle_pack
+from crossword import Crossword
+
+
+def fields(puzzle):
+    """
+    :return: Everything a loaded crossword is made of, in a form that compares with ==
+    """
+    return (puzzle.rows, puzzle.cols, bytes(puzzle._key),
+            sorted((key, clue.answer, clue.clue) for key, clue in puzzle.clues.items()))
+
+
+def expected(text):
+    """
+    :return: Dictionary of puzzle id -> Crossword, built by reading the whole pack text with the csv module
+    """
+    grouped = dict()
+    for row in csv.DictReader(io.StringIO(text, newline='')):
+        if row[puzzle_pack.ID_COLUMN] is not None:
+            grouped.setdefault(row[puzzle_pack.ID_COLUMN], []).append(row)
+    return {puzzle_id: Crossword.from_rows(rows) for puzzle_id, rows in grouped.items()}
+
+
+# the id column last, clues with commas, doubled quotes and line breaks, blank lines between puzzles
+# and at the end, and windows line endings on one puzzle
+last_column = ('Row Index,Column Index,Down/Across,Answer,Clue,Puzzle Id\n'
+               '0,0,A,CAT,"Feline, small",first\n'
+               '0,0,D,COW,"A ""moo"" maker\nwith a second line",first\n'
+               '0,2,D,TOE,"Foot\n\npart",first\n'
+               '\n'
+               '0,0,A,TAP,"Like some water",second\r\n'
+               '0,0,D,TOE,"Little ""piggy""",second\r\n'
+               '\r\n'
+               '0,2,D,PAL,"Bud, amigo, mate",second\r\n'
+               '0,0,A,DOG,"Barker",third\n'
+               '0,0,D,DUO,"Pair,\n  on two lines",third\n'
+               '0,2,D,GEM,"Jewel",third\n'
+               '\n\n')
+# the id first and quoted, holding a comma, with the columns in another order
+first_column = ('Puzzle Id,Answer,Down/Across,Clue,Row Index,Column Index\n'
+                '"a,1",CAT,A,"Feline\nline two",0,0\n'
+                '"a,1",COW,D,"Moo",0,0\n'
+                '"a,1",TOE,D,"Foot part",0,2\n'
+                'b,DOG,A,Barker,0,0\n'
+                'b,DUO,D,Pair,0,0\n'
+                'b,GEM,D,"Jewel, red",0,2\n')
+
+with tempfile.TemporaryDirectory() as directory:
+    for name, text in [("last.csv", last_column), ("first.csv", first_column)]:
+        path = os.path.join(directory, name)
+        with open(path, 'w', newline='') as pack_file:
+            pack_file.write(text)
+        wanted = expected(text)
+
+        # asking for one puzzle only reads the pack up to it
+        pack = puzzle_pack.PuzzlePack(path)
+        first_id = next(iter(wanted))
+        assert fields(pack.puzzle(first_id)) == fields(wanted[first_id])
+        assert not pack.complete and len(pack.slots) == 1
+
+        # every puzzle reads back the same as the csv module reads it, in pack order
+        assert pack.ids() == list(wanted) and len(pack) == len(wanted) and pack.complete
+        for puzzle_id, puzzle in wanted.items():
+            assert fields(pack.puzzle(puzzle_id)) == fields(puzzle), (name, puzzle_id)
+            assert fields(Crossword.from_pack(path, puzzle_id)) == fields(puzzle)
+        assert [(puzzle_id, fields(puzzle)) for puzzle_id, puzzle in puzzle_pack.PuzzlePack(path).puzzles()] \
+               == [(puzzle_id, fields(puzzle)) for puzzle_id, puzzle in wanted.items()]
+
+        # the offsets point at whole records: each puzzle's bytes are its rows, and nothing else
+        with open(path, 'rb') as pack_file:
+            whole = pack_file.read()
+        assert b''.join(pack.data(puzzle_id) for puzzle_id in pack.ids()) == whole[len(pack.header):]
+        try:
+            pack.puzzle("missing")
+            assert False
+        except KeyError:
+            pass
+        pack.close()
+
+    print(Crossword.from_pack(os.path.join(directory, "last.csv"), "second"))
+    assert Crossword.from_pack(os.path.join(directory, "last.csv"), "first").clues[(0, 2, 'D')].clue == "Foot\n\npart"
+    assert Crossword.from_pack(os.path.join(directory, "first.csv"), "a,1").clues[(0, 0, 'A')].clue == "Feline\nline two"
+
+    # a puzzle whose rows are split up, and a pack with no id column, are refused
+    path = os.path.join(directory, "split.csv")
+    with open(path, 'w', newline='') as pack_file:
+        pack_file.write(first_column + '"a,1",TAP,A,Water,1,0\n')
+    try:
+        puzzle_pack.PuzzlePack(path).index()
+        assert False
+    except ValueError:
+        pass
+    try:
+        puzzle_pack.PuzzlePack("vowel.csv")
+        assert False
+    except ValueError:
+        pass
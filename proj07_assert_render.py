@@ -0,0 +1,75 @@
+import io
+
+import old_crossword
+from crossword import Clue, Crossword
+
+
+def rendered(puzzle, load):
+    """
+    :return: Text of the puzzle's board rendered from scratch, by a crossword that never rendered before
+    """
+    fresh = load()
+    fresh.board = puzzle.board
+    return str(fresh)
+
+
+def streamed(puzzle):
+    stream = io.StringIO()
+    puzzle.render(stream)
+    return stream.getvalue()
+
+
+def load_vowel():
+    return Crossword("vowel.csv")
+
+
+puzzle = load_vowel()
+original = old_crossword.Crossword("vowel.csv")
+print(puzzle)
+steps = [lambda: puzzle.change_guess(puzzle.clues[(2, 0, 'A')], "VOWEL"),
+         lambda: puzzle.change_guess(puzzle.clues[(0, 2, 'D')], "TOWER"),
+         lambda: puzzle.reveal_answer(puzzle.clues[(2, 0, 'D')]),
+         puzzle.undo,
+         puzzle.undo,
+         puzzle.redo,
+         lambda: puzzle.reveal_answer(puzzle.clues[(0, 4, 'D')]),
+         lambda: puzzle.change_guess(puzzle.clues[(4, 0, 'A')], "NOT"),
+         puzzle.undo,
+         lambda: puzzle.board[3].__setitem__(1, 'Y')]
+for step in steps:
+    step()
+    # only the rows a change touched are rendered again, and they come out as a full render would
+    assert str(puzzle) == rendered(puzzle, load_vowel) == streamed(puzzle)
+    original.board = [list(row) for row in puzzle.board]
+    assert str(puzzle) == str(original)
+print(puzzle)
+
+# a new game of the same puzzle renders its own board, not the one it was copied from
+copied = puzzle.copy()
+assert str(copied) == str(load_vowel())
+copied.reveal_answer(copied.clues[(3, 0, 'A')])
+assert str(copied) == rendered(copied, load_vowel) and str(puzzle) == rendered(puzzle, load_vowel)
+
+# a board set as a whole is rendered again from scratch
+puzzle.board = copied.board
+assert str(puzzle) == str(copied)
+
+# rows from 10 on get a wider label, and a down answer dirties every row it crosses
+clues = [Clue((0, 0), 'A', "CONSTRUCTION", "Building"), Clue((0, 0), 'D', "CONSTRUCTION", "Also building"),
+         Clue((0, 11), 'D', "NEIGHBORHOOD", "Area"), Clue((11, 0), 'A', "NEIGHBORHOOD", "Also area")]
+
+
+def load_large():
+    return Crossword.from_clues(clues)
+
+
+large = load_large()
+str(large)
+large.change_guess(large.clues[(0, 11, 'D')], "NEIGHBOURING")
+large.reveal_answer(large.clues[(11, 0, 'A')])
+print(large)
+assert str(large) == rendered(large, load_large) == streamed(large)
+lines = str(large).splitlines()
+assert lines[2].startswith(" 0 |  _") and lines[12].startswith("10 |  _    ■")
+large.undo()
+assert str(large) == rendered(large, load_large)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from crossword import Crossword
+from savelog import SaveStore
+
+instructor_board = [['■', '■', 'T', 'E', 'A'], ['■', '_', '_', '_', '_'], ['V', '_', '_', '_', '_'],
+                    ['A', '_', '_', '_', '■'], ['N', '_', '_', '■', '■']]
+
+
+def resumed(directory, session_id='vowel'):
+    """
+    :return: Crossword of a session as a restarted process would pick it up
+    """
+    puzzle = Crossword("vowel.csv")
+    SaveStore(directory, sync=False).open(session_id, "vowel.csv", puzzle)
+    return puzzle
+
+
+with tempfile.TemporaryDirectory() as directory:
+    store = SaveStore(directory, sync=False)
+    puzzle = Crossword("vowel.csv")
+    log = store.open('vowel', "vowel.csv", puzzle)
+    puzzle.change_guess(puzzle.clues[(0, 2, 'A')], "TEA")
+    log.save()
+    puzzle.reveal_answer(puzzle.clues[(0, 2, 'D')])
+    log.save()
+    store.flush()
+    assert resumed(directory).board == puzzle.board
+
+    # undo a saved change and make a new one in its place: the undone change is in the log already
+    puzzle.undo()
+    log.save()
+    puzzle.reveal_answer(puzzle.clues[(2, 0, 'D')])
+    log.save()
+    print("Puzzle after undo and a new reveal")
+    print(puzzle)
+    assert puzzle.board == instructor_board
+    student_puzzle = resumed(directory)
+    print("Puzzle resumed")
+    print(student_puzzle)
+    assert student_puzzle.board == instructor_board
+
+    # the same after the changes were synced, and after more undo and redo
+    store.flush()
+    assert resumed(directory).board == instructor_board
+    puzzle.undo()
+    puzzle.undo()
+    log.save()
+    puzzle.redo()
+    log.save()
+    assert resumed(directory).board == puzzle.board
+
+    # a change cut short by a crash is dropped, and the log resumes from the records in front of it
+    store.flush()
+    path = store.path('vowel')
+    before = [list(row) for row in puzzle.board]
+    size = os.path.getsize(path)
+    puzzle.change_guess(puzzle.clues[(4, 0, 'A')], "NOR")
+    log.save()
+    assert path not in store.pending and os.path.getsize(path) > size
+    with open(path, 'r+b') as log_file:
+        log_file.truncate(os.path.getsize(path) - 2)
+    assert resumed(directory).board == before
+
+    # a log that was rolled over into a snapshot before being synced still resumes
+    store = SaveStore(directory, sync=False, snapshot_every=2)
+    puzzle = Crossword("vowel.csv")
+    log = store.open('other', "vowel.csv", puzzle)
+    for key, guess in [((0, 2, 'A'), "TEA"), ((2, 0, 'A'), "VOWEL"), ((4, 0, 'A'), "NOR"), ((3, 0, 'A'), "AYES")]:
+        puzzle.change_guess(puzzle.clues[key], guess)
+        log.save()
+        puzzle.undo()
+        puzzle.change_guess(puzzle.clues[key], guess[::-1])
+        log.save()
+        assert resumed(directory, 'other').board == puzzle.board
+    store.flush()
+    assert resumed(directory, 'other').board == puzzle.board
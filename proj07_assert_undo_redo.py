@@ -0,0 +1,79 @@
+from crossword import Crossword
+
+instructor_blank = [['■', '■', '_', '_', '_'], ['■', '_', '_', '_', '_'], ['_', '_', '_', '_', '_'],
+                    ['_', '_', '_', '_', '■'], ['_', '_', '_', '■', '■']]
+
+instructor_board1 = [['■', '■', 'T', 'E', 'A'], ['■', '_', '_', '_', '_'], ['_', '_', '_', '_', '_'],
+                     ['_', '_', '_', '_', '■'], ['_', '_', '_', '■', '■']]
+
+instructor_board2 = [['■', '■', 'T', 'E', 'A'], ['■', '_', 'O', '_', '_'], ['_', '_', 'W', '_', '_'],
+                     ['_', '_', 'E', '_', '■'], ['_', '_', 'R', '■', '■']]
+
+instructor_board3 = [['■', '■', 'T', 'E', 'A'], ['■', '_', '_', '_', '_'], ['V', '_', '_', '_', '_'],
+                     ['A', '_', '_', '_', '■'], ['N', '_', '_', '■', '■']]
+
+puzzle = Crossword("vowel.csv")
+print("Puzzle before")
+print(puzzle)
+assert puzzle.undo() == False and puzzle.redo() == False
+
+puzzle.change_guess(puzzle.clues[(0, 2, 'A')], "TEA")
+puzzle.reveal_answer(puzzle.clues[(0, 2, 'D')])
+print("Puzzle after a guess and a reveal")
+print(puzzle)
+assert puzzle.board == instructor_board2
+
+# undo both steps, then redo both, and the board goes back and forth through the same states
+assert puzzle.undo() == True
+print("Puzzle after undo 1")
+print(puzzle)
+assert puzzle.board == instructor_board1
+assert puzzle.undo() == True
+print("Puzzle after undo 2")
+print(puzzle)
+assert puzzle.board == instructor_blank and puzzle.undo() == False
+assert puzzle.redo() == True and puzzle.board == instructor_board1
+assert puzzle.redo() == True
+print("Puzzle after redo 1 and 2")
+print(puzzle)
+assert puzzle.board == instructor_board2 and puzzle.redo() == False
+
+# a new change after an undo drops the step that was undone
+assert puzzle.undo() == True
+puzzle.reveal_answer(puzzle.clues[(2, 0, 'D')])
+print("Puzzle after undo and a new reveal")
+print(puzzle)
+assert puzzle.board == instructor_board3 and puzzle.redo() == False
+assert puzzle.undo() == True and puzzle.board == instructor_board1
+
+# a guess that changes nothing is not a step to undo
+puzzle.change_guess(puzzle.clues[(0, 2, 'A')], "TEA")
+assert puzzle.undo() == True and puzzle.board == instructor_blank
+
+# the wrong square count follows the board through undo and redo
+puzzle.reveal_answer(puzzle.clues[(2, 0, 'A')])
+puzzle.change_guess(puzzle.clues[(1, 1, 'A')], "YOGA")
+puzzle.change_guess(puzzle.clues[(0, 2, 'A')], "TAP")
+puzzle.change_guess(puzzle.clues[(3, 0, 'A')], "AYES")
+puzzle.change_guess(puzzle.clues[(4, 0, 'A')], "NOR")
+print("Puzzle solved")
+print(puzzle)
+assert puzzle.is_solved() == True
+assert puzzle.undo() == True and puzzle.is_solved() == False
+assert puzzle.redo() == True and puzzle.is_solved() == True
+
+# the journal keeps at most its limit of steps, so undo stops after that many
+puzzle = Crossword("vowel.csv")
+puzzle.journal.limit = 3
+clue = puzzle.clues[(4, 0, 'A')]
+for guess in ["A__", "AB_", "ABC", "B__", "BC_", "BCD"]:
+    puzzle.change_guess(clue, guess)
+undone = 0
+while puzzle.undo():
+    undone += 1
+print("Puzzle after undoing all that the journal keeps")
+print(puzzle)
+assert 3 <= undone < 6 and puzzle.board != instructor_blank
+while puzzle.redo():
+    pass
+assert puzzle.board[4] == ['B', 'C', 'D', '■', '■']
@@ -0,0 +1,48 @@
+import re
+
+from word_index import WordIndex
+
+words = ["BOARD", "BLOND", "BRAND", "BROOD", "BRIDE", "GRAND", "ROUND", "CAT", "COT", "CUT", "ACT", "TEA",
+         "ZEBRA", "BOARD", "QUIZ"]
+index = WordIndex(words)
+seeded = WordIndex(words, 7)
+
+
+def scanned(pattern):
+    """
+    :return: Sorted words matching a pattern, found by checking every word
+    """
+    return sorted(word for word in set(words) if re.fullmatch(pattern.replace('_', '.'), word))
+
+
+# duplicates are dropped and ids follow alphabetical order unless a seed shuffles them
+assert len(index) == len(set(words)) == len(seeded)
+assert index.words[3] == ["ACT", "CAT", "COT", "CUT", "TEA"]
+assert sorted(seeded.words[5]) == index.words[5]
+
+for pattern in ["B_O_D", "B___D", "_R_N_", "C_T", "___", "_____", "BOARD", "Z____", "Q___", "B_O_E", "X__",
+                "____________", "A"]:
+    found = list(index.matches(pattern))
+    print(f"{pattern}: {found}")
+    # a lookup agrees with a linear scan, streams in id order and counts the same without listing
+    assert found == scanned(pattern), pattern
+    assert sorted(seeded.matches(pattern)) == found, pattern
+    assert index.count(pattern) == seeded.count(pattern) == len(found), pattern
+    assert index.bitset(pattern).bit_count() == len(found)
+
+assert list(index.matches("B_O_D")) == ["BLOND", "BROOD"]
+assert index.count("_R_N_") == 2
+
+# letters outside of A-Z and lengths with no words match nothing
+assert index.count("B_o_D") == 0 and index.count("C@T") == 0 and index.count("") == 0
+assert index.all_words(5) == (1 << 8) - 1 and index.all_words(9) == 0
+
+# matches is lazy: the first word comes without working out the rest
+stream = index.matches("_____")
+assert next(stream) == "BLOND"
+assert list(index.iter_bits(3, index.bitset("C_T"))) == ["CAT", "COT", "CUT"]
+
+# each word's letter numbers sit next to its masks, A = 0
+assert index.codes[3][0] == bytes([0, 2, 19])
+assert all(bytes(ord(letter) - 65 for letter in word) == code
+           for length in seeded.words for word, code in zip(seeded.words[length], seeded.codes[length]))
@@ -0,0 +1,204 @@
+"""
+Compiles puzzle csv files into a single binary archive that can be
+opened without parsing any text. Crossword.from_archive reads puzzles
+back out of it.
+
+Archive layout (all integers little endian):
+    header   magic, format version, number of puzzles, offset of the index
+    records  one per puzzle: rows, cols, number of clues, the answer key
+             (rows * cols bytes), a fixed size entry per clue and finally
+             the answers and clue descriptions as one utf-8 blob. Clue
+             entries hold string lengths in characters so the blob can be
+             decoded in one go and sliced
+    index    one entry per puzzle: id length, id, record offset, record length
+
+Usage: python puzzle_archive.py archive_file puzzle.csv [puzzle.csv ...]
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+from crossword import Clue, Crossword
+
+MAGIC = b'XWDA'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHIQ')
+RECORD = struct.Struct('<HHH')
+CLUE_ENTRY = struct.Struct('<HHcHH')
+INDEX_ID = struct.Struct('<H')
+INDEX_ENTRY = struct.Struct('<QI')
+
+# Archives opened so far, keyed by path, so each file is only mapped once
+_OPEN_ARCHIVES = dict()
+
+
+def puzzle_id(filename):
+    """
+    Id a puzzle file is stored under, its file name without directory or extension
+    :param filename: Name of the puzzle csv file
+    :return: String id
+    """
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def encode_puzzle(puzzle):
+    """
+    Convert a loaded crossword into its archive record
+    :param puzzle: Crossword object
+    :return: bytes of the record
+    """
+    entries = []
+    blob = []
+    for clue in puzzle.clues.values():
+        entries.append(CLUE_ENTRY.pack(clue.indices[0], clue.indices[1], clue.down_across.encode('ascii'),
+                                       len(clue.answer), len(clue.clue)))
+        blob.append(clue.answer + clue.clue)
+
+    return b''.join([RECORD.pack(puzzle.rows, puzzle.cols, len(entries)), bytes(puzzle._key)]
+                    + entries + [''.join(blob).encode('utf-8')])
+
+
+def decode_puzzle(data, position, end):
+    """
+    Decode one puzzle record
+    :param data: bytes-like object holding the record
+    :param position: Offset of the start of the record
+    :param end: Offset of the end of the record
+    :return: Tuple of rows, cols, answer key bytes and list of Clue objects
+    """
+    rows, cols, count = RECORD.unpack_from(data, position)
+    position += RECORD.size
+    key = data[position:position + rows * cols]
+    position += rows * cols
+
+    entries = list(CLUE_ENTRY.iter_unpack(data[position:position + count * CLUE_ENTRY.size]))
+    position += count * CLUE_ENTRY.size
+
+    blob = data[position:end].decode('utf-8')
+    position = 0
+    clues = []
+    for row, col, down_across, answer_length, clue_length in entries:
+        answer = blob[position:position + answer_length]
+        position += answer_length
+        description = blob[position:position + clue_length]
+        position += clue_length
+        clues.append(Clue((row, col), down_across.decode('ascii'), answer, description))
+    return rows, cols, key, clues
+
+
+def write_archive(archive_path, records):
+    """
+    Write already encoded puzzle records into an archive
+    :param archive_path: Name of the archive file to write
+    :param records: Iterable of (puzzle id, record bytes) pairs
+    :return: Number of puzzles written
+    """
+    index = []
+    with open(archive_path, 'wb') as archive:
+        archive.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for name, record in records:
+            index.append((name.encode('utf-8'), archive.tell(), len(record)))
+            archive.write(record)
+
+        index_offset = archive.tell()
+        for name, offset, length in index:
+            archive.write(INDEX_ID.pack(len(name)) + name + INDEX_ENTRY.pack(offset, length))
+
+        archive.seek(0)
+        archive.write(HEADER.pack(MAGIC, VERSION, len(index), index_offset))
+    return len(index)
+
+
+def compile_archive(filenames, archive_path):
+    """
+    Compile puzzle csv files into one archive. Each puzzle is stored under puzzle_id(filename)
+    :param filenames: Names of the puzzle csv files
+    :param archive_path: Name of the archive file to write
+    :return: Number of puzzles written
+    """
+    return write_archive(archive_path, ((puzzle_id(filename), encode_puzzle(Crossword(filename)))
+                                        for filename in filenames))
+
+
+class PuzzleArchive:
+    def __init__(self, path):
+        """
+        Memory-map an archive and read its index
+        :param path: Name of the archive file
+        """
+        with open(path, 'rb') as archive:
+            self.data = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, position = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} puzzle archive")
+
+        self.index = dict()
+        for _ in range(count):
+            length, = INDEX_ID.unpack_from(self.data, position)
+            position += INDEX_ID.size
+            name = self.data[position:position + length].decode('utf-8')
+            position += length
+            self.index[name] = INDEX_ENTRY.unpack_from(self.data, position)
+            position += INDEX_ENTRY.size
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, puzzle_id):
+        return puzzle_id in self.index
+
+    def ids(self):
+        """
+        :return: Ids of every puzzle in the archive, in the order they were compiled
+        """
+        return list(self.index)
+
+    def read(self, puzzle_id):
+        """
+        Decode one puzzle record
+        :param puzzle_id: Id of the puzzle, a KeyError is raised if it is missing
+        :return: Tuple of rows, cols, answer key bytes and list of Clue objects
+        """
+        position, length = self.index[puzzle_id]
+        return decode_puzzle(self.data, position, position + length)
+
+    def record(self, puzzle_id):
+        """
+        Return the raw encoded record of a puzzle
+        :param puzzle_id: Id of the puzzle, a KeyError is raised if it is missing
+        :return: bytes of the record
+        """
+        position, length = self.index[puzzle_id]
+        return self.data[position:position + length]
+
+    def close(self):
+        self.data.close()
+
+
+def open_archive(path):
+    """
+    Return the PuzzleArchive for a path, mapping the file the first time it is asked for
+    :param path: Name of the archive file
+    :return: PuzzleArchive object
+    """
+    archive = _OPEN_ARCHIVES.get(path)
+    if archive is None:
+        archive = _OPEN_ARCHIVES[path] = PuzzleArchive(path)
+    return archive
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: python puzzle_archive.py archive_file puzzle.csv [puzzle.csv ...]")
+        return 1
+    count = compile_archive(argv[1:], argv[0])
+    print(f"Compiled {count} puzzles into {argv[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,188 @@
+"""
+Loads whole directories of puzzle csv files at once. Files are parsed
+across a process pool, each worker sending back the compact archive
+record of its puzzle (see puzzle_archive.py) rather than the objects.
+
+Puzzles are keyed by their path relative to the directory, or to the
+directory a glob pattern starts in, without the .csv extension, so
+same-named files in different subdirectories stay apart.
+
+With a cache file, records are also saved as an archive whose ids are
+made of each file's path, modification time and size. Files that fail
+to parse are saved the same way, with their error message, so a later
+load only parses files that are new or have changed since.
+
+Usage: python puzzle_loader.py directory_or_glob [--cache file] [--workers n]
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import puzzle_archive
+from crossword import Crossword
+
+CHUNKSIZE = 64
+# cache ids of files that failed to parse start with this, their record is the error message
+FAILED = 'failed|'
+
+
+def find_puzzles(source):
+    """
+    List the puzzle files in a directory, or matching a glob pattern
+    :param source: Directory name or glob pattern
+    :return: Sorted list of file names
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.csv')
+    return sorted(glob.glob(source))
+
+
+def source_root(source):
+    """
+    Directory the puzzle ids of a source are relative to
+    :param source: Directory name or glob pattern
+    :return: The directory itself, or the part of the pattern in front of its first wildcard
+    """
+    if os.path.isdir(source):
+        return source
+    parts = []
+    for part in os.path.dirname(source).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.curdir
+
+
+def loaded_id(filename, root):
+    """
+    :param filename: Name of the puzzle csv file
+    :param root: Directory from source_root
+    :return: Id the puzzle is loaded under, its path relative to root without the extension
+    """
+    return os.path.splitext(os.path.relpath(filename, root))[0]
+
+
+def cache_key(filename):
+    """
+    Key a file's parsed record is cached under. It changes whenever the file is modified
+    :param filename: Name of the puzzle csv file
+    :return: String key
+    """
+    stat = os.stat(filename)
+    return f"{os.path.abspath(filename)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+def parse_puzzle(filename):
+    """
+    Parse one puzzle file into its archive record. Runs in the worker processes
+    :param filename: Name of the puzzle csv file
+    :return: Tuple of filename, record bytes (None on failure) and error message
+    """
+    try:
+        return filename, puzzle_archive.encode_puzzle(Crossword(filename)), None
+    except Exception as error:
+        return filename, None, f"{type(error).__name__}: {error}"
+
+
+def parse_all(filenames, workers=None):
+    """
+    Parse puzzle files, across a process pool when there is more than one worker
+    :param filenames: Names of the puzzle csv files
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :return: Iterator of parse_puzzle results
+    """
+    if workers == 1 or len(filenames) <= 1:
+        return map(parse_puzzle, filenames)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_puzzle, filenames, chunksize=CHUNKSIZE))
+
+
+def load_puzzles(source, workers=None, cache_path=None, errors=None):
+    """
+    Load every puzzle in a directory or matching a glob pattern
+    :param source: Directory name or glob pattern
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param cache_path: Optional archive file used to skip parsing unchanged files. It is rewritten
+    to hold exactly the puzzles of this load, so use one cache file per source
+    :param errors: Optional dictionary filled with filename -> error message for files that failed to load
+    :return: Dictionary of loaded_id(filename) -> Crossword
+    :raise ValueError: If two files would be loaded under the same id
+    """
+    filenames = find_puzzles(source)
+    root = source_root(source)
+    ids = dict()
+    for filename in filenames:
+        puzzle_id = loaded_id(filename, root)
+        if puzzle_id in ids:
+            raise ValueError(f"{filename} and {ids[puzzle_id]} would both be loaded as {puzzle_id!r}")
+        ids[puzzle_id] = filename
+    keys = {filename: cache_key(filename) for filename in filenames}
+
+    cache = None
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            cache = puzzle_archive.PuzzleArchive(cache_path)
+        except ValueError:
+            cache = None
+
+    records = dict()
+    failures = dict()
+    missing = []
+    for filename in filenames:
+        if cache is not None and keys[filename] in cache:
+            records[filename] = cache.record(keys[filename])
+        elif cache is not None and FAILED + keys[filename] in cache:
+            failures[filename] = cache.record(FAILED + keys[filename]).decode('utf-8')
+        else:
+            missing.append(filename)
+
+    for filename, record, error in parse_all(missing, workers):
+        if record is None:
+            failures[filename] = error
+        else:
+            records[filename] = record
+    if errors is not None:
+        errors.update((filename, failures[filename]) for filename in filenames if filename in failures)
+
+    puzzles = dict()
+    for puzzle_id, filename in ids.items():
+        if filename in records:
+            record = records[filename]
+            puzzles[puzzle_id] = Crossword.from_key(*puzzle_archive.decode_puzzle(record, 0, len(record)))
+
+    if cache is not None:
+        cache.close()
+    if cache_path is not None and (missing or cache is None or len(cache) != len(records) + len(failures)):
+        entries = []
+        for filename in filenames:
+            if filename in records:
+                entries.append((keys[filename], records[filename]))
+            elif filename in failures:
+                entries.append((FAILED + keys[filename], failures[filename].encode('utf-8')))
+        temporary = cache_path + '.tmp'
+        puzzle_archive.write_archive(temporary, entries)
+        os.replace(temporary, cache_path)
+    return puzzles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a directory of puzzle csv files")
+    parser.add_argument('source', help="directory or glob pattern of puzzle files")
+    parser.add_argument('--cache', help="archive file used as a parse cache")
+    parser.add_argument('--workers', type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    errors = dict()
+    start = time.perf_counter()
+    puzzles = load_puzzles(args.source, args.workers, args.cache, errors)
+    elapsed = time.perf_counter() - start
+    for filename, error in errors.items():
+        print(f"{filename}: {error}")
+    print(f"Loaded {len(puzzles)} puzzles ({len(errors)} failed) in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
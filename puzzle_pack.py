@@ -0,0 +1,287 @@
+"""
+Reads multi-puzzle pack files: one csv file holding many puzzles, with
+the columns of a puzzle file plus a Puzzle Id column. The rows of each
+puzzle must be next to each other, in any order within the puzzle.
+
+A pack is never loaded as a whole. It is read as a stream, one line at
+a time, and the first pass builds an index of the byte offset and length
+of each puzzle's rows. The pass only goes as far as it has to: asking
+for a puzzle reads the pack up to the end of that puzzle, and a later
+request for a puzzle further on carries on from there. A Crossword is
+only built when its puzzle is asked for, from its rows read back with
+one pread, so memory use is the index (a few dozen bytes per puzzle)
+plus the puzzles actually requested.
+
+    pack = open_pack('daily.csv')
+    puzzle = pack.puzzle('0042')      # or Crossword.from_pack('daily.csv', '0042')
+    for puzzle_id, puzzle in pack.puzzles():
+        ...                           # streams through the whole pack once
+
+Game servers and commands.load_puzzle accept pack puzzles as
+"pack_file#puzzle_id".
+
+Usage: python puzzle_pack.py pack.csv [puzzle_id ...]
+       python puzzle_pack.py --build pack.csv puzzle.csv [puzzle.csv ...]
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from array import array
+
+from crossword import Crossword
+
+ID_COLUMN = 'Puzzle Id'
+SEPARATOR = '#'
+
+# Packs opened so far, keyed by path, so each file is only indexed once
+_OPEN_PACKS = dict()
+
+
+def _quotes_open(line, quoted):
+    """
+    :param line: Line of a csv file, as bytes
+    :param quoted: Whether the line starts inside a quoted field
+    :return: Whether the line ends inside a quoted field, so the record goes on to the next line
+    """
+    return quoted != (line.count(b'"') % 2 == 1)
+
+
+def scan_pack(pack_file):
+    """
+    Stream through a pack, one puzzle at a time
+    :param pack_file: Pack file opened in binary mode, at its start
+    :return: Generator of (puzzle id, offset of its first row, bytes of its rows); the header
+    comes first as (None, 0, header line)
+    """
+    header = pack_file.readline()
+    columns = next(csv.reader([header.decode('utf-8-sig')]))
+    if ID_COLUMN not in columns:
+        raise ValueError(f"Pack has no {ID_COLUMN} column")
+    column = columns.index(ID_COLUMN)
+    yield None, 0, header
+
+    offset = len(header)
+    current, start, lines, seen = None, offset, [], set()
+    record, quoted = [], False
+    for line in pack_file:
+        record.append(line)
+        quoted = _quotes_open(line, quoted)
+        if quoted:
+            continue
+        text = b''.join(record) if len(record) > 1 else line
+        record = []
+        if not text.strip():
+            # blank lines belong to the puzzle before them, whose rows have to stay one run of bytes
+            if current is not None:
+                lines.append(text)
+            offset += len(text)
+            continue
+        if column == 0 and not text.startswith(b'"'):
+            puzzle_id = text[:text.find(b',')].decode('utf-8')
+        else:
+            puzzle_id = next(csv.reader([text.decode('utf-8')]))[column]
+
+        if puzzle_id != current:
+            if current is not None:
+                yield current, start, b''.join(lines)
+            if puzzle_id in seen:
+                raise ValueError(f"Rows of puzzle {puzzle_id} are not next to each other")
+            seen.add(puzzle_id)
+            current, start, lines = puzzle_id, offset, []
+        lines.append(text)
+        offset += len(text)
+    if current is not None:
+        yield current, start, b''.join(lines)
+
+
+class PuzzlePack:
+    def __init__(self, path):
+        """
+        Open a pack. Nothing past the header is read until a puzzle is asked for
+        :param path: Name of the pack file
+        """
+        self.path = path
+        self.descriptor = os.open(path, os.O_RDONLY)
+        # puzzle id -> slot of its offset and length in the arrays
+        self.slots = dict()
+        self.offsets = array('Q')
+        self.lengths = array('L')
+        self.complete = False
+        self._file = open(path, 'rb')
+        self._scanner = scan_pack(self._file)
+        _, _, self.header = next(self._scanner)
+
+    def _add(self, puzzle_id, offset, length):
+        if puzzle_id not in self.slots:
+            self.slots[puzzle_id] = len(self.offsets)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+
+    def _scan(self):
+        """
+        Index the next puzzle of the first pass
+        :return: Tuple of (puzzle id, bytes of its rows), or None once the pack has been read to its end
+        """
+        if self.complete:
+            return None
+        for puzzle_id, offset, data in self._scanner:
+            self._add(puzzle_id, offset, len(data))
+            return puzzle_id, data
+        self.complete = True
+        self._file.close()
+        return None
+
+    def index(self):
+        """
+        Finish the first pass
+        :return: Number of puzzles in the pack
+        """
+        while self._scan() is not None:
+            pass
+        return len(self.slots)
+
+    def __len__(self):
+        return self.index()
+
+    def __contains__(self, puzzle_id):
+        while puzzle_id not in self.slots and self._scan() is not None:
+            pass
+        return puzzle_id in self.slots
+
+    def ids(self):
+        """
+        :return: Ids of every puzzle in the pack, in pack order
+        """
+        self.index()
+        return list(self.slots)
+
+    def data(self, puzzle_id):
+        """
+        Read back the rows of one puzzle
+        :param puzzle_id: Id of the puzzle, a KeyError is raised if it is missing
+        :return: bytes of its rows
+        """
+        if puzzle_id not in self:
+            raise KeyError(puzzle_id)
+        slot = self.slots[puzzle_id]
+        return os.pread(self.descriptor, self.lengths[slot], self.offsets[slot])
+
+    def _reader(self, data):
+        return csv.DictReader(io.StringIO((self.header + data).decode('utf-8-sig'), newline=''))
+
+    def rows(self, puzzle_id):
+        """
+        :param puzzle_id: Id of the puzzle, a KeyError is raised if it is missing
+        :return: csv.DictReader over its rows
+        """
+        return self._reader(self.data(puzzle_id))
+
+    def puzzle(self, puzzle_id):
+        """
+        Build the Crossword of one puzzle
+        :param puzzle_id: Id of the puzzle, a KeyError is raised if it is missing
+        :return: Crossword object
+        """
+        return Crossword.from_rows(self.rows(puzzle_id))
+
+    def puzzles(self):
+        """
+        Stream through the whole pack, building each Crossword in turn. Only
+        one puzzle's rows are held at a time, and the index is filled in on the way
+        :return: Generator of (puzzle id, Crossword)
+        """
+        if self.complete:
+            for puzzle_id in list(self.slots):
+                yield puzzle_id, self.puzzle(puzzle_id)
+            return
+        with open(self.path, 'rb') as pack_file:
+            scanner = scan_pack(pack_file)
+            next(scanner)
+            for puzzle_id, offset, data in scanner:
+                self._add(puzzle_id, offset, len(data))
+                yield puzzle_id, Crossword.from_rows(self._reader(data))
+
+    def close(self):
+        if not self.complete:
+            self._file.close()
+        os.close(self.descriptor)
+
+
+def open_pack(path):
+    """
+    Return the PuzzlePack for a path, opening it the first time it is asked for
+    :param path: Name of the pack file
+    :return: PuzzlePack object
+    """
+    pack = _OPEN_PACKS.get(path)
+    if pack is None:
+        pack = _OPEN_PACKS[path] = PuzzlePack(path)
+    return pack
+
+
+def split_name(name):
+    """
+    Tell a pack puzzle name from a file name
+    :param name: "pack_file#puzzle_id", or the name of a puzzle file
+    :return: Tuple of pack file name and puzzle id, or None if name is not a pack puzzle
+    """
+    if SEPARATOR not in name or os.path.exists(name):
+        return None
+    path, puzzle_id = name.rsplit(SEPARATOR, 1)
+    return path, puzzle_id
+
+
+def write_pack(filename, puzzles):
+    """
+    Write puzzles into a pack, one at a time
+    :param filename: Name of the pack file to write
+    :param puzzles: Iterable of (puzzle id, list of [row, column, A/D, answer, clue] lists)
+    :return: Number of puzzles written
+    """
+    from generator import CSV_HEADER
+
+    count = 0
+    with open(filename, 'w', newline='') as pack_file:
+        writer = csv.writer(pack_file)
+        writer.writerow([ID_COLUMN] + CSV_HEADER)
+        for puzzle_id, rows in puzzles:
+            writer.writerows([puzzle_id] + list(row) for row in rows)
+            count += 1
+    return count
+
+
+def _puzzle_rows(filename):
+    with open(filename, newline='') as csvfile:
+        return [[row['Row Index'], row['Column Index'], row['Down/Across'], row['Answer'], row['Clue']]
+                for row in csv.DictReader(csvfile)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a puzzle pack, or build one from puzzle files")
+    parser.add_argument('pack')
+    parser.add_argument('names', nargs='*', help="puzzle ids to print, or puzzle files with --build")
+    parser.add_argument('--build', action='store_true', help="write the pack from puzzle csv files")
+    args = parser.parse_args()
+
+    if args.build:
+        import puzzle_archive
+
+        count = write_pack(args.pack, ((puzzle_archive.puzzle_id(name), _puzzle_rows(name)) for name in args.names))
+        print(f"Wrote {count} puzzles into {args.pack}")
+        return 0
+
+    start = time.perf_counter()
+    pack = open_pack(args.pack)
+    count = pack.index()
+    print(f"Indexed {count} puzzles in {time.perf_counter() - start:.2f}s")
+    for puzzle_id in args.names:
+        print(f"\n{puzzle_id}\n{pack.puzzle(puzzle_id)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
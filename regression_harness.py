@@ -0,0 +1,248 @@
+"""
+Runs the original implementation (old_proj07.py on old_crossword.py)
+and the current one (proj07.py on crossword.py) side by side.
+
+Every script, the inputN.txt files plus synthetic command streams over
+the same puzzles, is fed to both main() functions in-process, and the
+printed output must be byte-identical. For each puzzle the harness also
+times each Crossword operation under both implementations and measures
+the peak memory allocated by one call with tracemalloc, and reports the
+deltas.
+
+old_proj07.py imports Crossword from crossword.py, so the harness points
+its Crossword at old_crossword.Crossword to get the original pairing.
+old_crossword only supports 5x5 boards, so synthetic scripts only use
+the 5x5 puzzles, and guesses always have the right length (the old
+change_guess writes part of a guess of the wrong length before failing).
+
+Usage: python regression_harness.py [--scripts input1.txt ...] [--synthetic n] [--seed n] [--json file]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+import crossword
+import old_crossword
+import old_proj07
+import proj07
+
+old_proj07.Crossword = old_crossword.Crossword
+
+DEFAULT_PUZZLES = ["vowel.csv", "meal.csv", "monopoly.csv"]
+IMPLEMENTATIONS = (('old', old_proj07, old_crossword), ('new', proj07, crossword))
+REPEAT = 5
+NUMBER = 500
+
+
+class ScriptInput:
+    def __init__(self, text):
+        """
+        Stand-in for sys.stdin that raises EOFError once the script runs out,
+        so a script that does not end the game cannot loop forever
+        :param text: Whole script
+        """
+        self.lines = io.StringIO(text)
+
+    def readline(self):
+        line = self.lines.readline()
+        if not line:
+            raise EOFError("script ended before the game did")
+        return line
+
+
+def run_main(module, script):
+    """
+    Run one implementation's main() on a script
+    :param module: proj07 or old_proj07
+    :param script: Text of the input lines
+    :return: Tuple of printed output, error description or None, and elapsed seconds
+    """
+    output = io.StringIO()
+    stdin = sys.stdin
+    sys.stdin = ScriptInput(script)
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            module.main()
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    finally:
+        elapsed = time.perf_counter() - start
+        sys.stdin = stdin
+    return output.getvalue(), error, elapsed
+
+
+def synthetic_script(filename, rng, length=40):
+    """
+    Random command stream over one puzzle, using only commands both implementations accept
+    :param filename: 5x5 puzzle csv file
+    :param rng: random.Random
+    :param length: Number of commands before the final Q
+    :return: Script text
+    """
+    puzzle = crossword.Crossword(filename)
+    clues = list(puzzle.clues.values())
+    lines = [filename]
+    for _ in range(length):
+        clue = rng.choice(clues)
+        where = f"{clue.indices[0]} {clue.indices[1]} {clue.down_across}"
+        option = rng.choice('CGGGRTTH')
+        if option == 'C':
+            lines.append(f"C {rng.randrange(0, 6)}")
+        elif option == 'G':
+            lines.append(f"G {where}")
+            if rng.random() < 0.2:
+                lines.append('1' * len(clue.answer))
+            letters = [rng.choice((letter, letter, '_', rng.choice(crossword.GUESS_CHARS))) for letter in clue.answer]
+            lines.append(''.join(letters).lower() if rng.random() < 0.3 else ''.join(letters))
+        elif option in 'RT':
+            lines.append(f"{option} {where}")
+        else:
+            lines.append('H')
+    lines.append('Q')
+    return '\n'.join(lines) + '\n'
+
+
+def compare_script(name, script):
+    """
+    :return: Dictionary with whether the outputs match, each side's error and elapsed seconds
+    """
+    result = {'script': name}
+    outputs = dict()
+    for label, module, _ in IMPLEMENTATIONS:
+        outputs[label], error, elapsed = run_main(module, script)
+        result[f"{label}_error"] = error
+        result[f"{label}_ms"] = elapsed * 1000
+    result['identical'] = outputs['old'] == outputs['new']
+    if not result['identical']:
+        old_lines, new_lines = outputs['old'].splitlines(), outputs['new'].splitlines()
+        line = next((i for i, pair in enumerate(zip(old_lines, new_lines)) if pair[0] != pair[1]),
+                    min(len(old_lines), len(new_lines)))
+        result['first_difference_line'] = line + 1
+    return result
+
+
+def measure(function):
+    """
+    :param function: Function of no arguments
+    :return: Tuple of best nanoseconds per call and peak bytes allocated by one call
+    """
+    best = min(timeit.repeat(function, repeat=REPEAT, number=NUMBER)) / NUMBER * 1e9
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    function()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return best, peak
+
+
+def operations(label, module, program, filename):
+    """
+    The operations timed for one implementation, each doing one call per clue where it takes a clue
+    :return: Dictionary of operation name -> (function, number of calls it makes)
+    """
+    puzzle = module.Crossword(filename)
+    # the old methods take the clue's key, the new ones the Clue itself
+    targets = list(puzzle.clues) if label == 'old' else list(puzzle.clues.values())
+    answers = [clue.answer for clue in puzzle.clues.values()]
+    sink = io.StringIO()
+
+    def change_guess():
+        for target, answer in zip(targets, answers):
+            puzzle.change_guess(target, answer)
+
+    def reveal_answer():
+        for target in targets:
+            puzzle.reveal_answer(target)
+
+    def find_wrong_letter():
+        for target in targets:
+            puzzle.find_wrong_letter(target)
+
+    def display_clues():
+        sink.seek(0)
+        sink.truncate()
+        with contextlib.redirect_stdout(sink):
+            program.display_clues(puzzle, 0)
+
+    return {
+        'load': (lambda: module.Crossword(filename), 1),
+        'change_guess': (change_guess, len(targets)),
+        'reveal_answer': (reveal_answer, len(targets)),
+        'find_wrong_letter': (find_wrong_letter, len(targets)),
+        'is_solved': (puzzle.is_solved, 1),
+        'str': (puzzle.__str__, 1),
+        'display_clues': (display_clues, 1),
+    }
+
+
+def compare_operations(filename):
+    """
+    :return: List of dictionaries with each side's ns per call and peak bytes per call for each operation
+    """
+    measured = dict()
+    for label, program, module in IMPLEMENTATIONS:
+        for name, (function, calls) in operations(label, module, program, filename).items():
+            nanoseconds, peak = measure(function)
+            measured.setdefault(name, dict())[label] = (nanoseconds / calls, peak / calls)
+    rows = []
+    for name, sides in measured.items():
+        (old_ns, old_bytes), (new_ns, new_bytes) = sides['old'], sides['new']
+        rows.append({'puzzle': filename, 'operation': name, 'old_ns': old_ns, 'new_ns': new_ns,
+                     'speedup': old_ns / new_ns, 'old_bytes': old_bytes, 'new_bytes': new_bytes,
+                     'bytes_delta': new_bytes - old_bytes})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the old and new crossword implementations")
+    parser.add_argument('--scripts', nargs='*', default=None, help="input scripts, defaults to input*.txt")
+    parser.add_argument('--puzzles', nargs='*', default=DEFAULT_PUZZLES, help="5x5 puzzle files")
+    parser.add_argument('--synthetic', type=int, default=20, help="number of synthetic scripts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="file to write the full report to")
+    args = parser.parse_args()
+
+    scripts = args.scripts if args.scripts is not None else sorted(glob.glob('input*.txt'))
+    rng = random.Random(args.seed)
+    runs = []
+    for name in scripts:
+        with open(name) as script_file:
+            runs.append(compare_script(name, script_file.read()))
+    for n in range(args.synthetic):
+        runs.append(compare_script(f"synthetic-{n}", synthetic_script(rng.choice(args.puzzles), rng)))
+
+    print(f"{'script':<16}{'identical':>10}{'old (ms)':>10}{'new (ms)':>10}")
+    for run in runs:
+        print(f"{run['script']:<16}{str(run['identical']):>10}{run['old_ms']:>10.2f}{run['new_ms']:>10.2f}"
+              + (f"  first difference on line {run['first_difference_line']}" if not run['identical'] else '')
+              + ''.join(f"  {label}: {run[f'{label}_error']}" for label in ('old', 'new') if run[f'{label}_error']))
+
+    rows = [row for filename in args.puzzles for row in compare_operations(filename)]
+    print()
+    print(f"{'puzzle':<14}{'operation':<19}{'old (ns)':>10}{'new (ns)':>10}{'speedup':>9}"
+          f"{'old (B)':>9}{'new (B)':>9}{'delta (B)':>10}")
+    for row in rows:
+        print(f"{row['puzzle']:<14}{row['operation']:<19}{row['old_ns']:>10.0f}{row['new_ns']:>10.0f}"
+              f"{row['speedup']:>8.2f}x{row['old_bytes']:>9.0f}{row['new_bytes']:>9.0f}{row['bytes_delta']:>+10.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump({'scripts': runs, 'operations': rows}, json_file, indent=2)
+    mismatches = sum(not run['identical'] for run in runs)
+    print(f"\n{len(runs) - mismatches} of {len(runs)} scripts byte-identical")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
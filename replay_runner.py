@@ -0,0 +1,189 @@
+"""
+Replays golden cases in-process and diffs the results. A case is an
+input file inputN.txt next to its expected output inst_outN.txt (N can
+be any name, so generated cases like input_gen_0042.txt work too).
+Cases are spread over a process pool. Each worker plays them with
+commands.run_script, or through proj07.main itself with --engine main,
+and reports a unified diff for every case whose output differs.
+
+Outputs are compared line for line after dropping carriage returns and
+the two spaces the inst_out files from Codio put in front of their first
+line. Everything else, including the padding at the end of board rows,
+has to match. Use --exact to keep that first line prefix as well.
+
+With --record, cases that have no expected output yet get one written
+from the current implementation.
+
+Usage: python replay_runner.py [directory ...] [--recursive] [--engine script|main]
+       [--workers n] [--exact] [--record]
+"""
+
+import argparse
+import difflib
+import glob
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from commands import load_puzzle, parse_script, run_script
+
+INPUT_PATTERN = re.compile(r'^input(?P<name>.+)\.txt$')
+EXPECTED_PREFIX = 'inst_out'
+CHUNKSIZE = 32
+CODIO_PREFIX = '  '
+
+# Puzzles loaded by this worker, keyed by path. Cases get a copy() so they all start from a blank board
+_PUZZLES = dict()
+
+
+def find_cases(directories, recursive=False):
+    """
+    Pair up input files with their expected outputs
+    :param directories: Directories to look in
+    :param recursive: Also look in every subdirectory
+    :return: Sorted list of (input file, expected output file) pairs; the expected file may not exist yet
+    """
+    cases = []
+    for directory in directories:
+        pattern = os.path.join(directory, '**', 'input*.txt') if recursive else os.path.join(directory, 'input*.txt')
+        for filename in glob.glob(pattern, recursive=recursive):
+            match = INPUT_PATTERN.match(os.path.basename(filename))
+            if match:
+                expected = os.path.join(os.path.dirname(filename), f"{EXPECTED_PREFIX}{match['name']}.txt")
+                cases.append((filename, expected))
+    return sorted(cases)
+
+
+def _open_cached(directory):
+    def open_puzzle(filename):
+        path = os.path.join(directory, filename)
+        if path not in _PUZZLES:
+            _PUZZLES[path] = load_puzzle(path)
+        puzzle = _PUZZLES[path]
+        return None if puzzle is None else puzzle.copy()
+
+    return open_puzzle
+
+
+def play_script(input_file):
+    """
+    Play a case with the headless game, puzzle files being relative to the case's directory
+    :param input_file: Name of the input file
+    :return: Everything proj07.py would print for it
+    """
+    with open(input_file, newline='') as script_file:
+        commands = parse_script(script_file.read().split('\n'))
+    return run_script(None, commands, echo=True, open_puzzle=_open_cached(os.path.dirname(input_file)))
+
+
+def play_main(input_file):
+    """
+    Play a case through proj07.main itself, from the case's directory
+    :param input_file: Name of the input file
+    :return: Everything proj07.py printed for it
+    """
+    import proj07
+    from regression_harness import run_main
+
+    with open(input_file, newline='') as script_file:
+        script = script_file.read()
+    directory = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(input_file)))
+    try:
+        output, error, _ = run_main(proj07, script)
+    finally:
+        os.chdir(directory)
+    return output if error is None else f"{output}\n[{error}]\n"
+
+
+def normalize(text, exact=False):
+    """
+    :param text: Output text
+    :param exact: Only drop carriage returns
+    :return: List of lines to compare
+    """
+    lines = text.replace('\r', '').split('\n')
+    if not exact and lines[0].startswith(CODIO_PREFIX):
+        lines[0] = lines[0][len(CODIO_PREFIX):]
+    return lines
+
+
+def run_case(case, engine='script', exact=False, record=False):
+    """
+    Play one case and compare it with its expected output. Runs in the worker processes
+    :param case: (input file, expected output file) pair
+    :param engine: 'script' for commands.run_script, 'main' for proj07.main
+    :param exact: Compare byte for byte, keeping the Codio prefix of the first line
+    :param record: Write the expected output if it does not exist yet
+    :return: Tuple of input file, status ('pass', 'fail', 'recorded' or 'missing') and a unified diff
+    """
+    input_file, expected_file = case
+    try:
+        actual = play_main(input_file) if engine == 'main' else play_script(input_file)
+    except Exception as error:
+        actual = f"[{type(error).__name__}: {error}]\n"
+
+    if not os.path.exists(expected_file):
+        if not record:
+            return input_file, 'missing', ''
+        with open(expected_file, 'w', newline='') as expected_output:
+            expected_output.write(actual)
+        return input_file, 'recorded', ''
+
+    with open(expected_file, encoding='utf-8', newline='') as expected_output:
+        expected = expected_output.read()
+    if expected.replace('\r', '') == actual:
+        return input_file, 'pass', ''
+    expected_lines, actual_lines = normalize(expected, exact), normalize(actual, exact)
+    if expected_lines == actual_lines:
+        return input_file, 'pass', ''
+    # the diff shows the lines as they are, even when the first one is compared without its prefix
+    diff = difflib.unified_diff(normalize(expected, True), normalize(actual, True), expected_file,
+                                f"{input_file} (actual)", lineterm='')
+    return input_file, 'fail', '\n'.join(diff) + '\n'
+
+
+def run_cases(cases, engine='script', exact=False, record=False, workers=None):
+    """
+    Run every case, across a process pool when there is more than one worker
+    :return: List of run_case results in case order
+    """
+    jobs = len(cases)
+    arguments = (cases, [engine] * jobs, [exact] * jobs, [record] * jobs)
+    if workers == 1 or jobs <= CHUNKSIZE:
+        return list(map(run_case, *arguments))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_case, *arguments, chunksize=CHUNKSIZE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay inputN.txt files and diff them against inst_outN.txt")
+    parser.add_argument('directories', nargs='*', default=['.'])
+    parser.add_argument('--recursive', action='store_true', help="also search subdirectories")
+    parser.add_argument('--engine', choices=('script', 'main'), default='script')
+    parser.add_argument('--workers', type=int, help="number of worker processes")
+    parser.add_argument('--exact', action='store_true', help="compare byte for byte")
+    parser.add_argument('--record', action='store_true', help="write missing expected outputs")
+    args = parser.parse_args()
+
+    cases = find_cases(args.directories, args.recursive)
+    start = time.perf_counter()
+    results = run_cases(cases, args.engine, args.exact, args.record, args.workers)
+    elapsed = time.perf_counter() - start
+
+    counts = dict()
+    for input_file, status, diff in results:
+        counts[status] = counts.get(status, 0) + 1
+        if status == 'fail':
+            sys.stdout.write(diff)
+        elif status == 'missing':
+            print(f"{input_file}: no {EXPECTED_PREFIX} file")
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"{len(cases)} cases in {elapsed:.2f}s: {summary or 'nothing to run'}")
+    return 1 if counts.get('fail') or counts.get('missing') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Keeps every game's board on disk so it survives a restart. Each session
+has its own append-only log file: a header naming the puzzle, a snapshot
+of the whole board, then one record per change made since. A change is
+written to its log as soon as the game saves it, so a crashed process
+loses nothing. Logs are fsynced in batches, all the changed logs at once
+every sync_interval seconds, so a machine crash loses at most that much.
+
+Once a log holds snapshot_every changes it is replaced by a new one
+holding just a snapshot of the current board. The new log is written
+next to the old one, with .tmp added to its name, and later changes go
+on the end of it; the next batch fsyncs it and renames it over the old
+log. Until then resuming reads it in place of the old log whenever it
+holds a whole snapshot. Resuming a session reads one small file and
+replays at most snapshot_every changes, so resuming every session of a
+node is a matter of seconds even for 100k sessions.
+
+Log layout (all integers little endian):
+    header   magic, rows, cols, length of the puzzle name, the name in utf-8
+    records  start square, stride, number of squares, the letters written
+             to those squares and the crc32 of all of those. The first
+             record is the snapshot, which writes every square of the board
+
+A record cut short by a crash fails its length or crc32 check; resuming
+stops in front of it and the next save writes a fresh snapshot. A save
+after the board was replaced as a whole, or after an undo followed by a
+new change, whose undone changes may already be in the log, appends a
+record of the whole board instead of the changes.
+
+proj07.py saves its game when XWORD_SAVES names a directory, and picks a
+game up where it was left off when the same puzzle file is opened again.
+
+Usage: python savelog.py directory [--sessions n] [--moves n] [--no-sync]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from urllib.parse import quote, unquote
+
+MAGIC = b'XWL1'
+EXTENSION = '.xwl'
+TEMPORARY = '.tmp'
+ENV_DIRECTORY = 'XWORD_SAVES'
+
+HEADER = struct.Struct('<4sHHH')
+# record fields, followed by the letters and the crc32 of both
+RECORD = struct.Struct('<III')
+CRC = struct.Struct('<I')
+
+
+def _record(start, stride, letters):
+    """
+    :return: bytes of one record writing letters from square start, stride squares apart
+    """
+    body = RECORD.pack(start, stride, len(letters)) + letters
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def read_log(data):
+    """
+    Replay the records of a log
+    :param data: bytes of the whole log file
+    :return: Tuple of the puzzle name, the board bytes, the number of changes after the snapshot
+    and whether the whole file was read; the board is None if there is no complete snapshot
+    """
+    magic, rows, cols, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a save log")
+    position = HEADER.size + length
+    name = data[HEADER.size:position].decode('utf-8')
+    board = None
+    changes = -1
+    end = len(data)
+    squares = rows * cols
+    while position + RECORD.size <= end:
+        start, stride, count = RECORD.unpack_from(data, position)
+        letters = position + RECORD.size
+        crc = letters + count
+        stop = start + count * stride
+        if (crc + CRC.size > end or zlib.crc32(data[position:crc]) != CRC.unpack_from(data, crc)[0]
+                or stride < 1 or stop - stride >= squares):
+            break
+        if board is None:
+            if start != 0 or stride != 1 or count != squares:
+                break
+            board = bytearray(data[letters:crc])
+        else:
+            board[start:stop:stride] = data[letters:crc]
+        changes += 1
+        position = crc + CRC.size
+    return name, board, max(changes, 0), position == end and board is not None
+
+
+def _read_session(path):
+    """
+    Read the newest save of a session: its new log if one is waiting to be renamed into
+    place and holds a whole snapshot, otherwise its log
+    :param path: Name of the session's log file
+    :return: Tuple of the read_log result and whether it came from the new log
+    """
+    try:
+        with open(path + TEMPORARY, 'rb') as log_file:
+            saved = read_log(log_file.read())
+        if saved[1] is not None:
+            return saved, True
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        pass
+    with open(path, 'rb') as log_file:
+        return read_log(log_file.read()), False
+
+
+def _fsync(path):
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class SaveLog:
+    __slots__ = ('store', 'path', 'name', 'puzzle', 'journal', 'applied', 'truncations', 'changes', 'snapshot_due')
+
+    def __init__(self, store, path, name, puzzle):
+        """
+        Log of one session. SaveStore.open makes these
+        :param store: SaveStore the log belongs to
+        :param path: Name of the log file
+        :param name: Puzzle file name, stored in the header so the session can be resumed
+        :param puzzle: Crossword of the session
+        """
+        self.store = store
+        self.path = path
+        self.name = name
+        self.puzzle = puzzle
+        self.journal = puzzle.journal
+        self.applied = self.journal.applied
+        self.truncations = self.journal.truncations
+        self.changes = 0
+        self.snapshot_due = True
+
+    def save(self, puzzle=None):
+        """
+        Write the changes made to the board since the last save. Call it after every command
+        that may have changed the board, since it works from the puzzle's undo journal
+        :param puzzle: Crossword of the session if it is not the one the log was opened with,
+        e.g. after the game restarted on the same puzzle
+        """
+        if puzzle is not None and puzzle is not self.puzzle:
+            self.puzzle = puzzle
+        journal = self.puzzle.journal
+        if (journal is not self.journal or self.applied < journal.first
+                or journal.truncations != self.truncations):
+            # the board was replaced as a whole, so its changes are not in the new journal, the
+            # journal no longer keeps the steps made since the last save, or steps the log may
+            # hold were undone and replaced by new ones
+            self.journal, self.applied, self.truncations = journal, journal.applied, journal.truncations
+            records = [_record(0, 1, self.puzzle.state())]
+        else:
+            records = []
+        while self.applied < journal.applied:
+            cells, old, new = journal.step(self.applied)
+            records.append(_record(cells.start, cells.step, new))
+            self.applied += 1
+        while self.applied > journal.applied:
+            self.applied -= 1
+            cells, old, new = journal.step(self.applied)
+            records.append(_record(cells.start, cells.step, old))
+        self.changes += len(records)
+        if self.snapshot_due or self.changes >= self.store.snapshot_every:
+            self._snapshot()
+        elif records:
+            pending = self.path in self.store.pending
+            descriptor = os.open(self.path + TEMPORARY if pending else self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(descriptor, b''.join(records))
+            finally:
+                os.close(descriptor)
+            if not pending:
+                self.store.dirty.add(self.path)
+        self.store.maybe_sync()
+
+    def _snapshot(self):
+        """
+        Start a new log holding only a snapshot of the board. The next flush renames it over the log
+        """
+        name = self.name.encode('utf-8')
+        data = (HEADER.pack(MAGIC, self.puzzle.rows, self.puzzle.cols, len(name)) + name
+                + _record(0, 1, self.puzzle.state()))
+        descriptor = os.open(self.path + TEMPORARY, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(descriptor, data)
+        finally:
+            os.close(descriptor)
+        self.store.pending.add(self.path)
+        self.store.dirty.discard(self.path)
+        self.changes = 0
+        self.snapshot_due = False
+
+    def remove(self):
+        """
+        Delete the log, for a game that is over
+        """
+        self.store.dirty.discard(self.path)
+        self.store.pending.discard(self.path)
+        for path in (self.path + TEMPORARY, self.path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class SaveStore:
+    def __init__(self, directory, sync_interval=1.0, snapshot_every=16, sync=True):
+        """
+        Directory of session logs
+        :param directory: Directory holding the logs, created if needed
+        :param sync_interval: Most seconds a saved change waits to be fsynced
+        :param snapshot_every: Number of changes after which a log is replaced by a snapshot
+        :param sync: False to never fsync, leaving it to the operating system
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        # log files appended to since the last sync, and log files with a new log waiting to replace them
+        self.dirty = set()
+        self.pending = set()
+        self.synced = time.monotonic()
+
+    def path(self, session_id):
+        """
+        :param session_id: Any string identifying the session, e.g. a player name or a puzzle file name
+        :return: Name of the session's log file
+        """
+        return os.path.join(self.directory, quote(session_id, safe='') + EXTENSION)
+
+    def open(self, session_id, name, puzzle):
+        """
+        Start saving a session, first putting back its board if it has a log already. A log
+        of another puzzle, or one too damaged to have a snapshot, is started over
+        :param session_id: Id of the session
+        :param name: Puzzle file name the session plays
+        :param puzzle: Freshly loaded Crossword of that puzzle, whose board may be restored
+        :return: SaveLog of the session
+        """
+        path = self.path(session_id)
+        try:
+            (saved, board, changes, complete), renaming = _read_session(path)
+            if saved == name and board is not None:
+                puzzle.restore(board)
+        except (OSError, ValueError, struct.error, UnicodeDecodeError):
+            saved = board = None
+        log = SaveLog(self, path, name, puzzle)
+        if saved == name and board is not None:
+            # a new log left waiting by an earlier process is replaced by a fresh one on the next save
+            log.changes, log.snapshot_due = changes, not complete or renaming
+        return log
+
+    def resume_all(self, open_puzzle):
+        """
+        Put back every session in the directory, e.g. after a restart
+        :param open_puzzle: Function of a puzzle file name returning a Crossword with a blank
+        board, or None; called once per session so it should hand out copies of a cached puzzle
+        :return: Dictionary of session id -> SaveLog, whose puzzle attribute holds the restored Crossword
+        """
+        logs = dict()
+        paths = set()
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(EXTENSION):
+                paths.add(entry.path)
+            elif entry.name.endswith(EXTENSION + TEMPORARY):
+                paths.add(entry.path[:-len(TEMPORARY)])
+        for path in paths:
+            try:
+                (name, board, changes, complete), renaming = _read_session(path)
+            except (OSError, ValueError, struct.error, UnicodeDecodeError):
+                continue
+            puzzle = open_puzzle(name)
+            if puzzle is None or board is None:
+                continue
+            try:
+                puzzle.restore(board)
+            except ValueError:
+                continue
+            log = SaveLog(self, path, name, puzzle)
+            log.changes, log.snapshot_due = changes, not complete or renaming
+            logs[unquote(os.path.basename(path)[:-len(EXTENSION)])] = log
+        return logs
+
+    def maybe_sync(self):
+        """
+        flush() if sync_interval has passed since the last one
+        """
+        if time.monotonic() - self.synced >= self.sync_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        fsync every log written to since the last sync, rename the new logs into place, and fsync the
+        directory if there were any. A new log is only renamed once its snapshot is on disk
+        """
+        if self.sync:
+            for path in self.dirty:
+                _fsync(path)
+            for path in self.pending:
+                _fsync(path + TEMPORARY)
+        for path in self.pending:
+            try:
+                os.replace(path + TEMPORARY, path)
+            except FileNotFoundError:
+                pass
+        if self.sync and self.pending:
+            _fsync(self.directory)
+        self.dirty.clear()
+        self.pending.clear()
+        self.synced = time.monotonic()
+
+
+def from_environment():
+    """
+    :return: SaveStore of the directory named by the XWORD_SAVES environment variable, or None if it is not set
+    """
+    directory = os.environ.get(ENV_DIRECTORY)
+    return SaveStore(directory) if directory else None
+
+
+def main():
+    import random
+
+    from commands import load_puzzle
+
+    parser = argparse.ArgumentParser(description="Time saving and resuming many sessions")
+    parser.add_argument('directory', help="directory for the logs, which should be empty")
+    parser.add_argument('--puzzle', default='meal.csv')
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--moves', type=int, default=20, help="changes made in each session")
+    parser.add_argument('--no-sync', action='store_true', help="never fsync")
+    args = parser.parse_args()
+
+    template = load_puzzle(args.puzzle)
+    clues = list(template.clues.values())
+    rng = random.Random(0)
+    store = SaveStore(args.directory, sync=not args.no_sync)
+    start = time.perf_counter()
+    boards = dict()
+    for n in range(args.sessions):
+        puzzle = template.copy()
+        log = store.open(f"session-{n}", args.puzzle, puzzle)
+        for _ in range(args.moves):
+            clue = rng.choice(clues)
+            if rng.random() < 0.8:
+                puzzle.change_guess(clue, ''.join(rng.choice((letter, '_')) for letter in clue.answer))
+            else:
+                puzzle.undo()
+            log.save()
+        boards[f"session-{n}"] = puzzle.state()
+    store.flush()
+    saved = time.perf_counter() - start
+    print(f"saved {args.sessions} sessions of {args.moves} changes in {saved:.2f}s")
+
+    start = time.perf_counter()
+    logs = SaveStore(args.directory, sync=not args.no_sync).resume_all(lambda name: template.copy())
+    resumed = time.perf_counter() - start
+    matching = sum(log.puzzle.state() == boards.get(session_id) for session_id, log in logs.items())
+    print(f"resumed {len(logs)} sessions in {resumed:.2f}s, {matching} boards match")
+    return 0 if matching == args.sessions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Serves crossword games over a TCP or Unix socket, many players per
+process. Each connection is one session that speaks the same
+C/G/R/T/H/S/Q command language as proj07.py, one command per line, and
+gets back the same text proj07.py prints (without the echoed input),
+played by a commands.Game.
+
+Puzzles are loaded once per process into a PuzzleLibrary and every
+session plays on a Crossword.copy() of it, so the clues and answer key
+are shared and only the board belongs to the session. With --workers n
+the listening socket is shared by n forked processes, each running its
+own event loop; puzzles preloaded with --preload are loaded before the
+fork and shared by all of them.
+
+Usage: python server.py [--host h] [--port n | --unix path] [--root dir]
+       [--preload] [--workers n]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+
+import metrics
+import puzzle_pack
+from commands import Game, parse_command
+from crossword import Crossword
+from puzzle_loader import load_puzzles
+
+MAX_LINE = 4096
+
+
+class PuzzleLibrary:
+    def __init__(self, root='.', puzzles=None):
+        """
+        Read-only puzzles shared by the sessions of a process
+        :param root: Directory puzzle file names are looked up in. Names outside of it are refused
+        :param puzzles: Optional dictionary of file name -> Crossword to start with
+        """
+        self.root = os.path.realpath(root)
+        # (real path of the file, puzzle id in a pack or None) -> Crossword, so every name of
+        # the same puzzle shares one entry
+        self.puzzles = dict()
+        for filename, puzzle in (puzzles or {}).items():
+            key = self._resolve(filename)
+            if key is not None:
+                self.puzzles[key] = puzzle
+
+    @classmethod
+    def preload(cls, root='.', workers=None):
+        """
+        Load every puzzle csv file of the root directory up front
+        :param root: Directory of puzzle files
+        :param workers: Number of processes used to parse them
+        :return: PuzzleLibrary object
+        """
+        puzzles = load_puzzles(root, workers)
+        return cls(root, {puzzle_id + '.csv': puzzle for puzzle_id, puzzle in puzzles.items()})
+
+    def _resolve(self, filename):
+        """
+        :param filename: Puzzle file name relative to the root directory, or "pack_file#puzzle_id"
+        :return: Tuple of the real path of the file and the puzzle id in the pack (None for a csv
+        file), or None if the file is outside of the root directory
+        """
+        path = os.path.realpath(os.path.join(self.root, filename))
+        pack_name = puzzle_pack.split_name(path)
+        if pack_name is not None:
+            path = os.path.realpath(pack_name[0])
+        if os.path.commonpath([self.root, path]) != self.root:
+            return None
+        return path, pack_name[1] if pack_name else None
+
+    def open(self, filename):
+        """
+        Start a game of a puzzle, loading it on first use
+        :param filename: Puzzle file name relative to the root directory, or "pack_file#puzzle_id"
+        for a puzzle of a pack file there
+        :return: Crossword object with a blank board, or None if the puzzle cannot be loaded
+        """
+        key = self._resolve(filename)
+        if key is None:
+            return None
+        template = self.puzzles.get(key)
+        if template is None:
+            path, puzzle_id = key
+            try:
+                template = Crossword.from_pack(path, puzzle_id) if puzzle_id is not None else Crossword(path)
+            except Exception:
+                return None
+            self.puzzles[key] = template
+        return template.copy()
+
+
+class Session:
+    def __init__(self, library):
+        """
+        One player's game. Lines go in through feed and the text to send back comes out
+        :param library: PuzzleLibrary the session's puzzles come from
+        """
+        self.buffer = []
+        self.game = Game(self.buffer.append, open_puzzle=library.open)
+
+    @property
+    def closed(self):
+        return self.game.closed
+
+    def _flush(self):
+        text = ''.join(self.buffer)
+        self.buffer.clear()
+        return text
+
+    def start(self):
+        """
+        :return: Text sent when the player connects
+        """
+        self.game.start()
+        return self._flush()
+
+    def feed(self, line):
+        """
+        Handle one line of input, in whatever state the game is in
+        :param line: Line sent by the player, without its line ending
+        :return: Text to send back
+        """
+        self.game.feed(parse_command(line))
+        return self._flush()
+
+
+async def handle_client(reader, writer, library):
+    """
+    Run one session over a connection until the player quits, solves the puzzle or disconnects
+    :param reader: asyncio.StreamReader of the connection
+    :param writer: asyncio.StreamWriter of the connection
+    :param library: PuzzleLibrary of this process
+    """
+    session = Session(library)
+    try:
+        writer.write(session.start().encode())
+        while not session.closed:
+            line = await reader.readline()
+            if not line:
+                break
+            writer.write(session.feed(line.decode('utf-8', 'replace').rstrip('\r\n')).encode())
+            await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _serve(sock, library):
+    def handler(reader, writer):
+        return handle_client(reader, writer, library)
+
+    if sock.family == getattr(socket, 'AF_UNIX', None):
+        server = await asyncio.start_unix_server(handler, sock=sock, limit=MAX_LINE)
+    else:
+        server = await asyncio.start_server(handler, sock=sock, limit=MAX_LINE)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(sock, library):
+    """
+    Run an event loop serving sessions on an already listening socket until interrupted
+    :param sock: Listening socket
+    :param library: PuzzleLibrary of this process
+    """
+    metrics.enable_from_environment()
+    try:
+        asyncio.run(_serve(sock, library))
+    except KeyboardInterrupt:
+        pass
+
+
+def listen(host='127.0.0.1', port=2310, unix_path=None, backlog=1024):
+    """
+    Open the listening socket
+    :param host: TCP host to bind to
+    :param port: TCP port to bind to
+    :param unix_path: Path of a Unix socket to use instead of TCP
+    :param backlog: Listen backlog
+    :return: socket object
+    """
+    if unix_path is not None:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(unix_path)
+        sock.listen(backlog)
+        return sock
+    return socket.create_server((host, port), backlog=backlog)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve crossword games over a socket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2310)
+    parser.add_argument('--unix', help="path of a Unix socket to listen on instead of TCP")
+    parser.add_argument('--root', default='.', help="directory puzzle files are read from")
+    parser.add_argument('--preload', action='store_true', help="load every puzzle in --root before serving")
+    parser.add_argument('--workers', type=int, default=1, help="number of event loop processes")
+    args = parser.parse_args()
+
+    if args.preload:
+        library = PuzzleLibrary.preload(args.root)
+    else:
+        library = PuzzleLibrary(args.root)
+    sock = listen(args.host, args.port, args.unix)
+    print(f"Serving on {sock.getsockname()} with {args.workers} worker(s)")
+
+    workers = []
+    if args.workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=serve, args=(sock, library)) for _ in range(args.workers - 1)]
+        for worker in workers:
+            worker.start()
+    try:
+        serve(sock, library)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+        sock.close()
+        if args.unix is not None and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main()
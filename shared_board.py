@@ -0,0 +1,351 @@
+"""
+One crossword board played by several players at once, from any number
+of threads. Every write goes through a single lock, so the board, its
+count of wrong squares and its rendered rows never see half a guess.
+
+Each square keeps the version of the last change that wrote a different
+letter to it. A player reads a clue along with the board version, and
+passes that version back with the guess. The guess is then compared with
+the squares changed since:
+
+    a square nobody changed since the read     takes the guessed letter
+    a square changed to the same letter        is fine, nothing to do
+    a blank guessed over a changed square      keeps the other player's letter
+    a letter guessed over a changed square     rejects the whole guess
+
+so two players filling crossing clues at the same time both get their
+letters in when they agree on the square they share, and when they do
+not the one whose write came second is told to read the clue again. A
+rejected guess changes nothing. Reveals always win, since the answer
+cannot conflict with anything worth keeping.
+
+Every accepted change gets the next board version and goes into a
+bounded change feed. Subscribers ask for the changes after the last
+version they saw, waiting for new ones if they like; one that fell
+further behind than the feed holds starts over from snapshot().
+
+    board = SharedBoard(Crossword('meal.csv'))
+    letters, version = board.read(clue)
+    accepted, version = board.guess(clue, 'BRB', version)
+    changes = board.changes(seen_version, timeout=1.0)
+
+Run as a script it stress tests a board with many writer threads and a
+subscriber, then checks the result against the change feed.
+
+Usage: python shared_board.py [--puzzle file | --size n] [--threads n] [--seconds s]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import islice
+
+from crossword import BLANK_CODE, Clue, Crossword, validate_guess
+
+FEED_SIZE = 4096
+
+
+class Change:
+    __slots__ = ('version', 'cells', 'old', 'letters', 'seen', 'player')
+
+    def __init__(self, version, cells, old, letters, seen, player):
+        """
+        One accepted write to a shared board
+        :param version: Board version the change made
+        :param cells: slice of the squares written, as Crossword.clue_cells gives it
+        :param old: bytes those squares held before
+        :param letters: bytes written to them
+        :param seen: Version the writer had read, or None for a write that did not compare
+        :param player: Whoever made the change, as given to guess or reveal
+        """
+        self.version = version
+        self.cells = cells
+        self.old = old
+        self.letters = letters
+        self.seen = seen
+        self.player = player
+
+    def __repr__(self):
+        return f"Change({self.version}, {self.cells}, {self.letters!r}, seen={self.seen}, player={self.player!r})"
+
+
+class SharedBoard:
+    def __init__(self, puzzle, feed_size=FEED_SIZE):
+        """
+        Share a crossword between players. From then on the crossword should only be changed through this board
+        :param puzzle: Crossword object
+        :param feed_size: Number of changes the feed keeps for subscribers to catch up on
+        """
+        self.puzzle = puzzle
+        self.version = 0
+        # version of the last change to each square of the board buffer
+        self.versions = array('Q', bytes(8 * puzzle.rows * puzzle.cols))
+        self.feed = deque(maxlen=feed_size)
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.accepted = 0
+        self.merged = 0
+        self.rejected = 0
+
+    def read(self, clue):
+        """
+        :param clue: Clue object of the puzzle
+        :return: Tuple of the letters of the clue's squares, as a string, and the board version they were read at
+        """
+        with self.lock:
+            return self.puzzle.letters(clue), self.version
+
+    def snapshot(self):
+        """
+        :return: Tuple of the whole board as Crossword.state() bytes and its version
+        """
+        with self.lock:
+            return self.puzzle.state(), self.version
+
+    def guess(self, clue, new_guess, seen=None, player=None):
+        """
+        Write a guess if it does not overwrite letters other players wrote since it was read,
+        merging it with them where they agree
+        :param clue: Clue object of the puzzle
+        :param new_guess: String of letters and blanks, checked as Crossword.change_guess does
+        :param seen: Board version the clue was read at, from read(). None writes without comparing
+        :param player: Anything identifying the player, passed on to the change feed
+        :return: Tuple of whether the guess was accepted and the board version after it. A guess
+        that was rejected should be read again from that version
+        """
+        validate_guess(clue, new_guess)
+        guessed = new_guess.encode()
+        puzzle = self.puzzle
+        with self.lock:
+            letters = guessed
+            if seen is not None and seen < self.version:
+                letters = self._merge(puzzle.clue_cells(clue), puzzle.letters(clue).encode(), guessed, seen)
+                if letters is None:
+                    self.rejected += 1
+                    return False, self.version
+            puzzle.change_guess(clue, letters.decode('ascii'))
+            if letters is not guessed:
+                self.merged += 1
+            self._record(seen, player)
+            return True, self.version
+
+    def reveal(self, clue, player=None):
+        """
+        Write the answer of a clue whatever is on the board
+        :param clue: Clue object of the puzzle
+        :param player: Anything identifying the player, passed on to the change feed
+        :return: Board version after it
+        """
+        with self.lock:
+            self.puzzle.reveal_answer(clue)
+            self._record(None, player)
+            return self.version
+
+    def _merge(self, cells, board, letters, seen):
+        """
+        Fit a guess around the squares changed since it was read. Called with the lock held
+        :param cells: slice of the squares the guess writes
+        :param board: bytes now in those squares
+        :param letters: bytes of the guess
+        :param seen: Version the guess was read at
+        :return: bytes to write, or None if the guess conflicts with a change
+        """
+        versions = self.versions
+        merged = None
+        for i, index in enumerate(range(cells.start, cells.stop, cells.step)):
+            if versions[index] <= seen:
+                continue
+            current, letter = board[i], letters[i]
+            if current == letter:
+                continue
+            if letter != BLANK_CODE:
+                return None
+            if merged is None:
+                merged = bytearray(letters)
+            merged[i] = current
+        return letters if merged is None else bytes(merged)
+
+    def _record(self, seen, player):
+        """
+        Give the write that just went through the crossword the next version, if it changed
+        anything, and wake the subscribers. Called with the lock held
+        """
+        change = self.puzzle.last_change()
+        if change is None:
+            self.accepted += 1
+            return
+        cells, old, letters = change
+        self.version += 1
+        version, versions = self.version, self.versions
+        for index, before, after in zip(range(cells.start, cells.stop, cells.step), old, letters):
+            if before != after:
+                versions[index] = version
+        self.feed.append(Change(version, cells, old, letters, seen, player))
+        self.accepted += 1
+        self.changed.notify_all()
+
+    def changes(self, since, timeout=None):
+        """
+        Changes made after a version, for subscribers keeping up with the board
+        :param since: Last version the subscriber has seen, 0 for a blank board
+        :param timeout: Seconds to wait for a change when there is none yet, None to not wait
+        :return: List of Change objects in version order, empty if none came in time, or None if
+        some of them have dropped out of the feed and the subscriber should start over from snapshot()
+        """
+        with self.lock:
+            if timeout is not None and since >= self.version:
+                self.changed.wait_for(lambda: since < self.version, timeout)
+            missing = self.version - since
+            if missing <= 0:
+                return []
+            if missing > len(self.feed):
+                return None
+            return list(islice(self.feed, len(self.feed) - missing, None))
+
+    def is_solved(self):
+        with self.lock:
+            return self.puzzle.is_solved()
+
+    def __str__(self):
+        with self.lock:
+            return str(self.puzzle)
+
+
+def _writer(board, clues, seconds, seed, results):
+    """
+    Stress test player: reads a random clue and writes a guess of it, mostly letters of its
+    answer mixed with wrong letters and blanks, retrying rejected guesses with a fresh read
+    """
+    rng = random.Random(seed)
+    accepted = rejected = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        clue = rng.choice(clues)
+        guess = ''.join(rng.choice((letter, letter, letter, 'Z', '_')) for letter in clue.answer)
+        letters, version = board.read(clue)
+        for _ in range(3):
+            ok, version = board.guess(clue, guess, version, seed)
+            if ok:
+                accepted += 1
+                break
+            rejected += 1
+    results[seed] = (accepted, rejected)
+
+
+def _subscriber(board, stop, replayed):
+    """
+    Stress test subscriber: follows the change feed onto its own copy of the board
+    """
+    cells, version = board.snapshot()
+    cells = bytearray(cells)
+    while True:
+        changes = board.changes(version, timeout=0.05)
+        if changes is None:
+            state, version = board.snapshot()
+            cells[:] = state
+            replayed['resyncs'] += 1
+            continue
+        for change in changes:
+            cells[change.cells] = change.letters
+            version = change.version
+        if not changes and stop.is_set() and version == board.version:
+            break
+    replayed['cells'], replayed['version'] = cells, version
+
+
+def _verify(board, blank):
+    """
+    Check a stressed board against its change feed
+    :param board: SharedBoard after the writers stopped
+    :param blank: Crossword.state() of the board before the stress test
+    :return: List of problems found, empty if there were none
+    """
+    puzzle, problems = board.puzzle, []
+    recounted = puzzle.copy()
+    recounted.restore(puzzle.state())
+    if recounted.is_solved() != puzzle.is_solved() or recounted.check() != puzzle.check():
+        problems.append("the board's running count of wrong squares is off")
+
+    changes = list(board.feed)
+    if [change.version for change in changes] != list(range(board.version - len(changes) + 1, board.version + 1)):
+        problems.append("change feed versions are not consecutive")
+    if len(changes) == board.version:
+        cells = bytearray(blank)
+        for change in changes:
+            if cells[change.cells] != change.old:
+                problems.append(f"change {change.version} did not start from the board it replaced")
+            cells[change.cells] = change.letters
+        if cells != puzzle.state():
+            problems.append("replaying the change feed does not give the board")
+
+    # no accepted guess may have overwritten a letter written after it was read
+    last = dict()
+    for change in changes:
+        for index, before, after in zip(range(change.cells.start, change.cells.stop, change.cells.step),
+                                        change.old, change.letters):
+            if before != after:
+                if change.seen is not None and last.get(index, 0) > change.seen:
+                    problems.append(f"change {change.version} overwrote square {index} after reading it "
+                                    f"at version {change.seen}")
+                last[index] = change.version
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test a shared board with many writer threads")
+    parser.add_argument('--puzzle', default='meal.csv', help="puzzle file, or pack_file#puzzle_id")
+    parser.add_argument('--size', type=int, help="play a synthetic size x size puzzle instead")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.size:
+        from bench_suite import synthetic_rows
+
+        puzzle = Crossword.from_clues(Clue((row, col), direction, answer, text)
+                                      for row, col, direction, answer, text in synthetic_rows(args.size, 0))
+    else:
+        from commands import load_puzzle
+
+        puzzle = load_puzzle(args.puzzle)
+        if puzzle is None:
+            print(f"Cannot load {args.puzzle}")
+            return 1
+    blank = puzzle.state()
+    # keep the whole run in the feed so the result can be checked against it
+    board = SharedBoard(puzzle, feed_size=10 ** 7)
+    clues = list(puzzle.clues.values())
+
+    stop, results, replayed = threading.Event(), dict(), {'resyncs': 0}
+    subscriber = threading.Thread(target=_subscriber, args=(board, stop, replayed))
+    writers = [threading.Thread(target=_writer, args=(board, clues, args.seconds, seed, results))
+               for seed in range(args.threads)]
+    subscriber.start()
+    start = time.perf_counter()
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    subscriber.join()
+
+    accepted = sum(ok for ok, _ in results.values())
+    rejected = sum(failed for _, failed in results.values())
+    print(f"{args.threads} writers, {elapsed:.2f}s: {accepted} guesses accepted ({accepted / elapsed:.0f}/s), "
+          f"{rejected} rejected, {board.merged} merged, {board.version} changes")
+    problems = _verify(board, blank)
+    if replayed['cells'] != board.puzzle.state() or replayed['version'] != board.version:
+        problems.append("subscriber's copy does not match the board")
+    for problem in problems[:20]:
+        print(problem)
+    print("board and change feed agree" if not problems else f"{len(problems)} problems")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
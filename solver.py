@@ -0,0 +1,394 @@
+"""
+Fills a crossword grid from a word list. Only the clue geometry of the
+Crossword is used, its answers are ignored.
+
+Every slot (clue) keeps its candidate words as a bitset: an int whose
+bit n is set while word n of that length still fits, and every checked
+square keeps a 26 bit mask of the letters still possible there. The
+positional masks of word_index.WordIndex give the words with a letter at
+a position, so narrowing a slot down to the words that agree with a
+crossing is a handful of int ANDs/ORs. Narrowing runs until every
+crossing agrees, and a slot that is down to one word takes that word
+away from the other slots of its length, so no word is used twice.
+
+The search fills the slot with the fewest candidates for the dead ends
+its crossings have been in (dom/wdeg), and tries first the words that
+leave its crossing slots the most candidates. Every change to a slot or
+square goes on a trail, and backtracking pops the trail back to a mark
+instead of copying the state. A run that hits RESTART_FAILURES times
+the Luby sequence of dead ends starts over, keeping the dead end counts
+and breaking ties differently, so one bad early word cannot hold up the
+whole fill.
+
+Usage: python solver.py puzzle.csv word_list.txt
+"""
+
+import math
+import random
+import sys
+import time
+
+from crossword import Crossword
+from word_index import LETTERS, WordIndex, read_words
+
+ALL_LETTERS = (1 << len(LETTERS)) - 1
+
+# Dead ends of the first search run. Run n is allowed this many times the n-th term of the Luby sequence
+RESTART_FAILURES = 10
+# Candidates of a slot that are ranked before trying them, the rest follow in word id order
+RANKED_WORDS = 256
+# Size of the random jitter added to the log of a word's crossing candidates, so restarts try other words
+NOISE = 1.0
+
+_NO_CROSSING = [0.0] * len(LETTERS)
+
+
+def _luby(run):
+    """
+    :param run: Number of a search run, from 1
+    :return: Term run of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    """
+    while True:
+        k = run.bit_length()
+        if run == (1 << k) - 1:
+            return 1 << (k - 1)
+        run -= (1 << (k - 1)) - 1
+
+
+class Slot:
+    __slots__ = ('key', 'length', 'cells', 'crossings')
+
+    def __init__(self, key, cells):
+        """
+        One answer of the grid
+        :param key: Key of the clue in Crossword.clues
+        :param cells: Flat board positions of the answer's letters
+        """
+        self.key = key
+        self.length = len(cells)
+        self.cells = cells
+        # (position, square, [(other slot number, position in the other slot), ...]) for each checked square
+        self.crossings = []
+
+
+class SolveResult:
+    def __init__(self, words, board, nodes, backtracks, seconds, restarts=0):
+        """
+        Outcome of a solve
+        :param words: Dictionary of clue key -> word, None if no fill was found
+        :param board: List of lists of board characters, None if no fill was found
+        :param nodes: Number of words tried in a slot
+        :param backtracks: Number of tried words that had to be undone
+        :param seconds: Wall clock time of the search
+        :param restarts: Number of times the search started over
+        """
+        self.words = words
+        self.board = board
+        self.nodes = nodes
+        self.backtracks = backtracks
+        self.seconds = seconds
+        self.restarts = restarts
+
+    @property
+    def solved(self):
+        return self.words is not None
+
+    def __str__(self):
+        status = "solved" if self.solved else "no fill"
+        return (f"{status}: {self.nodes} nodes, {self.backtracks} backtracks, {self.restarts} restarts, "
+                f"{self.seconds * 1000:.1f} ms")
+
+
+class Solver:
+    def __init__(self, puzzle, words, seed=None, max_nodes=None):
+        """
+        Prepare the slots and word masks for a puzzle
+        :param puzzle: Crossword object whose clue geometry is filled
+        :param words: Iterable of candidate words, or a WordIndex built from them
+        :param seed: Optional seed to shuffle the order words are tried in (ignored for a WordIndex)
+        and to break ties after a restart
+        :param max_nodes: Optional limit on words tried before giving up
+        """
+        self.puzzle = puzzle
+        self.max_nodes = max_nodes
+        self.rng = random.Random(0 if seed is None else seed)
+        self.nodes = 0
+        self.backtracks = 0
+        self.restarts = 0
+
+        size = puzzle.rows * puzzle.cols
+        self.slots = [Slot(key, range(*clue.cells.indices(size))) for key, clue in puzzle.clues.items()]
+        lengths = {slot.length for slot in self.slots}
+
+        if not isinstance(words, WordIndex):
+            words = WordIndex((word for word in words if len(word) in lengths), seed)
+        self.index = words
+        self.words = {length: words.words.get(length, []) for length in lengths}
+        # masks[length][position][letter] -> bitset of the words with that letter there
+        self.masks = {length: words.masks.get(length, [[0] * len(LETTERS)] * length) for length in lengths}
+        # codes[length][n] -> letter numbers (A = 0) of word n
+        self.codes = {length: words.codes.get(length, []) for length in lengths}
+
+        owners = dict()
+        for number, slot in enumerate(self.slots):
+            for position, cell in enumerate(slot.cells):
+                owners.setdefault(cell, []).append((number, position))
+        # checked squares are numbered in board order, owners[square] -> [(slot number, position), ...]
+        squares = {cell: square for square, cell in enumerate(sorted(cell for cell in owners if len(owners[cell]) > 1))}
+        self.owners = [owners[cell] for cell in sorted(squares)]
+        for number, slot in enumerate(self.slots):
+            for position, cell in enumerate(slot.cells):
+                if cell in squares:
+                    others = [owner for owner in owners[cell] if owner[0] != number]
+                    slot.crossings.append((position, squares[cell], others))
+        self.same_length = [[other for other, slot in enumerate(self.slots) if other != number and slot.length == length]
+                            for number, length in enumerate(slot.length for slot in self.slots)]
+        # dead ends each checked square has been part of, kept across restarts
+        self.weights = [1] * len(self.owners)
+
+        self.domains = None
+        self.letters = None
+        # (list, index, value before the change) for every change since the search started
+        self.trail = []
+        self.cutoff = None
+
+    def _narrow(self, values, index, value):
+        """
+        Change a slot's candidates or a square's letters, keeping the old value on the trail
+        :param values: self.domains or self.letters
+        :param index: Slot or square number
+        :param value: New bitset
+        """
+        self.trail.append((values, index, values[index]))
+        values[index] = value
+
+    def _undo(self, mark):
+        """
+        Put back every change made since the trail was mark entries long
+        :param mark: Length of the trail to go back to
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            values, index, value = trail.pop()
+            values[index] = value
+
+    def _propagate(self, changed):
+        """
+        Narrow every slot down until all crossings agree and no word is left in two slots
+        once one of them is down to it. A crossing slot is only narrowed when the letters
+        possible at the square it shares actually shrink
+        :param changed: Slot numbers whose candidates just changed
+        :return: False if some slot or square has nothing left
+        """
+        domains, letters, slots = self.domains, self.letters, self.slots
+        queue = list(changed)
+        queued = set(queue)
+        while queue:
+            number = queue.pop()
+            queued.discard(number)
+            slot = slots[number]
+            domain = domains[number]
+            masks = self.masks[slot.length]
+            # a slot down to one word fixes its letters without testing every candidate letter
+            word = None
+            if domain & (domain - 1) == 0:
+                word = self.codes[slot.length][domain.bit_length() - 1]
+                for other in self.same_length[number]:
+                    if domains[other] & domain:
+                        if domains[other] == domain:
+                            return False
+                        self._narrow(domains, other, domains[other] & ~domain)
+                        if other not in queued:
+                            queued.add(other)
+                            queue.append(other)
+
+            for position, square, others in slot.crossings:
+                current = letters[square]
+                if word is not None:
+                    allowed = current & (1 << word[position])
+                else:
+                    allowed = 0
+                    remaining = current
+                    while remaining:
+                        bit = remaining & -remaining
+                        remaining ^= bit
+                        if domain & masks[position][bit.bit_length() - 1]:
+                            allowed |= bit
+                if allowed == current:
+                    continue
+                if not allowed:
+                    self.weights[square] += 1
+                    return False
+                self._narrow(letters, square, allowed)
+
+                for other, other_position in others:
+                    other_masks = self.masks[slots[other].length][other_position]
+                    if allowed & (allowed - 1) == 0:
+                        fits = other_masks[allowed.bit_length() - 1]
+                    else:
+                        fits = 0
+                        remaining = allowed
+                        while remaining:
+                            bit = remaining & -remaining
+                            remaining ^= bit
+                            fits |= other_masks[bit.bit_length() - 1]
+                    narrowed = domains[other] & fits
+                    if narrowed != domains[other]:
+                        if not narrowed:
+                            self.weights[square] += 1
+                            return False
+                        self._narrow(domains, other, narrowed)
+                        if other not in queued:
+                            queued.add(other)
+                            queue.append(other)
+        return True
+
+    def _choose(self):
+        """
+        Pick the open slot with the fewest candidates per dead end its open crossings have been in
+        :return: Slot number, or None if every slot is down to one word
+        """
+        best, best_score = None, None
+        for number, domain in enumerate(self.domains):
+            if domain & (domain - 1) == 0:
+                continue
+            weight = 0
+            for _, square, _ in self.slots[number].crossings:
+                current = self.letters[square]
+                if current & (current - 1):
+                    weight += self.weights[square]
+            score = domain.bit_count() / (weight or 1)
+            if best_score is None or score < best_score:
+                best, best_score = number, score
+        return best
+
+    def _ordered(self, number):
+        """
+        Order a slot's candidates by the log of the candidates each would leave its crossing
+        slots, with a little jitter. Only RANKED_WORDS of them, picked at random, are ranked,
+        which for a slot that has more than that is plenty to start with
+        :param number: Slot number
+        :return: List of word numbers
+        """
+        slot = self.slots[number]
+        domains = self.domains
+        # logs[position][letter] -> log of the candidates left in the crossing slot by that letter there
+        logs = [_NO_CROSSING] * slot.length
+        for position, square, others in slot.crossings:
+            table = [0.0] * len(LETTERS)
+            remaining = self.letters[square]
+            while remaining:
+                bit = remaining & -remaining
+                remaining ^= bit
+                letter = bit.bit_length() - 1
+                count = min((domains[other] & self.masks[self.slots[other].length][other_position][letter])
+                            .bit_count() for other, other_position in others)
+                table[letter] = math.log(count) if count else -math.inf
+            logs[position] = table
+
+        bits = bin(domains[number])[:1:-1]
+        candidates = []
+        found = bits.find('1')
+        while found >= 0:
+            candidates.append(found)
+            found = bits.find('1', found + 1)
+        rest = []
+        if len(candidates) > RANKED_WORDS:
+            start = self.rng.randrange(len(candidates))
+            candidates = candidates[start:] + candidates[:start]
+            candidates, rest = candidates[:RANKED_WORDS], candidates[RANKED_WORDS:]
+        codes = self.codes[slot.length]
+        jitter = self.rng.random
+        scores = [sum(map(list.__getitem__, logs, codes[n])) + jitter() * NOISE for n in candidates]
+        order = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)
+        return [candidates[k] for k in order] + rest
+
+    def _search(self):
+        """
+        Depth first search over the open slot picked by _choose
+        :return: True once every slot is down to one word, False on a dead end or when
+        the node limit or the dead end cutoff of this run is reached
+        """
+        number = self._choose()
+        if number is None:
+            return True
+
+        for word in self._ordered(number):
+            self.nodes += 1
+            if self.max_nodes is not None and self.nodes > self.max_nodes or self.backtracks > self.cutoff:
+                return False
+            mark = len(self.trail)
+            self._narrow(self.domains, number, 1 << word)
+            if self._propagate([number]) and self._search():
+                return True
+            self._undo(mark)
+            self.backtracks += 1
+        return False
+
+    def solve(self):
+        """
+        Fill the grid
+        :return: SolveResult
+        """
+        start = time.perf_counter()
+        self.nodes = self.backtracks = self.restarts = 0
+        self.trail = []
+        self.domains = [(1 << len(self.words[slot.length])) - 1 for slot in self.slots]
+        self.letters = [ALL_LETTERS] * len(self.owners)
+        found = False
+        if all(self.domains) and self._propagate(range(len(self.domains))):
+            root = len(self.trail)
+            run = 1
+            while True:
+                self.cutoff = self.backtracks + RESTART_FAILURES * _luby(run)
+                found = self._search()
+                # a run that ends below its cutoff has tried everything
+                if found or self.backtracks <= self.cutoff:
+                    break
+                if self.max_nodes is not None and self.nodes > self.max_nodes:
+                    break
+                self._undo(root)
+                self.restarts += 1
+                run += 1
+        seconds = time.perf_counter() - start
+
+        if not found:
+            return SolveResult(None, None, self.nodes, self.backtracks, seconds, self.restarts)
+
+        words = dict()
+        cells = ['■'] * (self.puzzle.rows * self.puzzle.cols)
+        for slot, domain in zip(self.slots, self.domains):
+            word = self.words[slot.length][domain.bit_length() - 1]
+            words[slot.key] = word
+            for cell, letter in zip(slot.cells, word):
+                cells[cell] = letter
+        board = [cells[i:i + self.puzzle.cols] for i in range(0, len(cells), self.puzzle.cols)]
+        return SolveResult(words, board, self.nodes, self.backtracks, seconds, self.restarts)
+
+
+def solve(puzzle, words, seed=None, max_nodes=None):
+    """
+    Fill a crossword grid from a word list
+    :param puzzle: Crossword object whose clue geometry is filled
+    :param words: Iterable of candidate words
+    :param seed: Optional seed of the word order and of the tie breaking after a restart
+    :param max_nodes: Optional limit on words tried before giving up
+    :return: SolveResult with the filled board and search statistics
+    """
+    return Solver(puzzle, words, seed, max_nodes).solve()
+
+
+def main(argv):
+    if len(argv) != 2:
+        print("Usage: python solver.py puzzle.csv word_list.txt")
+        return 1
+    result = solve(Crossword(argv[0]), read_words(argv[1]))
+    print(result)
+    if result.solved:
+        for row in result.board:
+            print(' '.join(row))
+    return 0 if result.solved else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
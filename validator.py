@@ -0,0 +1,244 @@
+"""
+Batch validator for puzzle csv files. Reports every problem in every
+file instead of stopping at the first one, and never builds Crossword
+objects.
+
+Each file is checked for:
+    missing columns, non integer or negative indices, directions other
+    than A/D, answers with characters outside GUESS_CHARS, answers
+    running past --size, duplicate (row, column, direction) keys,
+    crossing answers that disagree on a letter, answers in the same
+    direction that overlap and orphan answers (answers that cross no
+    other answer, so their squares are cut off from the rest of the grid)
+
+Files are split into chunks that run across a process pool. Within a
+chunk the squares of every file are packed into one array of integer
+keys, so the crossing and orphan checks are a sort and a few array
+comparisons for the whole chunk. NumPy is used for these when it is
+installed, otherwise the same checks run on plain lists.
+
+Usage: python validator.py directory_or_glob [--size n] [--workers n]
+"""
+
+import argparse
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crossword import GUESS_CHARS
+from puzzle_loader import find_puzzles
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COLUMNS = ('Row Index', 'Column Index', 'Down/Across', 'Answer', 'Clue')
+CHUNKSIZE = 256
+
+# Square keys are (file number << FILE_SHIFT) | (row << ROW_SHIFT) | column
+ROW_SHIFT = 20
+FILE_SHIFT = 40
+DOWN_STEP = 1 << ROW_SHIFT
+
+
+def parse_file(filename, size=None):
+    """
+    Read one puzzle file, checking everything that can be checked row by row
+    :param filename: Name of the puzzle csv file
+    :param size: Optional maximum number of rows and columns
+    :return: Tuple of the usable (line, row, col, direction, answer) records and a list of violations
+    """
+    records = []
+    violations = []
+    seen = dict()
+    try:
+        with open(filename, newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            missing = [column for column in COLUMNS if column not in (reader.fieldnames or ())]
+            if missing:
+                return [], [f"missing columns: {', '.join(missing)}"]
+
+            for line, row in enumerate(reader, start=2):
+                try:
+                    r, c = int(row['Row Index']), int(row['Column Index'])
+                except (TypeError, ValueError):
+                    violations.append(f"line {line}: indices are not integers")
+                    continue
+                direction, answer = row['Down/Across'], row['Answer'] or ''
+                usable = True
+                if r < 0 or c < 0:
+                    violations.append(f"line {line}: ({r}, {c}) is out of bounds")
+                    usable = False
+                if direction not in ('A', 'D'):
+                    violations.append(f"line {line}: direction {direction!r} is not A or D")
+                    usable = False
+                if not answer:
+                    violations.append(f"line {line}: empty answer")
+                    usable = False
+                elif not set(answer) <= set(GUESS_CHARS):
+                    violations.append(f"line {line}: answer {answer!r} has characters outside GUESS_CHARS")
+                    usable = False
+                if usable and size is not None:
+                    end_r = r + (len(answer) - 1 if direction == 'D' else 0)
+                    end_c = c + (len(answer) - 1 if direction == 'A' else 0)
+                    if end_r >= size or end_c >= size:
+                        violations.append(f"line {line}: answer {answer!r} runs past a {size}x{size} board")
+                        usable = False
+
+                key = (r, c, direction)
+                if key in seen:
+                    violations.append(f"line {line}: duplicate clue {key}, first on line {seen[key]}")
+                    continue
+                seen[key] = line
+                if usable:
+                    records.append((line, r, c, direction, answer))
+    except (OSError, UnicodeDecodeError, csv.Error) as error:
+        return [], [f"cannot read file: {error}"]
+    return records, violations
+
+
+def _squares(parsed):
+    """
+    Flatten the answers of a chunk into one entry per square
+    :param parsed: List of record lists, one per file
+    :return: Tuple of lists: square keys, letter codes, direction flags (True for down) and
+    answer numbers, numbered in record order across the whole chunk
+    """
+    keys, letters, downs, answers = [], [], [], []
+    number = 0
+    for file_number, records in enumerate(parsed):
+        base = file_number << FILE_SHIFT
+        for _, r, c, direction, answer in records:
+            start = base | (r << ROW_SHIFT) | c
+            step = DOWN_STEP if direction == 'D' else 1
+            keys.extend(range(start, start + step * len(answer), step))
+            letters.extend(answer.encode('ascii'))
+            downs.extend([direction == 'D'] * len(answer))
+            answers.extend([number] * len(answer))
+            number += 1
+    return keys, letters, downs, answers
+
+
+def _square_checks_numpy(keys, letters, downs, answers):
+    """
+    Run the crossing, overlap and orphan checks with NumPy
+    :return: Tuple of sorted lists: keys of disagreeing squares, keys of overlapping squares
+    and numbers of the answers that cross nothing
+    """
+    keys = numpy.asarray(keys, dtype=numpy.int64)
+    letters = numpy.asarray(letters, dtype=numpy.uint8)
+    downs = numpy.asarray(downs, dtype=bool)
+    answers = numpy.asarray(answers, dtype=numpy.int64)
+    if not len(keys):
+        return [], [], []
+
+    order = numpy.lexsort((downs, keys))
+    keys, letters, downs, answers = keys[order], letters[order], downs[order], answers[order]
+    same = keys[1:] == keys[:-1]
+    conflicts = numpy.unique(keys[1:][same & (letters[1:] != letters[:-1])])
+    overlaps = numpy.unique(keys[1:][same & (downs[1:] == downs[:-1])])
+
+    # a square is shared when the entry before or after it in sorted order has the same key
+    shared = numpy.zeros(len(keys), dtype=bool)
+    shared[1:] |= same
+    shared[:-1] |= same
+    crossings = numpy.bincount(answers, weights=shared, minlength=answers.max() + 1)
+    return conflicts.tolist(), overlaps.tolist(), numpy.flatnonzero(crossings == 0).tolist()
+
+
+def _square_checks_python(keys, letters, downs, answers):
+    """
+    Run the crossing, overlap and orphan checks on plain lists
+    :return: Tuple of sorted lists: keys of disagreeing squares, keys of overlapping squares
+    and numbers of the answers that cross nothing
+    """
+    entries = sorted(zip(keys, downs, letters, answers))
+    conflicts, overlaps = set(), set()
+    crossed = set()
+    for (key, down, letter, answer), following in zip(entries, entries[1:]):
+        if key == following[0]:
+            crossed.update((answer, following[3]))
+            if letter != following[2]:
+                conflicts.add(key)
+            if down == following[1]:
+                overlaps.add(key)
+    return sorted(conflicts), sorted(overlaps), sorted(set(answers) - crossed)
+
+
+def _describe(key):
+    """
+    :param key: Square key
+    :return: Tuple of file number and (row, column)
+    """
+    return key >> FILE_SHIFT, ((key >> ROW_SHIFT) & (DOWN_STEP - 1), key & (DOWN_STEP - 1))
+
+
+def validate_chunk(filenames, size=None):
+    """
+    Validate a group of files together
+    :param filenames: Names of the puzzle csv files
+    :param size: Optional maximum number of rows and columns
+    :return: List of (filename, violations) pairs in the same order
+    """
+    parsed = []
+    reports = []
+    for filename in filenames:
+        records, violations = parse_file(filename, size)
+        parsed.append(records)
+        reports.append(violations)
+
+    checks = _square_checks_numpy if numpy is not None else _square_checks_python
+    conflicts, overlaps, orphans = checks(*_squares(parsed))
+    for message, found in (("crossing answers disagree at", conflicts),
+                           ("answers in the same direction overlap at", overlaps)):
+        for key in found:
+            number, square = _describe(key)
+            reports[number].append(f"{message} {square}")
+
+    if orphans:
+        owners = [(number, record) for number, records in enumerate(parsed) for record in records]
+        for answer in orphans:
+            number, (line, _, _, _, word) = owners[answer]
+            reports[number].append(f"line {line}: orphan answer {word!r} crosses no other answer")
+    return list(zip(filenames, reports))
+
+
+def validate_corpus(filenames, size=None, workers=None):
+    """
+    Validate many files across a process pool
+    :param filenames: Names of the puzzle csv files
+    :param size: Optional maximum number of rows and columns
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :return: Dictionary of filename -> list of violations, for files with at least one
+    """
+    chunks = [filenames[i:i + CHUNKSIZE] for i in range(0, len(filenames), CHUNKSIZE)]
+    if workers == 1 or len(chunks) <= 1:
+        results = [validate_chunk(chunk, size) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(validate_chunk, chunks, [size] * len(chunks)))
+    return {filename: violations for chunk in results for filename, violations in chunk if violations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a corpus of puzzle csv files")
+    parser.add_argument('source', help="directory or glob pattern of puzzle files")
+    parser.add_argument('--size', type=int, help="maximum number of rows and columns")
+    parser.add_argument('--workers', type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    filenames = find_puzzles(args.source)
+    start = time.perf_counter()
+    report = validate_corpus(filenames, args.size, args.workers)
+    elapsed = time.perf_counter() - start
+    for filename, violations in report.items():
+        print(filename)
+        for violation in violations:
+            print(f"  {violation}")
+    print(f"Checked {len(filenames)} files in {elapsed:.2f}s, {len(report)} with violations")
+    return 1 if report else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Positional index over a word list for answering patterns such as
+"B_O_D", with _ as the blank just like GUESS_CHARS.
+
+Words are grouped by length. For each length, position and letter the
+index keeps a bitset (an int) of the ids of the words with that letter
+at that position, so a pattern is answered by ANDing one bitset per
+filled in letter instead of scanning the list.
+
+Usage: python word_index.py word_list.txt PATTERN [PATTERN ...]
+"""
+
+import random
+import sys
+
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BLANK = '_'
+# Turns an encoded upper case word into letter numbers, A = 0
+_CODES = bytes.maketrans(LETTERS.encode(), bytes(range(len(LETTERS))))
+
+
+def read_words(filename):
+    """
+    Read a word list with one word per line. Anything after the first comma
+    (e.g. a clue) is ignored, as are words with characters other than A-Z
+    :param filename: Name of the word list file
+    :return: List of upper case words
+    """
+    words = []
+    with open(filename) as word_file:
+        for line in word_file:
+            word = line.split(',', 1)[0].strip().upper()
+            if word and all(letter in LETTERS for letter in word):
+                words.append(word)
+    return words
+
+
+class WordIndex:
+    def __init__(self, words, seed=None):
+        """
+        Build the index
+        :param words: Iterable of upper case words, duplicates are dropped
+        :param seed: Optional seed to shuffle the id order of the words of each length,
+        otherwise ids follow alphabetical order
+        """
+        grouped = dict()
+        for word in words:
+            grouped.setdefault(len(word), set()).add(word)
+
+        # words[length][id] -> word
+        self.words = {length: sorted(group) for length, group in grouped.items()}
+        if seed is not None:
+            rng = random.Random(seed)
+            for length in sorted(self.words):
+                rng.shuffle(self.words[length])
+
+        # masks[length][position][letter number] -> bitset of word ids
+        self.masks = dict()
+        # codes[length][id] -> letter numbers of the word, A = 0
+        self.codes = dict()
+        for length, word_list in self.words.items():
+            masks = [[0] * len(LETTERS) for _ in range(length)]
+            codes = []
+            for n, word in enumerate(word_list):
+                bit = 1 << n
+                code = word.encode().translate(_CODES)
+                for position, letter in enumerate(code):
+                    masks[position][letter] |= bit
+                codes.append(code)
+            self.masks[length] = masks
+            self.codes[length] = codes
+
+    def __len__(self):
+        return sum(len(word_list) for word_list in self.words.values())
+
+    def all_words(self, length):
+        """
+        :param length: Word length
+        :return: Bitset with every word of that length
+        """
+        return (1 << len(self.words.get(length, ()))) - 1
+
+    def bitset(self, pattern):
+        """
+        Bitset of the ids of the words matching a pattern
+        :param pattern: Upper case letters with _ for unknown squares
+        :return: int bitset over the words of len(pattern)
+        """
+        length = len(pattern)
+        if length not in self.masks:
+            return 0
+        masks = self.masks[length]
+        found = self.all_words(length)
+        for position, letter in enumerate(pattern):
+            if letter != BLANK:
+                code = ord(letter) - 65
+                if not 0 <= code < len(LETTERS):
+                    return 0
+                found &= masks[position][code]
+                if not found:
+                    return 0
+        return found
+
+    def count(self, pattern):
+        """
+        Number of words matching a pattern, without listing them
+        :param pattern: Upper case letters with _ for unknown squares
+        :return: int count
+        """
+        return self.bitset(pattern).bit_count()
+
+    def iter_bits(self, length, found):
+        """
+        Stream the words of a bitset in id order
+        :param length: Word length the bitset belongs to
+        :param found: int bitset of word ids
+        :return: Generator of words
+        """
+        word_list = self.words[length]
+        while found:
+            bit = found & -found
+            found ^= bit
+            yield word_list[bit.bit_length() - 1]
+
+    def matches(self, pattern):
+        """
+        Stream the words matching a pattern
+        :param pattern: Upper case letters with _ for unknown squares
+        :return: Generator of words
+        """
+        found = self.bitset(pattern)
+        if found:
+            yield from self.iter_bits(len(pattern), found)
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: python word_index.py word_list.txt PATTERN [PATTERN ...]")
+        return 1
+    index = WordIndex(read_words(argv[0]))
+    for pattern in argv[1:]:
+        pattern = pattern.upper()
+        print(f"{pattern}: {index.count(pattern)} matches")
+        for word in index.matches(pattern):
+            print(f"  {word}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))